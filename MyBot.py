@@ -3,6 +3,8 @@
 # Import the Halite SDK, which will let you interact with the game.
 import hlt
 from hlt import constants
+from hlt.fleet import resolve_moves
+from hlt.targeting import TargetIndex
 
 import math
 import random
@@ -14,56 +16,30 @@ import logging
     # navigation - ships can swap positions
 
 
-def get_maxPosition(ship,hlt_map,planned_position, game):
-    max_value = [0.0,1.0,2.0]
-    max_key = {0.0:(0,0),1.0:(0,0),2.0:(0,0)}
-    for k in hlt_map:
-        min_max = min(max_value)
-        if k not in planned_position and hlt_map[k] > min_max:
-            if hlt_map[k] not in max_key:
-                max_key[hlt_map[k]] = k
-                min_idx = max_value.index(min(max_value))
-                max_value[min_idx] = hlt_map[k]
-            else:
-                c = 0.01
-                while hlt_map[k]+c in max_key:
-                    c += c
-                max_key[hlt_map[k]+c] = k
-                min_idx = max_value.index(min(max_value))
-                max_value[min_idx] = hlt_map[k]+c 
-            del max_key[min_max]
-                    
+def get_maxPosition(ship,targets,planned_position, game):
     max_reward = 10000
     desired_position = ship.position
 
-    for key, position in max_key.items():
-        p = hlt.Position(position[0], position[1])
+    for p in targets.best(3, planned_position):
+        value = targets.value(p)
+        if value <= 0:
+            continue
         nav = game.game_map.aStar_plan(ship.position,p)
-        home_nav = game.game_map.aStar_plan(p,me.shipyard.position)
-        position_cost = (nav['cost']+home_nav['cost'])/hlt_map[position]
+        home_cost = game.game_map.home_field(me).cost(p)
+        position_cost = (nav['cost']+home_cost)/value
         if position_cost < max_reward:
             max_reward = position_cost
             desired_position = p
     return desired_position
 
 
-def scoreMap(game,start,curPoint,radius=5,hlt_map={}):
+def scoreMap(game,positions,radius=5):
     gm = game.game_map
-    directions = curPoint.get_surrounding_cardinals()
-    for d in directions:
-        d = gm.normalize(d)
-        pos = (d.x,d.y)
-        dist = gm.calculate_distance(start,d)
-        if dist > radius:
-            return hlt_map
-        elif pos not in hlt_map:
-            amount = 0
-            if gm[d].structure == None:
-                amount = gm[d].halite_amount
-                # gm[d].mark_safe()
-            hlt_map[pos] = amount
-            htl_map = scoreMap(game,game.me.shipyard.position,d,radius,hlt_map)
-    return hlt_map
+    cells, halite = gm.halite_within_many(positions, radius)
+    # cells with a structure are worth nothing
+    halite = halite * (gm.structure_owner.reshape(-1)[cells] < 0)
+    return {(cell % gm.width, cell // gm.width): amount
+            for cell, amount in zip(cells.ravel().tolist(), halite.ravel().tolist())}
 
 
 # This game object contains the initial game state.
@@ -72,7 +48,9 @@ if game.game_map.width > game.game_map.height:
     r =  game.game_map.width/4
 else:
     r = game.game_map.height/4
-hlt_map = scoreMap(game,game.me.shipyard.position,game.me.shipyard.position,r)
+targets = TargetIndex(game.game_map)
+for key, amount in scoreMap(game,[game.me.shipyard.position],r).items():
+    targets.track(hlt.Position(key[0], key[1]), amount)
 ship_status = {}
 
 # pre compute needed stuff here before intializing game
@@ -89,15 +67,20 @@ while True:
 
     # A command queue holds all the commands you will run this turn.
     command_queue = []
-    planned_position = []
+    planned_position = set()
+    targets.refresh()
     shipyard_attack = False
+    # Every ship ranks its moves, then the fleet's moves are resolved together
+    ranked_moves = {}
+    shared_cells = set()
 
-    for ship in me.get_ships():
-        ship_map = scoreMap(game,ship.position,ship.position)
-        ship_map[(ship.position.x,ship.position.y)] = game_map[ship.position].halite_amount
-        for key in ship_map:
-            hlt_map[key] = ship_map[key]
+    # The halite on every ship's cell and the ring around it, so the tracked region
+    # only grows by the cells the ships reach
+    ship_map = scoreMap(game,[ship.position for ship in me.get_ships()],1)
+    for key, amount in ship_map.items():
+        targets.track(hlt.Position(key[0], key[1]), amount)
 
+    for ship in me.get_ships():
         if ship.id not in ship_status:
             ship_status[ship.id] = "exploring"  
 
@@ -110,24 +93,25 @@ while True:
 
         if ship_status[ship.id] == "exploring":
             if ship.id not in mission:
-                maxP = get_maxPosition(ship,hlt_map,planned_position,game)
-                move = game_map.aStar_navigate(ship, maxP)
-                command_queue.append(ship.move(move))
-                planned_position.append((maxP.x,maxP.y))
+                maxP = get_maxPosition(ship,targets,planned_position,game)
+                ranked_moves[ship] = game_map.rank_moves(ship, maxP)
+                move = ranked_moves[ship][0]
+                planned_position.add(maxP)
                 mission[ship.id] = (maxP.x,maxP.y)
             else:
                 maxP = hlt.Position(mission[ship.id][0],mission[ship.id][1])
-                move = game_map.aStar_navigate(ship, maxP)
-                command_queue.append(ship.move(move))
-                planned_position.append(mission[ship.id])
+                ranked_moves[ship] = game_map.rank_moves(ship, maxP)
+                move = ranked_moves[ship][0]
+                planned_position.add(maxP)
                 if game_map[maxP].halite_amount <= 15:
                     del mission[ship.id]
-            logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                ship.id, ship.halite_amount, ship_status[ship.id], maxP, ship.position, move))
+            logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                ship.id, ship.halite_amount, ship_status[ship.id], maxP, ship.position, move)
 
         elif ship_status[ship.id] == "returning":
             if ship.position == me.shipyard.position:
                 ship_status[ship.id] = "exploring"
+                ranked_moves[ship] = [hlt.Direction.Still]
 
             # elif me.halite_amount > constants.DROPOFF_COST:
             #     command_queue.append(ship.make_dropoff())
@@ -138,17 +122,20 @@ while True:
                 if game_map[me.shipyard.position].is_occupied  and game_map[me.shipyard.position].ship.owner != me.id and not shipyard_attack:
                     crash = True
                     shipyard_attack = True
-                move = game_map.aStar_navigate(ship, me.shipyard.position, crash)
-                command_queue.append(ship.move(move))
-                logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move))
+                ranked_moves[ship] = game_map.rank_moves(ship, me.shipyard.position, crash)
+                move = ranked_moves[ship][0]
+                logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move)
 
         elif ship_status[ship.id] == "end of game":
-            move = game_map.aStar_navigate(ship, me.shipyard.position,True)
-            command_queue.append(ship.move(move))
-            logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move))
-
+            ranked_moves[ship] = game_map.rank_moves(ship, me.shipyard.position,True)
+            move = ranked_moves[ship][0]
+            shared_cells.add(me.shipyard.position)
+            logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move)
+
+    for ship, move in resolve_moves(game_map, ranked_moves, shared_cells).items():
+        command_queue.append(ship.move(move))
 
     # If you're on the first turn and have enough halite, spawn a ship.
     # Don't spawn a ship if you currently have a ship at port, though.
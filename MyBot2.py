@@ -3,6 +3,8 @@
 # Import the Halite SDK, which will let you interact with the game.
 import hlt
 from hlt import constants
+from hlt.dropoffs import DropoffSites
+from hlt.targeting import TargetIndex
 
 import math
 import random
@@ -14,56 +16,30 @@ import logging
     # navigation - ships can swap positions
 
 
-def get_maxPosition(ship,hlt_map,planned_position, game):
-    max_value = [0.0,1.0,2.0]
-    max_key = {0.0:(0,0),1.0:(0,0),2.0:(0,0)}
-    for k in hlt_map:
-        min_max = min(max_value)
-        if k not in planned_position and hlt_map[k] > min_max:
-            if hlt_map[k] not in max_key:
-                max_key[hlt_map[k]] = k
-                min_idx = max_value.index(min(max_value))
-                max_value[min_idx] = hlt_map[k]
-            else:
-                c = 0.01
-                while hlt_map[k]+c in max_key:
-                    c += c
-                max_key[hlt_map[k]+c] = k
-                min_idx = max_value.index(min(max_value))
-                max_value[min_idx] = hlt_map[k]+c 
-            del max_key[min_max]
-                    
+def get_maxPosition(ship,targets,planned_position, game):
     max_reward = 10000
     desired_position = ship.position
 
-    for key, position in max_key.items():
-        p = hlt.Position(position[0], position[1])
+    for p in targets.best(3, planned_position):
+        value = targets.value(p)
+        if value <= 0:
+            continue
         nav = game.game_map.aStar_plan(ship.position,p)
-        home_nav = game.game_map.aStar_plan(p,me.shipyard.position)
-        position_cost = (nav['cost']+home_nav['cost'])/hlt_map[position]
+        home_cost = game.game_map.home_field(me).cost(p)
+        position_cost = (nav['cost']+home_cost)/value
         if position_cost < max_reward:
             max_reward = position_cost
             desired_position = p
     return desired_position
 
 
-def scoreMap(game,start,curPoint,radius=5,hlt_map={}):
+def scoreMap(game,positions,radius=5):
     gm = game.game_map
-    directions = curPoint.get_surrounding_cardinals()
-    for d in directions:
-        d = gm.normalize(d)
-        pos = (d.x,d.y)
-        dist = gm.calculate_distance(start,d)
-        if dist > radius:
-            return hlt_map
-        elif pos not in hlt_map:
-            amount = 0
-            if gm[d].structure == None:
-                amount = gm[d].halite_amount
-                # gm[d].mark_safe()
-            hlt_map[pos] = amount
-            htl_map = scoreMap(game,game.me.shipyard.position,d,radius,hlt_map)
-    return hlt_map
+    cells, halite = gm.halite_within_many(positions, radius)
+    # cells with a structure are worth nothing
+    halite = halite * (gm.structure_owner.reshape(-1)[cells] < 0)
+    return {(cell % gm.width, cell // gm.width): amount
+            for cell, amount in zip(cells.ravel().tolist(), halite.ravel().tolist())}
 
 
 # This game object contains the initial game state.
@@ -72,8 +48,10 @@ if game.game_map.width > game.game_map.height:
     r =  game.game_map.width/4
 else:
     r = game.game_map.height/4
-hlt_map = scoreMap(game,game.me.shipyard.position,game.me.shipyard.position,r)
-ship_status = {}
+targets = TargetIndex(game.game_map)
+for key, amount in scoreMap(game,[game.me.shipyard.position],r).items():
+    targets.track(hlt.Position(key[0], key[1]), amount)
+dropoff_sites = DropoffSites(game.game_map, r/2)
 
 initial_moveCost = 1
 end_moveCost = 30
@@ -84,10 +62,6 @@ b = initial_moveCost*math.exp(-m)
 # pre compute needed stuff here before intializing game
 # Respond with your name. 
 game.ready("pyBot")
-mission = {}
-next_location = {}
-prev_location = {}
-current_location = {}
 built_drop = False
 
 
@@ -109,113 +83,97 @@ while True:
 
     # A command queue holds all the commands you will run this turn.
     command_queue = []
-    planned_position = []
+    planned_position = set()
+    targets.refresh()
     shipyard_attack = False
+    # the dropoff is built by a ship far enough from the shipyard once it can be paid for; of the
+    # ships that qualify, the one standing on the best site builds it
+    builder = None
+    if not built_drop:
+        dropoff_sites.refresh()
+        site_scores = dropoff_sites.scores(me, (4/3)*r)
+        best_score = -math.inf
+        for ship in me.get_ships():
+            score = site_scores[ship.position.y, ship.position.x]
+            if (me.halite_amount+ship.halite_amount) > y2*constants.DROPOFF_COST and game_map.calculate_distance(ship.position,me.shipyard.position) >= (4/3)*r and score > best_score:
+                builder = ship
+                best_score = score
+
+    # The halite on every ship's cell and the ring around it, so the tracked region
+    # only grows by the cells the ships reach
+    ship_map = scoreMap(game,[ship.position for ship in me.get_ships()],1)
+    for key, amount in ship_map.items():
+        targets.track(hlt.Position(key[0], key[1]), amount)
+
+    # ships keep their status, mission and last position on themselves from turn to turn
+    for ship_id in me.spawned_ships:
+        ship = me.get_ship(ship_id)
+        ship.status = "exploring"
+        ship.mission = None
+        ship.last_position = None
 
     for ship in me.get_ships():
-        ship_map = scoreMap(game,ship.position,ship.position)
-        ship_map[(ship.position.x,ship.position.y)] = game_map[ship.position].halite_amount
-        for key in ship_map:
-            hlt_map[key] = ship_map[key]
-
-        if ship.id not in ship_status:
-            ship_status[ship.id] = "exploring"  
-
         if (constants.MAX_TURNS - game.turn_number - 16) <= game_map.calculate_distance(ship.position,me.shipyard.position):
-            ship_status[ship.id] = "end of game"
+            ship.status = "end of game"
         elif ship.halite_amount >= constants.MAX_HALITE *0.70:
-            ship_status[ship.id] = "returning"
-            if ship.id in mission:
-                del mission[ship.id]
+            ship.status = "returning"
+            ship.mission = None
 
-        if (me.halite_amount+ship.halite_amount) > y2*constants.DROPOFF_COST and game_map.calculate_distance(ship.position,me.shipyard.position) >= (4/3)*r and not built_drop:
+        if ship is builder:
                 built_drop = True
                 command_queue.append(ship.make_dropoff())
-                logging.info("Ship {} is being turned into a dropoff.".format(ship.id))
-        elif ship_status[ship.id] == "exploring":
-            if ship.id not in mission:
-                maxP = get_maxPosition(ship,hlt_map,planned_position,game)
+                logging.info("Ship %s is being turned into a dropoff.", ship.id)
+        elif ship.status == "exploring":
+            if ship.mission is None:
+                maxP = get_maxPosition(ship,targets,planned_position,game)
             # if game_map[maxP].halite_amount > y*game_map[ship.position].halite_amount:
-                move = game_map.aStar_navigate(ship, maxP)
-
-                next_ = ship.position + hlt.Position(move[0],move[1])
-                next_location[ship.id] = (next_.x,next_.y)
-                if game.turn_number > 1 and ship.id in current_location:
-                    prev_location[ship.id] = current_location[ship.id]
-                    if prev_location[ship.id] == next_location[ship.id]:
-                        move = (0,0)
-                current_location[ship.id] = (ship.position.x,ship.position.y)
+                # don't step back onto the cell the ship came from
+                avoid = [ship.last_position] if ship.last_position is not None else []
+                move = game_map.space_time_navigate(ship, maxP, avoid=avoid)
+                ship.last_position = ship.position
 
                 command_queue.append(ship.move(move))
-                planned_position.append((maxP.x,maxP.y))
-                mission[ship.id] = (maxP.x,maxP.y)                
+                planned_position.add(maxP)
+                ship.mission = maxP
                 
             else:
-                maxP = hlt.Position(mission[ship.id][0],mission[ship.id][1])
-                move = game_map.aStar_navigate(ship, maxP)
+                maxP = ship.mission
+                move = game_map.space_time_navigate(ship, maxP)
                 command_queue.append(ship.move(move))
-                planned_position.append(mission[ship.id])
+                planned_position.add(maxP)
                 if game_map[maxP].halite_amount <= 15:
-                    del mission[ship.id]
-            logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                ship.id, ship.halite_amount, ship_status[ship.id], maxP, ship.position, move))
+                    ship.mission = None
+            logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                ship.id, ship.halite_amount, ship.status, maxP, ship.position, move)
 
-        elif ship_status[ship.id] == "returning":
+        elif ship.status == "returning":
             for dropoff in me.get_dropoffs():
                 if ship.position == dropoff.position:
-                    ship_status[ship.id] = "exploring"
+                    ship.status = "exploring"
 
             if ship.position == me.shipyard.position:
-                ship_status[ship.id] = "exploring"
+                ship.status = "exploring"
 
             else:
-                curCost = 10000000
-                for dropoff in me.get_dropoffs():
-                    newDropoff = game_map.aStar_plan(ship.position, dropoff.position)
-                    newCost = newDropoff['cost']
-                    if newCost < curCost:
-                        curCost = newCost
-                        drop = dropoff
-
-                shipyardNav = game_map.aStar_plan(ship.position, me.shipyard.position)
-                shipyardCost = shipyardNav['cost']
-
-                if shipyardCost < curCost:
-                    return_location = me.shipyard
-                else:
-                    return_location = drop
+                return_location = game_map.home_field(me).structure(ship.position)
 
                 crash = False
                 if game_map[return_location.position].is_occupied  and game_map[return_location.position].ship.owner != me.id and not shipyard_attack:
                     crash = True
                     shipyard_attack = True
-                move = game_map.aStar_navigate(ship, return_location.position, crash)
+                move = game_map.space_time_navigate(ship, return_location.position, crash)
                 command_queue.append(ship.move(move))
-                logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                    ship.id, ship.halite_amount, ship_status[ship.id], return_location.position, ship.position, move))
+                logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                    ship.id, ship.halite_amount, ship.status, return_location.position, ship.position, move)
 
-        elif ship_status[ship.id] == "end of game":
-            curCost = 10000000
-            for dropoff in me.get_dropoffs():
-                newDropoff = game_map.aStar_plan(ship.position, dropoff.position)
-                newCost = newDropoff['cost']
-                if newCost < curCost:
-                    curCost = newCost
-                    drop = dropoff
-
-            shipyardNav = game_map.aStar_plan(ship.position, me.shipyard.position)
-            shipyardCost = shipyardNav['cost']
-
-            if shipyardCost < curCost:
-                return_location = me.shipyard
-            else:
-                return_location = drop
+        elif ship.status == "end of game":
+            return_location = game_map.home_field(me).structure(ship.position)
 
-            move = game_map.aStar_navigate(ship, return_location.position,True)
+            move = game_map.space_time_navigate(ship, return_location.position,True)
             command_queue.append(ship.move(move))
             # planned_position.append((ship.position.x,ship.position.y))
-            logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                    ship.id, ship.halite_amount, ship_status[ship.id], return_location.position, ship.position, move))
+            logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                    ship.id, ship.halite_amount, ship.status, return_location.position, ship.position, move)
 
 
     # If you're on the first turn and have enough halite, spawn a ship. 10*(len(me.get_dropoffs())+1) >= len(me.get_ships())
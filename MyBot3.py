@@ -46,21 +46,13 @@ def get_maxPosition(ship,hlt_map,planned_position, game):
     return desired_position
 
 
-def scoreMap(game,start,curPoint,radius=5,hlt_map={}):
+def scoreMap(game,positions,radius=5):
     gm = game.game_map
-    directions = curPoint.get_surrounding_cardinals()
-    for d in directions:
-        d = gm.normalize(d)
-        pos = (d.x,d.y)
-        dist = gm.calculate_distance(start,d)
-        if dist > radius:
-            return hlt_map
-        elif pos not in hlt_map:
-            if gm[d].structure == None:
-                amount = gm[d].halite_amount
-            hlt_map[pos] = amount
-            htl_map = scoreMap(game,game.me.shipyard.position,d,radius,hlt_map)
-    return hlt_map
+    cells, halite = gm.halite_within_many(positions, radius)
+    # cells with a structure are worth nothing
+    halite = halite * (gm.structure_owner.reshape(-1)[cells] < 0)
+    return {(cell % gm.width, cell // gm.width): amount
+            for cell, amount in zip(cells.ravel().tolist(), halite.ravel().tolist())}
 
 
 # This game object contains the initial game state.
@@ -69,7 +61,7 @@ if game.game_map.width > game.game_map.height:
     r =  game.game_map.width/4
 else:
     r = game.game_map.height/4
-hlt_map = scoreMap(game,game.me.shipyard.position,game.me.shipyard.position,r)
+hlt_map = scoreMap(game,[game.me.shipyard.position],r)
 ship_status = {}
 
 initial_moveCost = 10
@@ -99,12 +91,13 @@ while True:
     next_position = []
     shipyard_attack = False
 
-    for ship in me.get_ships():
-        ship_map = scoreMap(game,ship.position,ship.position)
-        ship_map[(ship.position.x,ship.position.y)] = game_map[ship.position].halite_amount
-        for key in ship_map:
-            hlt_map[key] = ship_map[key]
+    # The halite on every ship's cell and the ring around it, so the tracked region
+    # only grows by the cells the ships reach
+    ship_map = scoreMap(game,[ship.position for ship in me.get_ships()],1)
+    for key in ship_map:
+        hlt_map[key] = ship_map[key]
 
+    for ship in me.get_ships():
         if ship.id not in ship_status:
             ship_status[ship.id] = "exploring"  
 
@@ -126,8 +119,8 @@ while True:
                 move = 'staying still'
                 command_queue.append(ship.stay_still())
                 planned_position.append((ship.position.x,ship.position.y))
-            logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                ship.id, ship.halite_amount, ship_status[ship.id], maxP, ship.position, move))
+            logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                ship.id, ship.halite_amount, ship_status[ship.id], maxP, ship.position, move)
 
         elif ship_status[ship.id] == "returning":
             if ship.position == me.shipyard.position:
@@ -146,15 +139,15 @@ while True:
                 nav = game_map.aStar_navigate(ship, me.shipyard.position, crash)
                 move = nav['move'] # game_map.naive_navigate(ship, me.shipyard.position)
                 command_queue.append(ship.move(move))
-                logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move))
+                logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move)
 
         elif ship_status[ship.id] == "end of game":
             nav = game_map.aStar_navigate(ship, me.shipyard.position,True)
             move = nav['move']
             command_queue.append(ship.move(move))
-            logging.info("Ship {} has {} halite and is {} to {} from {} by moving {}.".format(
-                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move))
+            logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                    ship.id, ship.halite_amount, ship_status[ship.id], me.shipyard.position, ship.position, move)
 
 
     # If you're on the first turn and have enough halite, spawn a ship. 
@@ -0,0 +1,4 @@
+"""
+Micro-benchmarks for the hlt hot paths. Run a module with e.g.
+python -m benchmarks.bench_astar
+"""
@@ -0,0 +1,104 @@
+"""
+Compares GameMap.aStar_plan against the dict scanning A* it replaced.
+
+    python -m benchmarks.bench_astar [--pairs N]
+"""
+
+import argparse
+import time
+
+from hlt import constants
+from hlt.positionals import Position
+
+from . import synthetic
+
+
+def legacy_aStar_plan(game_map, source, destination, end_game=False):
+    """
+    The previous aStar_plan, which selects the next node by scanning the whole open set.
+    """
+    openset = set()
+    closedset = set()
+    current = (source.x, source.y)
+    goal = (destination.x, destination.y)
+    openset.add(current)
+    movement_cost = {current: 0}
+    hueristic_cost = {current: game_map.calculate_distance(source, destination)}
+    total_cost = {current: game_map.calculate_distance(source, destination)}
+    parent = {current: None}
+
+    while openset:
+        min_cost = min(total_cost.values())
+        current = [k for k, v in total_cost.items() if v == min_cost]
+        current = current[0]
+        if current == goal:
+            path = []
+            cost = 0
+            while parent[current]:
+                cost = movement_cost[current] + cost
+                path.append(current)
+                current = parent[current]
+            if not path:
+                return {'move': (0, 0), 'cost': 0}
+            path = path[::-1]
+            direction = game_map.normalize_direction(Position(path[0][0], path[0][1]) - source)
+            return {'move': (direction.x, direction.y), 'cost': cost}
+
+        openset.remove(current)
+        del total_cost[current]
+        closedset.add(current)
+        current_position = Position(current[0], current[1])
+        for d in current_position.get_surrounding_cardinals():
+            d = game_map.normalize(d)
+            if game_map[d].is_occupied:
+                if not (end_game and game_map[d].has_structure):
+                    if game_map.calculate_distance(source, d) < 2:
+                        continue
+            node = (d.x, d.y)
+            if node in closedset:
+                continue
+            new_g = movement_cost[current] + (1/constants.MOVE_COST_RATIO)*game_map[current_position].halite_amount
+            if node in openset:
+                if movement_cost[node] > new_g:
+                    movement_cost[node] = new_g
+                    total_cost[node] = movement_cost[node] + hueristic_cost[node]
+                    parent[node] = current
+            else:
+                movement_cost[node] = new_g
+                hueristic_cost[node] = game_map.calculate_distance(d, destination)
+                total_cost[node] = movement_cost[node] + hueristic_cost[node]
+                parent[node] = current
+                openset.add(node)
+    return {'move': (0, 0), 'cost': 0}
+
+
+def time_calls(plan, pairs):
+    """
+    :return: The mean seconds per call of plan over the (source, destination) pairs
+    """
+    start = time.perf_counter()
+    for source, destination in pairs:
+        plan(source, destination)
+    return (time.perf_counter() - start) / len(pairs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pairs', type=int, default=20, help='source/destination pairs per map size')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[32, 48, 64])
+    args = parser.parse_args()
+
+    synthetic.load_default_constants()
+    print('{:>5} {:>12} {:>12} {:>8}'.format('size', 'legacy ms', 'heap ms', 'speedup'))
+    for size in args.sizes:
+        game_map = synthetic.make_game_map(size, num_ships=size, seed=size)
+        sources = synthetic.random_positions(size, args.pairs, seed=1)
+        destinations = synthetic.random_positions(size, args.pairs, seed=2)
+        pairs = list(zip(sources, destinations))
+        legacy = time_calls(lambda s, d: legacy_aStar_plan(game_map, s, d), pairs)
+        heap = time_calls(lambda s, d: game_map.path_cache.clear() or game_map.aStar_plan(s, d), pairs)
+        print('{:>5} {:>12.3f} {:>12.3f} {:>7.1f}x'.format(size, legacy * 1000, heap * 1000, legacy / heap))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Measures how many games per second sim.batch plays as the batch grows, and runs a
+small sweep of GreedyPolicy's return_ratio knob against its default in one batch.
+
+    python -m benchmarks.bench_batch [--size N] [--batches B ...]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from sim.batch import BatchGames, play
+from sim.policies import GreedyPolicy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=32)
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 16, 128, 512])
+    parser.add_argument('--ratios', type=float, nargs='+', default=[0.5, 0.6, 0.7, 0.8, 0.9])
+    parser.add_argument('--games-per-ratio', type=int, default=64)
+    args = parser.parse_args()
+
+    print('{:>6} {:>10} {:>10}'.format('games', 'seconds', 'games/s'))
+    for num_games in args.batches:
+        batch = BatchGames.generate(num_games, args.size, seed=0)
+        start = time.perf_counter()
+        play(batch, [GreedyPolicy(), GreedyPolicy()])
+        elapsed = time.perf_counter() - start
+        print('{:>6} {:>10.2f} {:>10.1f}'.format(num_games, elapsed, num_games / elapsed))
+
+    ratios = np.repeat(args.ratios, args.games_per_ratio)
+    batch = BatchGames.generate(len(ratios), args.size, seed=0)
+    ranks = play(batch, [GreedyPolicy(return_ratio=ratios), GreedyPolicy()])
+    print('\n{:>12} {:>10} {:>10}'.format('return_ratio', 'win rate', 'halite'))
+    for ratio in args.ratios:
+        games = ratios == ratio
+        print('{:>12.2f} {:>10.2f} {:>10.0f}'.format(ratio, (ranks[games, 0] == 1).mean(),
+                                                     batch.bank[games, 0].mean()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Times fleet.resolve_moves on crowded fleets and compares the total rank of the chosen
+moves (0 when every ship gets its first choice) against claiming cells ship by ship.
+
+    python -m benchmarks.bench_fleet [--ships N ...]
+"""
+
+import argparse
+import random
+import time
+
+from hlt.entity import Ship
+from hlt.fleet import resolve_moves
+from hlt.positionals import Direction, Position
+
+from . import synthetic
+
+
+def crowded_fleet(game_map, num_ships, seed):
+    """
+    Places ships densely around the middle of the map and ranks their moves towards the centre,
+    so most of them compete for the same cells.
+    :return: Dict mapping each ship to its ranked moves
+    """
+    rng = random.Random(seed)
+    centre = Position(game_map.width // 2, game_map.height // 2)
+    spread = int(num_ships ** 0.5)
+    ranked_moves = {}
+    while len(ranked_moves) < num_ships:
+        position = game_map.normalize(Position(centre.x + rng.randint(-spread, spread),
+                                               centre.y + rng.randint(-spread, spread)))
+        if game_map[position].is_occupied:
+            continue
+        ship = Ship(0, len(ranked_moves), position, 1000)
+        game_map[position].mark_unsafe(ship)
+        ranked_moves[ship] = None
+    for ship in ranked_moves:
+        ranked_moves[ship] = game_map.rank_moves(ship, centre)
+    return ranked_moves
+
+
+def claim_sequentially(game_map, ranked_moves):
+    """
+    Every ship in turn takes its best move onto a cell no one has claimed yet, or stays.
+    :return: Dict mapping each ship to its Direction tuple
+    """
+    claimed = set()
+    moves = {}
+    for ship, ranked in ranked_moves.items():
+        moves[ship] = Direction.Still
+        for direction in ranked:
+            target = game_map.directional_offset(ship.position, direction)
+            if target not in claimed and (direction == Direction.Still or not game_map[target].is_occupied):
+                moves[ship] = direction
+                break
+        claimed.add(game_map.directional_offset(ship.position, moves[ship]))
+    return moves
+
+
+def collisions(game_map, moves):
+    """
+    :return: How many ships end the turn on a cell with another ship
+    """
+    targets = [game_map.directional_offset(ship.position, direction) for ship, direction in moves.items()]
+    return len(targets) - len(set(targets))
+
+
+def rank_cost(ranked_moves, moves):
+    """
+    :return: The sum over all ships of the rank of their move, staying still ranking last if unlisted
+    """
+    return sum(ranked.index(moves[ship]) if moves[ship] in ranked else len(ranked)
+               for ship, ranked in ranked_moves.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ships', type=int, nargs='+', default=[25, 50, 100, 150])
+    parser.add_argument('--budget', type=float, default=0.05, help='seconds per turn for resolve_moves')
+    args = parser.parse_args()
+
+    synthetic.load_default_constants()
+    print('{:>6} {:>10} {:>11} {:>13} {:>12} {:>14}'.format(
+        'ships', 'solve ms', 'collisions', 'rank cost', 'sequential', 'seq collisions'))
+    for num_ships in args.ships:
+        game_map = synthetic.make_game_map(64, seed=num_ships)
+        ranked_moves = crowded_fleet(game_map, num_ships, seed=num_ships)
+        sequential = claim_sequentially(game_map, ranked_moves)
+        start = time.perf_counter()
+        moves = resolve_moves(game_map, ranked_moves, time_budget=args.budget)
+        elapsed = time.perf_counter() - start
+        print('{:>6} {:>10.2f} {:>11} {:>13} {:>12} {:>14}'.format(
+            num_ships, elapsed * 1000, collisions(game_map, moves), rank_cost(ranked_moves, moves),
+            rank_cost(ranked_moves, sequential), collisions(game_map, sequential)))
+
+
+if __name__ == '__main__':
+    main()
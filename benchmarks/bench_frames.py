@@ -0,0 +1,68 @@
+"""
+Times Game.update_frame with the line by line parser and with the bulk FrameReader.
+
+    python -m benchmarks.bench_frames [--input RECORDED_STDIN]
+
+Without --input, synthetic 64x64 four player late game input is used.
+"""
+
+import argparse
+import io
+import logging
+import sys
+import time
+
+from hlt.networking import Game
+
+from . import synthetic
+
+
+def time_frames(data, fast_input):
+    """
+    Replays engine input through a Game.
+    :param data: The raw engine input as bytes
+    :param fast_input: Whether the Game uses the bulk parser
+    :return: The seconds each update_frame call took
+    """
+    stdin = sys.stdin
+    sys.stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(data)))
+    try:
+        game = Game(fast_input=fast_input)
+        times = []
+        while True:
+            start = time.perf_counter()
+            try:
+                game.update_frame()
+            except EOFError:
+                return times
+            times.append(time.perf_counter() - start)
+    finally:
+        sys.stdin = stdin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', help='file holding the raw stdin of a recorded game')
+    parser.add_argument('--turns', type=int, default=200, help='frames of synthetic input')
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, 'rb') as f:
+            data = f.read()
+    else:
+        data = synthetic.engine_input(64, num_players=4, turns=args.turns, ships_per_player=60)
+    # Keep Game from logging to bot-<id>.log
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    line_times = time_frames(data, fast_input=False)
+    bulk_times = time_frames(data, fast_input=True)
+    line_mean = sum(line_times) / len(line_times)
+    bulk_mean = sum(bulk_times) / len(bulk_times)
+    print('{} frames'.format(len(line_times)))
+    print('line by line: {:8.3f} ms/turn (max {:.3f})'.format(line_mean * 1000, max(line_times) * 1000))
+    print('bulk:         {:8.3f} ms/turn (max {:.3f})'.format(bulk_mean * 1000, max(bulk_times) * 1000))
+    print('speedup:      {:8.1f}x'.format(line_mean / bulk_mean))
+
+
+if __name__ == '__main__':
+    main()
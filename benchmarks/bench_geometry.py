@@ -0,0 +1,121 @@
+"""
+Compares the table based distance and navigation helpers of GameMap against
+the Position arithmetic they replaced, in time and Position allocations per call.
+
+    python -m benchmarks.bench_geometry [--calls N]
+"""
+
+import argparse
+import contextlib
+import time
+
+from hlt import constants
+from hlt.entity import Ship
+from hlt.positionals import Direction, Position
+
+from . import synthetic
+
+
+def legacy_calculate_distance(game_map, source, target):
+    resulting_position = abs(source - target)
+    return min(resulting_position.x, game_map.width - resulting_position.x) + \
+        min(resulting_position.y, game_map.height - resulting_position.y)
+
+
+def legacy_get_safe_moves(game_map, source, destination):
+    possible_moves = []
+    distance = abs(destination - source)
+    y_cardinality, x_cardinality = game_map._get_target_direction(source, destination)
+    if distance.x != 0:
+        possible_moves.append(x_cardinality if distance.x < (game_map.width / 2)
+                              else Direction.invert(x_cardinality))
+    if distance.y != 0:
+        possible_moves.append(y_cardinality if distance.y < (game_map.height / 2)
+                              else Direction.invert(y_cardinality))
+    return possible_moves
+
+
+def legacy_naive_navigate(game_map, ship, destination):
+    if ship.halite_amount >= (1/constants.MOVE_COST_RATIO)*game_map[ship.position].halite_amount and \
+            not game_map[ship.position].has_structure:
+        for direction in legacy_get_safe_moves(game_map, ship.position, destination):
+            target_pos = ship.position.directional_offset(direction)
+            if not game_map[target_pos].is_occupied:
+                game_map[target_pos].mark_unsafe(ship)
+                game_map[ship.position].mark_safe()
+                return direction
+    return Direction.Still
+
+
+@contextlib.contextmanager
+def count_positions():
+    """
+    Counts the Position objects created inside the block.
+    :return: A one item list holding the count
+    """
+    count = [0]
+    init = Position.__init__
+
+    def counting_init(self, *args):
+        count[0] += 1
+        init(self, *args)
+
+    Position.__init__ = counting_init
+    try:
+        yield count
+    finally:
+        Position.__init__ = init
+
+
+def measure(function, calls):
+    """
+    :param function: Callable taking the index of the call
+    :return: (seconds per call, Positions allocated per call)
+    """
+    with count_positions() as count:
+        for index in range(calls):
+            function(index)
+    start = time.perf_counter()
+    for index in range(calls):
+        function(index)
+    return (time.perf_counter() - start) / calls, count[0] / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    parser.add_argument('--size', type=int, default=64)
+    args = parser.parse_args()
+
+    synthetic.load_default_constants()
+    size = args.size
+    sources = synthetic.random_positions(size, args.calls, seed=1)
+    targets = synthetic.random_positions(size, args.calls, seed=2)
+    ships = [Ship(0, index, position, 1000) for index, position in enumerate(sources)]
+    distance_map = synthetic.make_game_map(size, num_ships=size, seed=size)
+
+    def navigation(navigate):
+        game_map = synthetic.make_game_map(size, num_ships=size, seed=size)
+        return lambda i: navigate(game_map, ships[i], targets[i])
+
+    cases = [
+        ('calculate_distance',
+         lambda i: legacy_calculate_distance(distance_map, sources[i], targets[i]),
+         lambda i: distance_map.calculate_distance(sources[i], targets[i])),
+        ('get_safe_moves',
+         lambda i: legacy_get_safe_moves(distance_map, sources[i], targets[i]),
+         lambda i: distance_map.get_safe_moves(sources[i], targets[i])),
+        ('naive_navigate',
+         navigation(legacy_naive_navigate),
+         navigation(lambda game_map, ship, target: game_map.naive_navigate(ship, target))),
+    ]
+    print('{:<20} {:>10} {:>10} {:>12} {:>12}'.format('', 'legacy us', 'table us', 'legacy alloc', 'table alloc'))
+    for name, legacy, table in cases:
+        legacy_time, legacy_allocations = measure(legacy, args.calls)
+        table_time, table_allocations = measure(table, args.calls)
+        print('{:<20} {:>10.3f} {:>10.3f} {:>12.2f} {:>12.2f}'.format(
+            name, legacy_time * 1e6, table_time * 1e6, legacy_allocations, table_allocations))
+
+
+if __name__ == '__main__':
+    main()
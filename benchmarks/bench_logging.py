@@ -0,0 +1,77 @@
+"""
+Times the per ship logging call of the bots with logging.basicConfig and with logs.start.
+
+    python -m benchmarks.bench_logging [--turns 200] [--ships 60]
+
+Each mode runs in a fresh process, since both configure the root logger once.
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from hlt import logs
+from hlt.positionals import Position
+
+
+def time_turns(turns, ships, rate_limit):
+    """
+    Logs like MyBot.py does for a number of turns.
+    :param rate_limit: The logs.RateLimitFilter, or None with logging.basicConfig
+    :return: The seconds each turn spent logging
+    """
+    times = []
+    for turn in range(1, turns + 1):
+        start = time.perf_counter()
+        if rate_limit is not None:
+            rate_limit.start_turn(turn)
+        logging.info("=============== TURN %03d ================", turn)
+        for ship in range(ships):
+            logging.info("Ship %s has %s halite and is %s to %s from %s by moving %s.",
+                         ship, 500, "exploring", Position(ship % 64, turn % 64), Position(ship % 64, 0), (0, -1))
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_mode(mode, turns, ships, directory):
+    """
+    Times one logging mode in this process.
+    :param mode: 'basic', 'async' or 'sampled', the latter keeping one in ten ship records
+    :return: nothing.
+    """
+    filename = os.path.join(directory, 'bench-{}.log'.format(mode))
+    rate_limit = None
+    if mode == 'basic':
+        logging.basicConfig(filename=filename, filemode="w", level=logging.DEBUG)
+    else:
+        rate_limit = logs.start(0, filename)
+        if mode == 'sampled':
+            rate_limit.sample('root', 10)
+    times = time_turns(turns, ships, rate_limit)
+    print('{:<8} {:8.3f} ms/turn (max {:.3f})'.format(mode, sum(times) / len(times) * 1000, max(times) * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--turns', type=int, default=200)
+    parser.add_argument('--ships', type=int, default=60)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    parser.add_argument('--directory', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.turns, args.ships, args.directory)
+        return
+    print('{} turns of {} ship records'.format(args.turns, args.ships))
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ('basic', 'async', 'sampled'):
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_logging', '--turns', str(args.turns),
+                            '--ships', str(args.ships), '--mode', mode, '--directory', directory], check=True)
+
+
+if __name__ == '__main__':
+    main()
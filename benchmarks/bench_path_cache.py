@@ -0,0 +1,73 @@
+"""
+Measures how much the GameMap path cache saves when ships keep their targets
+for many turns while the halite under a few of them changes every turn.
+
+    python -m benchmarks.bench_path_cache [--turns N] [--ships N]
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from hlt.entity import Ship
+from hlt.pathfinding import PathCache
+from hlt.positionals import Position
+
+from . import synthetic
+
+
+class DisabledPathCache(PathCache):
+    """A PathCache that never stores anything."""
+    def put(self, start, goal, end_game, result):
+        pass
+
+
+def play(size, num_ships, turns, cache):
+    """
+    Moves ships towards fixed targets with aStar_navigate, retargeting ships that arrive.
+    Every turn the halite of a few random cells changes.
+    :return: (seconds per turn, the map's path cache)
+    """
+    rng = random.Random(size)
+    game_map = synthetic.make_game_map(size, seed=size)
+    game_map.path_cache = cache
+    positions = synthetic.random_positions(size, num_ships, seed=1)
+    ships = [Ship(0, index, position, 1000) for index, position in enumerate(positions)]
+    targets = synthetic.random_positions(size, num_ships, seed=2)
+    elapsed = 0
+
+    for _ in range(turns):
+        changed = [(rng.randrange(size), rng.randrange(size), rng.randint(0, 1000)) for _ in range(num_ships // 4)]
+        game_map._update(np.array(changed, dtype=np.int64).reshape(-1, 3))
+        for ship in ships:
+            game_map[ship.position].mark_unsafe(ship)
+
+        start = time.perf_counter()
+        for index, ship in enumerate(ships):
+            move = game_map.aStar_navigate(ship, targets[index])
+            ship.position = game_map.directional_offset(ship.position, move)
+            if ship.position == targets[index]:
+                targets[index] = Position(rng.randrange(size), rng.randrange(size))
+        elapsed += time.perf_counter() - start
+    return elapsed / turns, game_map.path_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=64)
+    parser.add_argument('--ships', type=int, default=60)
+    parser.add_argument('--turns', type=int, default=50)
+    args = parser.parse_args()
+
+    synthetic.load_default_constants()
+    uncached, _ = play(args.size, args.ships, args.turns, DisabledPathCache())
+    cached, cache = play(args.size, args.ships, args.turns, PathCache())
+    print('without cache: {:8.2f} ms/turn'.format(uncached * 1000))
+    print('with cache:    {:8.2f} ms/turn'.format(cached * 1000))
+    print('hits {}, misses {}, invalidated suffixes {}'.format(cache.hits, cache.misses, cache.invalidations))
+
+
+if __name__ == '__main__':
+    main()
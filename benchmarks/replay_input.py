@@ -0,0 +1,111 @@
+"""
+Feeds engine input recorded with HLT_RECORD_INPUT (see hlt.recording) back to a bot at full
+speed and times every turn of it.
+
+    python -m benchmarks.replay_input RECORDING [--bot MyBot.py] [--repeat 3] [--commands FILE] [--check FILE]
+
+The bot runs in this process with the recording as its stdin, so the time between two lines of
+commands is exactly the bot's own work on a turn: parsing the frame, planning and sending.
+The frames don't react to the bot's commands, so a changed bot is timed on the same positions.
+--commands writes the commands the bot sent, and --check compares them with such a file, to
+catch planner changes that alter the bot's play.
+"""
+
+import argparse
+import io
+import logging
+import sys
+import time
+
+
+class _TimedOutput:
+    """
+    Stands in for sys.stdout and notes when each line of commands is written.
+    """
+    def __init__(self):
+        self.lines = []
+        self.times = []
+        self._partial = ''
+
+    def write(self, text):
+        lines = (self._partial + text).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self.lines.append(line)
+            self.times.append(time.perf_counter())
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def run_bot(bot, data):
+    """
+    Runs a bot script on recorded input until the input runs out.
+    :param bot: The path of the bot script
+    :param data: The recorded input as bytes
+    :return: (the lines the bot sent, the seconds it took to start up, the seconds of each turn)
+    """
+    with open(bot) as script:
+        code = compile(script.read(), bot, 'exec')
+    stdin, stdout = sys.stdin, sys.stdout
+    sys.stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(data)))
+    sys.stdout = output = _TimedOutput()
+    start = time.perf_counter()
+    try:
+        exec(code, {'__name__': '__main__', '__file__': bot})
+    except (EOFError, SystemExit):
+        pass
+    finally:
+        sys.stdin, sys.stdout = stdin, stdout
+    times = [start] + output.times
+    return output.lines, times[1] - times[0], [end - begin for begin, end in zip(times[1:], times[2:])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('recording', help='file written by a bot run with HLT_RECORD_INPUT')
+    parser.add_argument('--bot', default='MyBot.py')
+    parser.add_argument('--repeat', type=int, default=3, help='runs, of which each turn keeps its fastest')
+    parser.add_argument('--commands', help='file to write the commands of the bot to')
+    parser.add_argument('--check', help='file of commands written by --commands to compare with')
+    args = parser.parse_args()
+
+    with open(args.recording, 'rb') as f:
+        data = f.read()
+    # Keep the bot from logging to bot-<id>.log
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    runs = [run_bot(args.bot, data) for _ in range(args.repeat)]
+    lines = runs[0][0]
+    startup = min(run[1] for run in runs)
+    turns = [min(times) for times in zip(*(run[2] for run in runs))]
+    ordered = sorted(turns)
+
+    print('{} turns of {}, fastest of {} runs'.format(len(turns), args.bot, args.repeat))
+    print('startup: {:8.3f} ms'.format(startup * 1000))
+    if turns:
+        print('mean:    {:8.3f} ms/turn'.format(sum(turns) / len(turns) * 1000))
+        print('median:  {:8.3f} ms/turn'.format(ordered[len(ordered) // 2] * 1000))
+        print('p95:     {:8.3f} ms/turn'.format(ordered[int(len(ordered) * 0.95)] * 1000))
+        print('max:     {:8.3f} ms/turn (turn {})'.format(ordered[-1] * 1000, turns.index(ordered[-1]) + 1))
+        print('total:   {:8.3f} s'.format(sum(turns)))
+
+    if any(run[0] != lines for run in runs):
+        print('the bot sent different commands on different runs')
+    if args.commands:
+        with open(args.commands, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+    if args.check:
+        with open(args.check) as f:
+            expected = f.read().splitlines()
+        differing = [turn for turn, (sent, wanted) in enumerate(zip(lines, expected)) if sent != wanted]
+        if differing or len(lines) != len(expected):
+            print('commands differ from {} from turn {} on'.format(
+                args.check, differing[0] if differing else min(len(lines), len(expected))))
+            sys.exit(1)
+        print('commands match {}'.format(args.check))
+
+
+if __name__ == '__main__':
+    main()
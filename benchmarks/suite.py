@@ -0,0 +1,375 @@
+"""
+Benchmark suite of the hlt hot paths and the strategy helpers of MyBot.py, with regression checks
+against JSON baselines.
+
+    python -m benchmarks.suite [--sizes 32 64] [--players 2 4] [--save] [--threshold 0.25]
+
+Every benchmark runs on synthetic games of every map size with 2 and 4 players, with ship counts
+in the range of real games. Each is timed --repeat times and keeps its fastest time per call.
+The times are compared with benchmarks/baseline.json, both in seconds and relative to a fixed
+pure Python workload timed alongside them, and the run fails if any of them is slower than its
+baseline by more than the threshold in both. The threshold of a benchmark is widened by its
+spread, how far its median timing was above its fastest, in the baseline or in the run, so
+benchmarks that are noisy on the machine don't fail on noise alone. Benchmarks that look slower
+are timed again before the run fails. --save stores the times and spreads as the new baseline.
+
+Baselines only compare runs on the same machine: record one with --save before changing code.
+"""
+
+import argparse
+import ast
+import functools
+import io
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+
+import hlt
+from hlt import pathfinding
+from hlt.game_map import GameMap
+from hlt.networking import Game
+from hlt.positionals import Position
+from hlt.targeting import TargetIndex
+
+from . import synthetic
+
+"""The map sizes the engine plays on."""
+SIZES = (32, 40, 48, 56, 64)
+
+"""The player counts the engine plays with."""
+PLAYER_COUNTS = (2, 4)
+
+"""The default baseline file."""
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+"""The bot whose strategy helpers are benchmarked, and the helpers."""
+STRATEGY_BOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'MyBot.py')
+STRATEGY_HELPERS = ('scoreMap', 'get_maxPosition')
+
+"""Frames of engine input per synthetic game."""
+TURNS = 20
+
+
+def ships_per_player(size, num_players):
+    """
+    :return: A mid-game fleet size per player for a map size and player count
+    """
+    return size // 2 if num_players == 2 else size // 3
+
+
+def load_helpers(path, names, namespace):
+    """
+    Loads functions from a bot script without running the script's game loop.
+    :param path: The bot script
+    :param names: The names of the functions to load
+    :param namespace: The globals the functions run with, which the script's imports are added to
+    :return: Dict of name to function
+    """
+    with open(path) as script:
+        tree = ast.parse(script.read(), path)
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)) or
+                 isinstance(node, ast.FunctionDef) and node.name in names]
+    exec(compile(tree, path, 'exec'), namespace)
+    return {name: namespace[name] for name in names}
+
+
+class _Stdin:
+    """
+    Context manager binding sys.stdin to a stream for line by line Game input.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+        self._saved = None
+
+    def __enter__(self):
+        self._saved = sys.stdin
+        sys.stdin = self._stream
+
+    def __exit__(self, *exc_info):
+        sys.stdin = self._saved
+
+
+def game_with_input(size, num_players, fast_input, seed=0):
+    """
+    :return: (Game, its stdin stream) over TURNS frames of synthetic input, with the pre-game input read
+    """
+    data = synthetic.engine_input(size, num_players, TURNS, ships_per_player(size, num_players), seed)
+    stream = io.TextIOWrapper(io.BufferedReader(io.BytesIO(data)))
+    with _Stdin(stream):
+        game = Game(fast_input=fast_input)
+    return game, stream
+
+
+def game_in_progress(size, num_players, seed=0):
+    """
+    :return: A Game that has read its first turn, with the deadline switched off
+    """
+    game, stream = game_with_input(size, num_players, fast_input=False, seed=seed)
+    with _Stdin(stream):
+        game.update_frame()
+    game.game_map.deadline = None
+    return game
+
+
+def benchmarks(size, num_players):
+    """
+    :param size: The width and height of the map
+    :param num_players: The number of players
+    :return: List of (name, setup) pairs, where setup() returns (function taking a call index, number of calls)
+    """
+    rng = random.Random(size * 10 + num_players)
+    sources = [Position(rng.randrange(size), rng.randrange(size)) for _ in range(5000)]
+    targets = [Position(rng.randrange(size), rng.randrange(size)) for _ in range(5000)]
+    unbounded = [Position(rng.randrange(-size, 2 * size), rng.randrange(-size, 2 * size)) for _ in range(5000)]
+    map_data = synthetic.engine_input(size, num_players, 0, 0)
+    map_lines = map_data.decode().splitlines()[2 + num_players:]
+
+    def generate():
+        return lambda i: GameMap._generate(functools.partial(next, iter(map_lines))), 3
+
+    def update():
+        game, stream = game_with_input(size, num_players, fast_input=True)
+        frames = [game._frame_reader.read_frame(num_players) for _ in range(TURNS)]
+        return lambda i: game.game_map._update(frames[i].cells), TURNS
+
+    def update_frame(fast_input):
+        def setup():
+            game, stream = game_with_input(size, num_players, fast_input)
+
+            def call(i):
+                with _Stdin(stream):
+                    game.update_frame()
+            return call, TURNS
+        return setup
+
+    def geometry(call, calls=5000):
+        def setup():
+            game_map = game_in_progress(size, num_players).game_map
+            return functools.partial(call, game_map), calls
+        return setup
+
+    def navigation(navigate):
+        def setup():
+            game = game_in_progress(size, num_players)
+            ships = list(game.me.get_ships())
+            return lambda i: navigate(game.game_map, ships[i], targets[i]), len(ships)
+        return setup
+
+    def plan():
+        game_map = game_in_progress(size, num_players).game_map
+        game_map.path_cache = pathfinding.PathCache()
+        return lambda i: game_map.aStar_plan(sources[i], targets[i]), 30
+
+    def inspiration():
+        game_map = game_in_progress(size, num_players).game_map
+
+        def call(i):
+            # Drop the field of the turn so that every call computes it
+            game_map._inspiration = {}
+            game_map.inspiration(i % num_players)
+        return call, 20
+
+    def score_map():
+        game = game_in_progress(size, num_players)
+        helpers = load_helpers(STRATEGY_BOT, STRATEGY_HELPERS, {'game': game, 'me': game.me})
+        ships = list(game.me.get_ships())
+        return lambda i: helpers['scoreMap'](game, [ships[i].position], 5), len(ships)
+
+    def max_position():
+        game = game_in_progress(size, num_players)
+        namespace = {'game': game, 'me': game.me}
+        helpers = load_helpers(STRATEGY_BOT, STRATEGY_HELPERS, namespace)
+        shipyard = game.me.shipyard.position
+        index = TargetIndex(game.game_map)
+        for (x, y), halite in helpers['scoreMap'](game, [shipyard], size / 4).items():
+            index.track(hlt.Position(x, y), halite)
+        ships = list(game.me.get_ships())[:16]
+        return lambda i: helpers['get_maxPosition'](ships[i], index, set(), game), len(ships)
+
+    return [
+        ('GameMap._generate', generate),
+        ('GameMap._update', update),
+        ('Game.update_frame', update_frame(False)),
+        ('Game.update_frame fast', update_frame(True)),
+        ('calculate_distance', geometry(lambda game_map, i: game_map.calculate_distance(sources[i], targets[i]))),
+        ('normalize', geometry(lambda game_map, i: game_map.normalize(unbounded[i]))),
+        ('get_safe_moves', geometry(lambda game_map, i: game_map.get_safe_moves(sources[i], targets[i]))),
+        ('naive_navigate', navigation(lambda game_map, ship, target: game_map.naive_navigate(ship, target))),
+        ('aStar_plan', plan),
+        ('aStar_navigate', navigation(lambda game_map, ship, target: game_map.aStar_navigate(ship, target))),
+        ('GameMap.inspiration', inspiration),
+        ('scoreMap', score_map),
+        ('get_maxPosition', max_position),
+    ]
+
+
+def _reference_workload():
+    """
+    A fixed stretch of pure Python, timed next to every measurement.
+    :return: nothing.
+    """
+    table = {}
+    total = 0
+    for index in range(20000):
+        table[index % 997] = index
+        total += table.get(index % 991, 0) * 3 // 7
+
+
+def _reference_time():
+    """
+    :return: Seconds the reference workload takes right now, the faster of two runs
+    """
+    best = None
+    for _ in range(2):
+        start = time.perf_counter()
+        _reference_workload()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run(sizes=SIZES, player_counts=PLAYER_COUNTS, repeat=7, only=None, keys=None, progress=None):
+    """
+    Times every benchmark on every game setup.
+
+    Shared and throttled machines switch between running fast and slow every few seconds, which
+    the fastest of a few timings doesn't get rid of. Every timing is therefore also divided by a
+    timing of the reference workload taken just before it, and compared in those relative units.
+    :param sizes: Map sizes
+    :param player_counts: Player counts
+    :param repeat: Timings per benchmark, of which the fastest is kept
+    :param only: Optional collection of benchmark names to restrict the run to
+    :param keys: Optional collection of result keys to restrict the run to
+    :param progress: Optional callable taking the key and seconds per call of each result
+    :return: Dict of '<size>x<players>/<benchmark>' to {'seconds': seconds per call, 'relative': the
+        same relative to the reference workload, 'spread': the median relative timing over the fastest}
+    """
+    synthetic.load_default_constants()
+    results = {}
+    for size in sizes:
+        for num_players in player_counts:
+            for name, setup in benchmarks(size, num_players):
+                key = '{}x{}/{}'.format(size, num_players, name)
+                if only and name not in only or keys is not None and key not in keys:
+                    continue
+                # The first round warms up caches and the processor's clock and isn't counted
+                timings = []
+                for round_number in range(repeat + 1):
+                    function, calls = setup()
+                    reference = _reference_time()
+                    start = time.perf_counter()
+                    for index in range(calls):
+                        function(index)
+                    per_call = (time.perf_counter() - start) / calls
+                    if round_number:
+                        timings.append((per_call, per_call / reference))
+                seconds = min(timing[0] for timing in timings)
+                relatives = sorted(timing[1] for timing in timings)
+                results[key] = {'seconds': seconds, 'relative': relatives[0],
+                                'spread': relatives[len(relatives) // 2] / relatives[0]}
+                if progress is not None:
+                    progress(key, seconds)
+    return results
+
+
+def machine():
+    """
+    :return: Description of the machine and interpreter that baselines are recorded on
+    """
+    return {'platform': platform.platform(), 'processor': platform.processor() or platform.machine(),
+            'python': platform.python_version()}
+
+
+def compare(results, baseline, threshold):
+    """
+    :param results: Results of run
+    :param baseline: Results of run stored as the baseline
+    :param threshold: Allowed slowdown as a fraction of the baseline, before it is widened by the spread
+    :return: List of (key, seconds, baseline seconds or None, ratio or None, whether it regressed)
+    """
+    rows = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        # Slower code is slower in seconds and relative to the reference alike, while a change of the
+        # machine's speed in the middle of a timing usually only shows in one of them
+        ratio = None
+        allowed = 1 + threshold
+        if base:
+            ratio = min(result['seconds'] / base['seconds'], result['relative'] / base['relative'])
+            # Baselines saved before spreads were recorded count as noiseless
+            allowed *= max(base.get('spread', 1.0), result['spread'])
+        rows.append((key, result['seconds'], base['seconds'] if base else None, ratio,
+                     ratio is not None and ratio > allowed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--players', type=int, nargs='+', default=list(PLAYER_COUNTS))
+    parser.add_argument('--only', nargs='+', help='names of the benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--baseline', default=BASELINE, help='JSON baseline file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, 0.25 for 25%%')
+    parser.add_argument('--retries', type=int, default=2, help='times to time again benchmarks that look slower')
+    parser.add_argument('--save', action='store_true', help='store the results in the baseline file')
+    args = parser.parse_args()
+
+    # Keep Game from logging to bot-<id>.log
+    logging.getLogger().addHandler(logging.NullHandler())
+    stored = {'machine': machine(), 'results': {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    if stored['machine'] != machine():
+        print('warning: {} was recorded on {}'.format(args.baseline, stored['machine']))
+
+    def progress(key, seconds):
+        sys.stderr.write('\r{:<40} {:12.2f} us'.format(key, seconds * 1e6))
+
+    def rerun(results, keys):
+        for key, result in run(args.sizes, args.players, args.repeat, keys=keys, progress=progress).items():
+            results[key] = {'seconds': min(results[key]['seconds'], result['seconds']),
+                            'relative': min(results[key]['relative'], result['relative']),
+                            'spread': max(results[key]['spread'], result['spread'])}
+
+    results = run(args.sizes, args.players, args.repeat, args.only, progress=progress)
+    rows = compare(results, stored['results'], args.threshold)
+    for _ in range(args.retries):
+        if args.save:
+            # A baseline gets every benchmark timed again, as it is the yardstick of later runs
+            rerun(results, list(results))
+            continue
+        # A regression has to show again when timed anew, so that a slow spell of the machine isn't one
+        suspects = [row[0] for row in rows if row[4]]
+        if not suspects:
+            break
+        rerun(results, suspects)
+        rows = compare(results, stored['results'], args.threshold)
+    sys.stderr.write('\r' + ' ' * 56 + '\r')
+
+    print('{:<36} {:>12} {:>12} {:>8}'.format('benchmark', 'us/call', 'baseline', 'ratio'))
+    for key, seconds, base, ratio, regressed in rows:
+        print('{:<36} {:>12.2f} {:>12} {:>8} {}'.format(
+            key, seconds * 1e6, '{:.2f}'.format(base * 1e6) if base else '-',
+            '{:.2f}'.format(ratio) if ratio else '-', 'SLOWER' if regressed else ''))
+
+    if args.save:
+        stored['machine'] = machine()
+        stored['results'].update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(stored, f, indent=1, sort_keys=True)
+        print('baseline written to {}'.format(args.baseline))
+        return
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print('{} benchmarks are more than {:.0%} slower than the baseline'.format(len(regressions), args.threshold))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Synthetic game states for benchmarking without the game engine.
+"""
+
+import json
+import random
+
+from hlt import constants
+from hlt.entity import Ship
+from hlt.game_map import GameMap, MapCell
+from hlt.positionals import Position
+from sim.rules import DEFAULT_CONSTANTS
+
+
+def load_default_constants():
+    """
+    Loads the engine's default constants into hlt.constants.
+    """
+    constants.load_constants(DEFAULT_CONSTANTS)
+
+
+def make_game_map(size, num_ships=0, seed=0):
+    """
+    Creates a square map with random halite and randomly placed ships.
+    :param size: The width and height of the map
+    :param num_ships: How many cells to mark as occupied by a ship
+    :param seed: Seed for the random generator
+    :return: The map object
+    """
+    rng = random.Random(seed)
+    cells = [[MapCell(Position(x, y), rng.randint(0, 1000)) for x in range(size)] for y in range(size)]
+    game_map = GameMap(cells, size, size)
+    for ship_id in range(num_ships):
+        position = Position(rng.randrange(size), rng.randrange(size))
+        game_map[position].mark_unsafe(Ship(ship_id % 2, ship_id, position, rng.randint(0, 1000)))
+    return game_map
+
+
+def random_positions(size, count, seed=0):
+    """
+    :param size: The width and height of the map
+    :param count: How many positions to return
+    :param seed: Seed for the random generator
+    :return: A list of random positions on the map
+    """
+    rng = random.Random(seed)
+    return [Position(rng.randrange(size), rng.randrange(size)) for _ in range(count)]
+
+
+def engine_input(size, num_players=2, turns=50, ships_per_player=30, seed=0):
+    """
+    Creates the raw stdin the engine would send to a bot: the pre-game input followed by
+    turns frames in which every player has ships_per_player ships and two dropoffs.
+    :param size: The width and height of the map
+    :param num_players: The number of players
+    :param turns: The number of frames
+    :param ships_per_player: How many ships each player has every turn
+    :param seed: Seed for the random generator
+    :return: The input as bytes
+    """
+    rng = random.Random(seed)
+    lines = [json.dumps(DEFAULT_CONSTANTS), '{} 0'.format(num_players)]
+    for player in range(num_players):
+        lines.append('{} {} {}'.format(player, rng.randrange(size), rng.randrange(size)))
+    lines.append('{} {}'.format(size, size))
+    for _ in range(size):
+        lines.append(' '.join(str(rng.randint(0, 1000)) for _ in range(size)))
+
+    for turn in range(1, turns + 1):
+        lines.append(str(turn))
+        for player in range(num_players):
+            lines.append('{} {} 2 {}'.format(player, ships_per_player, rng.randint(0, 20000)))
+            for ship in range(ships_per_player):
+                lines.append('{} {} {} {}'.format(player * ships_per_player + ship, rng.randrange(size),
+                                                  rng.randrange(size), rng.randint(0, 1000)))
+            for dropoff in range(2):
+                lines.append('{} {} {}'.format(player * 2 + dropoff, rng.randrange(size), rng.randrange(size)))
+        changed = num_players * ships_per_player
+        lines.append(str(changed))
+        for _ in range(changed):
+            lines.append('{} {} {}'.format(rng.randrange(size), rng.randrange(size), rng.randint(0, 1000)))
+    return ('\n'.join(lines) + '\n').encode()
@@ -0,0 +1,278 @@
+"""
+Columnar datasets of many replays, for vectorized queries over hundreds of games.
+
+    python -m hlt.dataset replays/ dataset/
+
+converts every .hlt file of a directory into a directory of raw column files, which Dataset
+memory-maps as NumPy arrays. Running it again on the same output adds only the replays that
+aren't in the dataset yet. The tables are:
+
+games         one row per game: width, height, num_players, seed, turns_start and num_turns
+              (the rows of the game in turns) and halite_start (its first cell in halite)
+players       one row per seat: game, player, name, rank and halite at the end of the game
+turns         one row per game and turn: game, turn, halite_start, players_start and ships_start
+              (the first rows of the turn in halite, player_turns and ships)
+player_turns  one row per game, turn and player: game, turn, player, bank at the start of the
+              turn, halite deposited and ships lost to collisions during the turn, the halite those
+              ships lost, and ships at the start of the turn
+ships         one row per ship and turn: game, turn, player, ship, x, y, cargo and inspired at the
+              start of the turn, the move made (see MOVES), whether the ship was destroyed in a
+              collision and the halite it carried into the collision, unless that was on one of
+              its player's structures (lost)
+halite        the halite of every cell at the start of every turn, in rows of width * height
+
+Turns are numbered as the bots see them, from 1 up to the state after the last turn, which has
+no moves. For instance the halite player 0 lost to collisions after turn 300:
+
+    data = Dataset('dataset/')
+    late = (data.ships['turn'] > 300) & (data.ships['player'] == 0)
+    lost = data.ships['lost'][late].sum()
+
+Replays record the name a bot passes to Game.ready, not its script, so played_by only tells apart
+bots that pass different names. The bots of this repository all call themselves "pyBot".
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from .replay import Replay
+
+"""Codes of the move column of ships: no command, the directions and construct."""
+MOVES = {None: 0, 'o': 1, 'n': 2, 's': 3, 'e': 4, 'w': 5, 'c': 6}
+
+"""The dtype of every column of every table."""
+SCHEMA = {
+    'games': {'width': 'i2', 'height': 'i2', 'num_players': 'i1', 'seed': 'i8',
+              'turns_start': 'i8', 'num_turns': 'i2', 'halite_start': 'i8'},
+    'players': {'game': 'i4', 'player': 'i1', 'name': 'U32', 'rank': 'i1', 'halite': 'i4'},
+    'turns': {'game': 'i4', 'turn': 'i2', 'halite_start': 'i8', 'players_start': 'i8', 'ships_start': 'i8'},
+    'player_turns': {'game': 'i4', 'turn': 'i2', 'player': 'i1', 'bank': 'i4', 'deposited': 'i4',
+                     'ships': 'i2', 'collisions': 'i2', 'collision_halite': 'i4'},
+    'ships': {'game': 'i4', 'turn': 'i2', 'player': 'i1', 'ship': 'i4', 'x': 'i2', 'y': 'i2',
+              'cargo': 'i2', 'inspired': '?', 'move': 'i1', 'destroyed': '?', 'lost': 'i2'},
+    'halite': {'cells': 'i4'},
+}
+
+"""The file listing the columns' lengths and the replays in the dataset."""
+_INDEX = 'index.json'
+
+
+def _column_path(directory, table, column):
+    """
+    :return: The path of the raw file of a column
+    """
+    return os.path.join(directory, '{}.{}.bin'.format(table, column))
+
+
+def _game_tables(replay, game):
+    """
+    Extracts the rows of one game.
+    :param replay: The replay.Replay of the game
+    :param game: The index of the game in the dataset
+    :return: Dict of table name to dict of column name to array
+    """
+    width, height = replay.width, replay.height
+    move_cost_ratio = replay.constants['MOVE_COST_RATIO']
+    inspired_move_cost_ratio = replay.constants['INSPIRED_MOVE_COST_RATIO']
+    player_ids = [player['player_id'] for player in replay.players]
+    halite = replay.production.copy()
+    structures = {(player['factory_location']['x'], player['factory_location']['y']): player['player_id']
+                  for player in replay.players}
+    turns, player_turns, ships, grids = [], [], [], []
+    previous = None
+    for turn, frame in enumerate(replay.frames()):
+        if previous is None:
+            previous = frame
+            continue
+        for cell in previous['cells']:
+            halite[cell['y'], cell['x']] = cell['production']
+        grids.append(halite.ravel().copy())
+        # halite_start is filled in by build, which knows where the game's grids go
+        turns.append((game, turn, 0, len(player_turns), len(ships)))
+
+        moves = {}
+        for player_moves in frame['moves'].values():
+            for move in player_moves:
+                if move['type'] == 'm':
+                    moves[move['id']] = move['direction']
+                elif move['type'] == 'c':
+                    moves[move['id']] = 'c'
+        owners = {event['id']: event['owner_id'] for event in frame['events'] if event['type'] == 'spawn'}
+        # Dropoffs are built before ships move, so a collision can happen on one built this turn
+        for event in frame['events']:
+            if event['type'] == 'construct':
+                structures[event['location']['x'], event['location']['y']] = event['owner_id']
+        destroyed = {}
+        for event in frame['events']:
+            if event['type'] == 'shipwreck':
+                location = event['location']
+                for ship_id in event['ships']:
+                    destroyed[ship_id] = structures.get((location['x'], location['y']))
+        collisions = dict.fromkeys(player_ids, 0)
+        collision_halite = dict.fromkeys(player_ids, 0)
+
+        for player in player_ids:
+            entities = frame['entities'].get(str(player), {})
+            for ship_id, ship in entities.items():
+                ship_id = int(ship_id)
+                owners[ship_id] = player
+                move = moves.get(ship_id)
+                lost = 0
+                # Halite of a collision on a structure goes to the structure's owner
+                if ship_id in destroyed and destroyed[ship_id] != player:
+                    lost = ship['energy']
+                    if move in ('n', 's', 'e', 'w'):
+                        ratio = inspired_move_cost_ratio if ship['is_inspired'] else move_cost_ratio
+                        cost = int(halite[ship['y'], ship['x']]) // ratio
+                        if cost <= lost:
+                            lost -= cost
+                    collision_halite[player] += lost
+                ships.append((game, turn, player, ship_id, ship['x'], ship['y'], ship['energy'],
+                              ship['is_inspired'], MOVES[move], ship_id in destroyed, lost))
+        for ship_id in destroyed:
+            collisions[owners[ship_id]] += 1
+        for player in player_ids:
+            deposited = frame['deposited'][str(player)] - previous['deposited'][str(player)] if frame['moves'] else 0
+            player_turns.append((game, turn, player, previous['energy'][str(player)], deposited,
+                                 len(frame['entities'].get(str(player), {})), collisions[player],
+                                 collision_halite[player]))
+        previous = frame
+
+    statistics = {player['player_id']: player for player in replay.statistics['player_statistics']}
+    tables = {
+        'turns': turns,
+        'player_turns': player_turns,
+        'ships': ships,
+        'players': [(game, player['player_id'], player['name'][:32], statistics[player['player_id']]['rank'],
+                     previous['energy'][str(player['player_id'])]) for player in replay.players],
+    }
+    columns = {}
+    for table, rows in tables.items():
+        columns[table] = {name: np.array([row[index] for row in rows], dtype=dtype)
+                          for index, (name, dtype) in enumerate(SCHEMA[table].items())}
+    columns['halite'] = {'cells': np.concatenate(grids).astype(SCHEMA['halite']['cells'])}
+    columns['games'] = {
+        'width': np.array([width], dtype=SCHEMA['games']['width']),
+        'height': np.array([height], dtype=SCHEMA['games']['height']),
+        'num_players': np.array([len(player_ids)], dtype=SCHEMA['games']['num_players']),
+        'seed': np.array([replay.seed or 0], dtype=SCHEMA['games']['seed']),
+        'num_turns': np.array([len(turns)], dtype=SCHEMA['games']['num_turns']),
+    }
+    return columns
+
+
+def build(replay_directory, directory, progress=None):
+    """
+    Adds the replays of a directory that aren't in a dataset yet to it, creating it if needed.
+    :param replay_directory: The directory holding the .hlt files
+    :param directory: The directory of the dataset
+    :param progress: Optional callable taking the name of each replay as it is added
+    :return: The number of replays added
+    """
+    os.makedirs(directory, exist_ok=True)
+    index_path = os.path.join(directory, _INDEX)
+    index = {'replays': [], 'lengths': {table: 0 for table in SCHEMA}}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    known = set(index['replays'])
+    lengths = index['lengths']
+    # Drop whatever an interrupted build appended after the last game in the index
+    for table, columns in SCHEMA.items():
+        for column, dtype in columns.items():
+            path = _column_path(directory, table, column)
+            size = lengths[table] * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+    added = 0
+    for name in sorted(os.listdir(replay_directory)):
+        if not name.endswith('.hlt') or name in known:
+            continue
+        game = len(index['replays'])
+        columns = _game_tables(Replay(os.path.join(replay_directory, name)), game)
+
+        # Offsets into the tables as they are before this game is appended
+        width_height = int(columns['games']['width'][0]) * int(columns['games']['height'][0])
+        columns['games']['turns_start'] = np.array([lengths['turns']], dtype=SCHEMA['games']['turns_start'])
+        columns['games']['halite_start'] = np.array([lengths['halite']], dtype=SCHEMA['games']['halite_start'])
+        columns['turns']['halite_start'] += lengths['halite'] + width_height * np.arange(len(columns['turns']['turn']))
+        columns['turns']['players_start'] += lengths['player_turns']
+        columns['turns']['ships_start'] += lengths['ships']
+
+        for table, table_columns in columns.items():
+            for column, values in table_columns.items():
+                with open(_column_path(directory, table, column), 'ab') as f:
+                    f.write(values.tobytes())
+            lengths[table] += len(next(iter(table_columns.values())))
+        index['replays'].append(name)
+        # Rewritten after every game, so an interrupted build leaves a consistent dataset
+        with open(index_path, 'w') as f:
+            json.dump(index, f)
+        added += 1
+        if progress is not None:
+            progress(name)
+    return added
+
+
+class Dataset:
+    """
+    A dataset written by build. Every table is a dict of column name to read-only memory-mapped
+    array, available as an attribute named after the table.
+    """
+    def __init__(self, directory):
+        """
+        :param directory: The directory of the dataset
+        """
+        with open(os.path.join(directory, _INDEX)) as f:
+            index = json.load(f)
+        self.replays = index['replays']
+        for table, columns in SCHEMA.items():
+            length = index['lengths'][table]
+            setattr(self, table, {
+                column: np.memmap(_column_path(directory, table, column), dtype=dtype, mode='r', shape=(length,))
+                if length else np.empty(0, dtype=dtype)
+                for column, dtype in columns.items()})
+
+    def played_by(self, table, name):
+        """
+        :param table: The name of a table with game and player columns
+        :param name: The name a bot passed to Game.ready
+        :return: Boolean mask of the rows of the table that belong to seats played by that bot
+        """
+        seats = np.zeros((len(self.replays), int(self.players['player'].max(initial=0)) + 1), dtype=bool)
+        mine = self.players['name'] == name
+        seats[self.players['game'][mine], self.players['player'][mine]] = True
+        rows = getattr(self, table)
+        return seats[rows['game'], rows['player']]
+
+    def halite_grid(self, turn_row):
+        """
+        :param turn_row: A row of the turns table
+        :return: The halite at the start of that turn, as a (height, width) view
+        """
+        game = self.turns['game'][turn_row]
+        width, height = int(self.games['width'][game]), int(self.games['height'][game])
+        start = int(self.turns['halite_start'][turn_row])
+        return self.halite['cells'][start:start + width * height].reshape(height, width)
+
+    def turn_row(self, game, turn):
+        """
+        :return: The row of the turns table of a turn of a game, turns counting from 1
+        """
+        return int(self.games['turns_start'][game]) + turn - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Converts a directory of replays into a columnar dataset.')
+    parser.add_argument('replays', help='directory holding the .hlt files')
+    parser.add_argument('dataset', help='directory to write the dataset to, or to add new replays to')
+    args = parser.parse_args()
+    added = build(args.replays, args.dataset, progress=lambda name: print('added', name))
+    print('{} replays added to {}'.format(added, args.dataset))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Per-turn time budget.
+
+The engine kills a bot that takes too long over a turn, so the turn's time is tracked
+from the moment its frame arrives, and navigation degrades from A* searches to cached
+paths to naive moves as the budget runs out.
+
+A bot that shares its process with others, as in the threads of sim, would count their
+turns as its own on the wall clock, so it measures the CPU time of its own thread instead.
+"""
+
+import collections
+import threading
+import time
+
+"""Navigation tiers, from the most to the least expensive."""
+ASTAR = 'astar'
+CACHED = 'cached'
+NAIVE = 'naive'
+
+
+def bot_clock():
+    """
+    :return: time.perf_counter in the main thread, where the engine runs a bot in a process of its
+        own, or time.thread_time in any other thread, where the bot shares the process with others
+    """
+    if threading.current_thread() is threading.main_thread():
+        return time.perf_counter
+    return time.thread_time
+
+
+class TurnDeadline:
+    """
+    Time budget of a turn, with counts of the navigation tier used for each call.
+
+    Time is read from the clock given, by default bot_clock() of the thread creating the deadline:
+    wall-clock time (time.perf_counter) in the main thread, where the bot has its own process, and
+    the thread's CPU time (time.thread_time) in any other thread, where in-process bots of the
+    simulator share the interpreter.
+    """
+    def __init__(self, budget=1.5, astar_share=0.6, cached_share=0.85, clock=None):
+        """
+        :param budget: Seconds the bot allows itself per turn, below the engine's limit of 2
+        :param astar_share: Fraction of the budget after which no new A* searches are run
+        :param cached_share: Fraction of the budget after which even cached paths are skipped
+        :param clock: Function returning the time in seconds, by default bot_clock()
+        """
+        self.clock = clock if clock is not None else bot_clock()
+        self.budget = budget
+        self.astar_share = astar_share
+        self.cached_share = cached_share
+        self._started = None
+        self.turns = 0
+        self.overruns = 0
+        self.slowest = 0.0
+        self.turn_tiers = collections.Counter()
+        self.tier_counts = collections.Counter()
+
+    def start(self):
+        """
+        Starts the clock of a new turn.
+        :return: nothing.
+        """
+        self._started = self.clock()
+        self.turn_tiers = collections.Counter()
+
+    def elapsed(self):
+        """
+        :return: Seconds since the turn started, 0 outside of a turn
+        """
+        if self._started is None:
+            return 0.0
+        return self.clock() - self._started
+
+    def remaining(self):
+        """
+        :return: Seconds left of the budget, negative once it is overrun
+        """
+        return self.budget - self.elapsed()
+
+    def expired(self):
+        """
+        :return: Whether the budget is used up
+        """
+        return self.remaining() <= 0
+
+    def tier(self):
+        """
+        :return: The navigation tier the remaining budget allows: ASTAR, CACHED or NAIVE
+        """
+        elapsed = self.elapsed()
+        if elapsed < self.astar_share * self.budget:
+            return ASTAR
+        if elapsed < self.cached_share * self.budget:
+            return CACHED
+        return NAIVE
+
+    def record(self, tier):
+        """
+        Counts one navigation call made at the given tier.
+        :return: nothing.
+        """
+        self.turn_tiers[tier] += 1
+        self.tier_counts[tier] += 1
+
+    def finish(self):
+        """
+        Stops the clock of the turn and updates the overrun statistics.
+        :return: Seconds the turn took
+        """
+        elapsed = self.elapsed()
+        self._started = None
+        self.turns += 1
+        self.slowest = max(self.slowest, elapsed)
+        if elapsed > self.budget:
+            self.overruns += 1
+        return elapsed
@@ -0,0 +1,105 @@
+"""
+Dropoff site selection: the halite within a radius of every cell of the map, and the cells
+ranked as sites for a player's next dropoff.
+
+    sites = DropoffSites(game.game_map, radius=8)
+    while True:
+        game.update_frame()
+        sites.refresh()
+        for position, score in sites.rank(game.me, 3):
+            ...
+"""
+
+import numpy as np
+
+
+class DropoffSites:
+    """
+    The total halite within a wrap-around Manhattan radius of every cell, as a (height, width)
+    array in totals.
+
+    The totals are computed once with Topology.diamond_sum, from running sums along the rows of
+    the map, and then kept current from GameMap.dirty_cells: each change is added to the diamond
+    of cells around it, so a turn costs O(changed cells * radius ** 2) rather than a new pass over
+    the map. A turn that changed more cells than that pays for is summed anew. As the changes are
+    those of the last GameMap._update, refresh has to be called every turn.
+    """
+    def __init__(self, game_map, radius):
+        """
+        :param game_map: The map whose halite to sum
+        :param radius: The distance within which a dropoff's halite is counted
+        """
+        self._game_map = game_map
+        self.radius = int(radius)
+        self._diamond_size = len(game_map.topology.diamond_offsets(self.radius)[0])
+        self._halite = game_map.halite.reshape(-1).copy()
+        self.totals = game_map.topology.diamond_sum(game_map.halite, self.radius)
+
+    def refresh(self):
+        """
+        Updates the totals to the map's current halite.
+        :return: nothing.
+        """
+        dirty_cells = self._game_map.dirty_cells
+        if not dirty_cells:
+            return
+        halite = self._game_map.halite.reshape(-1)
+        if len(dirty_cells) * self._diamond_size >= halite.size:
+            self.totals = self._game_map.topology.diamond_sum(self._game_map.halite, self.radius)
+            self._halite = halite.copy()
+            return
+        cells = np.fromiter(dirty_cells, dtype=np.int64, count=len(dirty_cells))
+        delta = halite[cells].astype(self.totals.dtype) - self._halite[cells]
+        np.add.at(self.totals.reshape(-1), self._game_map.topology.diamond_cells(cells, self.radius),
+                  delta[:, None])
+        self._halite[cells] = halite[cells]
+
+    def structure_distance(self, player):
+        """
+        :param player: The player whose structures to measure from
+        :return: Int array of shape (height, width): the wrap-around distance from every cell to the
+            nearest of the player's shipyard and dropoffs
+        """
+        topology = self._game_map.topology
+        structures = [player.shipyard] + list(player.get_dropoffs())
+        xs = np.array([structure.position.x for structure in structures])
+        ys = np.array([structure.position.y for structure in structures])
+        distance_x = np.array(topology.distance_x)[(np.arange(topology.width) - xs[:, None]) % topology.width]
+        distance_y = np.array(topology.distance_y)[(np.arange(topology.height) - ys[:, None]) % topology.height]
+        return (distance_y[:, :, None] + distance_x[:, None, :]).min(axis=0)
+
+    def scores(self, player, min_distance=None, decay=0.95):
+        """
+        Scores every cell as the site of a new dropoff for a player. A site scores the halite
+        within the radius of it, discounted by decay for every step it lies beyond min_distance
+        from the player's nearest structure, since ships take that much longer to get there.
+        Cells closer than min_distance, whose halite the structures already serve, and cells
+        holding a structure score -inf.
+        :param player: The player building the dropoff
+        :param min_distance: The least distance to the player's structures, by default twice the radius
+        :param decay: The factor a site's score is discounted by per step of distance
+        :return: Float array of shape (height, width)
+        """
+        if min_distance is None:
+            min_distance = 2 * self.radius
+        distance = self.structure_distance(player)
+        scores = self.totals * np.power(decay, np.maximum(distance - min_distance, 0))
+        allowed = (distance >= min_distance) & (self._game_map.structure_owner < 0)
+        return np.where(allowed, scores, -np.inf)
+
+    def rank(self, player, count, min_distance=None, decay=0.95):
+        """
+        Ranks the cells as sites of a new dropoff for a player, by scores.
+        :param player: The player building the dropoff
+        :param count: How many sites to return
+        :param min_distance: The least distance to the player's structures, by default twice the radius
+        :param decay: The factor a site's score is discounted by per step of distance
+        :return: A list of up to count (position, score) pairs, best first
+        """
+        scores = self.scores(player, min_distance, decay).reshape(-1)
+        count = min(count, int(np.isfinite(scores).sum()))
+        if count <= 0:
+            return []
+        best = np.argpartition(-scores, count - 1)[:count]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(self._game_map.cell_position(cell), float(scores[cell])) for cell in best.tolist()]
@@ -0,0 +1,171 @@
+"""
+Fleet-wide move resolution.
+
+Rather than letting ships claim cells one after another, every ship ranks its
+moves for the turn and the whole fleet is assigned target cells at once as a
+minimum cost bipartite matching between ships and cells.
+"""
+
+import heapq
+
+from .deadline import bot_clock
+from .positionals import Direction
+
+
+def resolve_moves(game_map, ranked_moves, shared=(), time_budget=0.05):
+    """
+    Assigns every ship one of its ranked moves so no two ships end up on the same cell.
+
+    Taking a ship's n-th choice costs n, and the total cost over the fleet is minimized
+    with shortest augmenting paths, so ships may swap cells or make room for each other.
+    Still is always an option, which makes a collision-free assignment always exist.
+    If time_budget, or what is left of the turn's budget in game_map.deadline, runs out, the
+    remaining ships greedily take their best free cell. Time is read from the turn deadline's
+    clock, so the matcher and the navigation tiers agree on how much of the turn is gone.
+    Target cells are marked unsafe and vacated cells safe, as GameMap.naive_navigate does.
+    :param game_map: The game map
+    :param ranked_moves: Dict mapping each ship to its Direction tuples, most preferred first
+    :param shared: Container of positions any number of ships may move onto, e.g. your shipyard at the end of the game
+    :param time_budget: Seconds to spend on the matching before falling back to greedy choices
+    :return: Dict mapping each ship to its Direction tuple
+    """
+    if game_map.deadline is not None:
+        clock = game_map.deadline.clock
+        time_budget = min(time_budget, game_map.deadline.remaining())
+    else:
+        clock = bot_clock()
+    deadline = clock() + time_budget
+    topology = game_map.topology
+    shared_cells = {topology.cell_id(position) for position in shared}
+    ships = list(ranked_moves)
+    origins = [topology.cell_id(ship.position) for ship in ships]
+
+    # options[i] lists (cost, cell, direction) for ship i
+    options = []
+    for index, ship in enumerate(ships):
+        moves = list(ranked_moves[ship])
+        if Direction.Still not in moves:
+            moves.append(Direction.Still)
+        options.append([(rank, _target(topology, origins[index], direction), direction)
+                        for rank, direction in enumerate(moves)])
+
+    ship_cells = [None] * len(ships)
+    cell_ships = {}
+    ship_duals = [0] * len(ships)
+    cell_duals = {}
+    unmatched = []
+    for index in range(len(ships)):
+        if clock() > deadline:
+            unmatched = range(index, len(ships))
+            break
+        _augment(index, options, ship_cells, cell_ships, ship_duals, cell_duals, shared_cells)
+
+    chosen = {index: option for index, option in enumerate(ship_cells) if option is not None}
+    if unmatched:
+        _assign_greedily(unmatched, options, origins, chosen, shared_cells)
+
+    moves = {}
+    for index in range(len(ships)):
+        game_map._flat_cells[origins[index]].mark_safe()
+    for index, ship in enumerate(ships):
+        _, cell, direction = chosen[index]
+        game_map._flat_cells[cell].mark_unsafe(ship)
+        moves[ship] = direction
+    return moves
+
+
+def _target(topology, origin, direction):
+    """
+    :return: The id of the cell a move in direction from origin leads to
+    """
+    if direction == Direction.Still:
+        return origin
+    return topology.neighbours[origin][Direction.get_all_cardinals().index(direction)]
+
+
+def _augment(start, options, ship_cells, cell_ships, ship_duals, cell_duals, shared_cells):
+    """
+    Matches ship start by a shortest augmenting path over reduced costs, keeping the duals feasible.
+
+    A free cell is always reachable: the chain of cells taken from each ship's own cell
+    ends at the own cell of a ship that moved away.
+    :return: nothing.
+    """
+    distances = {}
+    predecessors = {}
+    frontier = []
+
+    def relax(ship, base):
+        for option in options[ship]:
+            cost, cell, _ = option
+            if cell in finalized:
+                continue
+            distance = base + cost - ship_duals[ship] - cell_duals.get(cell, 0)
+            if cell not in distances or distance < distances[cell]:
+                distances[cell] = distance
+                predecessors[cell] = (ship, option)
+                heapq.heappush(frontier, (distance, cell))
+
+    finalized = {}
+    relax(start, 0)
+    while True:
+        total, free_cell = heapq.heappop(frontier)
+        if free_cell in finalized or total > distances[free_cell]:
+            continue
+        finalized[free_cell] = total
+        if free_cell in shared_cells or free_cell not in cell_ships:
+            break
+        relax(cell_ships[free_cell], total)
+
+    for cell, distance in finalized.items():
+        cell_duals[cell] = cell_duals.get(cell, 0) - (total - distance)
+        if cell in cell_ships and cell not in shared_cells:
+            ship_duals[cell_ships[cell]] += total - distance
+    ship_duals[start] += total
+
+    cell = free_cell
+    while True:
+        ship, option = predecessors[cell]
+        previous = ship_cells[ship]
+        ship_cells[ship] = option
+        if cell not in shared_cells:
+            cell_ships[cell] = ship
+        if ship == start:
+            break
+        cell = previous[1]
+
+
+def _assign_greedily(unmatched, options, origins, chosen, shared_cells):
+    """
+    Gives each unmatched ship its best free cell, or its own cell if none is left. Ships that
+    moved onto a cell someone else also ended up on are then sent back to their own cell,
+    until no cell outside shared_cells holds two ships.
+    :return: nothing.
+    """
+    taken = {}
+    for index, option in chosen.items():
+        taken.setdefault(option[1], []).append(index)
+    for index in unmatched:
+        chosen[index] = next((option for option in options[index]
+                              if option[1] in shared_cells or option[1] not in taken),
+                             _stay(options[index]))
+        taken.setdefault(chosen[index][1], []).append(index)
+
+    conflicts = [cell for cell, indices in taken.items() if len(indices) > 1 and cell not in shared_cells]
+    while conflicts:
+        cell = conflicts.pop()
+        keep = next((index for index in taken[cell] if origins[index] == cell), taken[cell][0])
+        for index in taken[cell]:
+            if index != keep:
+                chosen[index] = _stay(options[index])
+                taken.setdefault(origins[index], []).append(index)
+                if len(taken[origins[index]]) > 1:
+                    conflicts.append(origins[index])
+        taken[cell] = [keep]
+
+
+def _stay(options):
+    """
+    :return: The option of staying still
+    """
+    return next(option for option in options if option[2] == Direction.Still)
@@ -0,0 +1,109 @@
+"""
+Bulk parsing of the per-turn frames sent by the game engine.
+
+Instead of one input() call per line, whole chunks of stdin are read from the
+binary buffer and converted to integers in a single numpy pass.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+"""
+One turn of engine input.
+players holds a (player_id, halite, ships, dropoffs) tuple per player, where ships is an
+(n, 4) array of id, x, y, halite rows and dropoffs an (n, 3) array of id, x, y rows.
+cells is a (n, 3) array of x, y, halite rows for the cells that changed.
+"""
+Frame = namedtuple('Frame', ['turn_number', 'players', 'cells'])
+
+
+class FrameReader:
+    """
+    Reads engine input from a binary stream such as sys.stdin.buffer.
+
+    Once a FrameReader is used, all input has to go through it: sys.stdin's text layer
+    reads ahead and would swallow data meant for the reader.
+    """
+    def __init__(self, stream, chunk_size=1 << 16):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._values = np.empty(0, dtype=np.int64)
+        self._tail = b''
+
+    def readline(self):
+        """
+        Reads a single line of the pre-game input.
+        :return: The line as a string, without the trailing newline
+        """
+        line = self._stream.readline()
+        if not line:
+            raise EOFError
+        return line.decode().rstrip('\n')
+
+    def wait(self):
+        """
+        Blocks until input of the next frame is there to read, without reading it, so that
+        the time spent parsing a frame can be told from the time spent waiting for it.
+        :return: nothing.
+        """
+        if not len(self._values) and not self._tail:
+            self._stream.peek(1)
+
+    def _read_more(self):
+        """
+        Appends the integers of the next chunk of the stream to the pending values.
+        A number cut off at the end of the chunk is kept back until the next read.
+        :return: nothing.
+        """
+        chunk = self._stream.read1(self._chunk_size)
+        if not chunk:
+            raise EOFError
+        data = self._tail + chunk
+        end = max(data.rfind(b' '), data.rfind(b'\n')) + 1
+        self._tail = data[end:]
+        if end:
+            values = np.fromstring(data[:end], dtype=np.int64, sep=' ')
+            self._values = np.concatenate((self._values, values))
+
+    def _frame_length(self, num_players):
+        """
+        Walks the headers of the pending frame.
+        :param num_players: The number of players in the game
+        :return: How many integers the frame spans, or None if its headers haven't all arrived yet
+        """
+        values = self._values
+        position = 1
+        for _ in range(num_players):
+            if len(values) < position + 4:
+                return None
+            position += 4 + 4 * int(values[position + 1]) + 3 * int(values[position + 2])
+        if len(values) <= position:
+            return None
+        return position + 1 + 3 * int(values[position])
+
+    def read_frame(self, num_players):
+        """
+        Blocks until a whole frame has been read and parses it.
+        :param num_players: The number of players in the game
+        :return: The Frame
+        """
+        length = self._frame_length(num_players)
+        while length is None or len(self._values) < length:
+            self._read_more()
+            length = self._frame_length(num_players)
+        values = self._values[:length]
+        self._values = self._values[length:]
+
+        players = []
+        position = 1
+        for _ in range(num_players):
+            player_id, num_ships, num_dropoffs, halite = values[position:position + 4].tolist()
+            position += 4
+            ships = values[position:position + 4 * num_ships].reshape(num_ships, 4)
+            position += 4 * num_ships
+            dropoffs = values[position:position + 3 * num_dropoffs].reshape(num_dropoffs, 3)
+            position += 3 * num_dropoffs
+            players.append((player_id, halite, ships, dropoffs))
+        cells = values[position + 1:].reshape(-1, 3)
+        return Frame(int(values[0]), players, cells)
@@ -1,12 +1,46 @@
 import queue
+from collections import namedtuple
 
-from . import constants
+import numpy as np
+
+from . import constants, deadline, pathfinding, telemetry
 from .entity import Entity, Shipyard, Ship, Dropoff
 from .positionals import Direction, Position
+from .topology import Topology
+
+"""Owner value in the map arrays for cells without a ship or structure."""
+NO_OWNER = -1
+
+_CARDINAL_INDEX = {direction: index for index, direction in enumerate(Direction.get_all_cardinals())}
+
+"""
+What a ship of one player would find on every cell of the map, as (height, width) arrays.
+enemies counts the opponent ships within INSPIRATION_RADIUS, inspired is whether that reaches
+INSPIRATION_SHIP_COUNT, halite_yield is the halite a ship gains by staying on the cell for a turn,
+bonus included, and move_cost is the halite it costs to move off the cell.
+"""
+InspirationField = namedtuple('InspirationField', ['enemies', 'inspired', 'halite_yield', 'move_cost'])
+
+
+def _position_lookup(game_map):
+    """
+    :param game_map: The GameMap whose position objects to hand out, or None
+    :return: Function mapping x and y to the map's position object of that cell, or to a new
+        Position without a map
+    """
+    if game_map is None:
+        return Position
+    positions, width = game_map._positions, game_map.width
+    return lambda x, y: positions[y * width + x]
 
 class Player:
     """
     Player object containing all items/metadata pertinent to the player.
+
+    Ships and dropoffs are the same objects from turn to turn: a frame updates the ships that are
+    still in play, so a bot can keep its own state on them, and it goes away with the ship.
+    spawned_ships and destroyed_ships hold the ids of the ships that appeared and disappeared
+    with the latest frame, a ship turned into a dropoff counting as destroyed.
     """
     def __init__(self, player_id, shipyard, halite=0):
         self.id = player_id
@@ -14,6 +48,8 @@ class Player:
         self.halite_amount = halite
         self._ships = {}
         self._dropoffs = {}
+        self.spawned_ships = set()
+        self.destroyed_ships = set()
 
     def get_ship(self, ship_id):
         """
@@ -57,55 +93,174 @@ class Player:
 
 
     @staticmethod
-    def _generate():
+    def _generate(read_line=input):
         """
         Creates a player object from the input given by the game engine
+        :param read_line: Function returning the next line of input
         :return: The player object
         """
-        player, shipyard_x, shipyard_y = map(int, input().split())
+        player, shipyard_x, shipyard_y = map(int, read_line().split())
         return Player(player, Shipyard(player, -1, Position(shipyard_x, shipyard_y)))
 
-    def _update(self, num_ships, num_dropoffs, halite):
+    def _update(self, num_ships, num_dropoffs, halite, game_map=None):
         """
         Updates this player object considering the input from the game engine for the current specific turn.
         :param num_ships: The number of ships this player has this turn
         :param num_dropoffs: The number of dropoffs this player has this turn
         :param halite: How much halite the player has in total
+        :param game_map: The GameMap whose position objects the ships and dropoffs take, if any
+        :return: nothing.
+        """
+        self.halite_amount = halite
+        position = _position_lookup(game_map)
+        self._update_ships((map(int, input().split()) for _ in range(num_ships)), position)
+        self._update_dropoffs((map(int, input().split()) for _ in range(num_dropoffs)), position)
+
+    def _load(self, halite, ships, dropoffs, game_map=None):
+        """
+        Updates this player object from a frame parsed by frames.FrameReader.
+        :param halite: How much halite the player has in total
+        :param ships: Array of (id, x, y, halite) rows, one per ship
+        :param dropoffs: Array of (id, x, y) rows, one per dropoff
+        :param game_map: The GameMap whose position objects the ships and dropoffs take, if any
         :return: nothing.
         """
         self.halite_amount = halite
-        self._ships = {id: ship for (id, ship) in [Ship._generate(self.id) for _ in range(num_ships)]}
-        self._dropoffs = {id: dropoff for (id, dropoff) in [Dropoff._generate(self.id) for _ in range(num_dropoffs)]}
+        position = _position_lookup(game_map)
+        self._update_ships(ships.tolist(), position)
+        self._update_dropoffs(dropoffs.tolist(), position)
+
+    def _update_ships(self, rows, position=Position):
+        """
+        Brings the ships up to date with a frame, keeping the object of every ship still in play
+        and noting the ships spawned and destroyed since the previous frame.
+        :param rows: Iterable of (id, x, y, halite) per ship
+        :param position: Function mapping x and y to the position object to give a ship
+        :return: nothing.
+        """
+        previous = self._ships
+        ships = {}
+        spawned = set()
+        for ship_id, x, y, halite_amount in rows:
+            ship = previous.get(ship_id)
+            if ship is None:
+                ship = Ship(self.id, ship_id, position(x, y), halite_amount)
+                spawned.add(ship_id)
+            else:
+                if ship.position.x != x or ship.position.y != y:
+                    ship.position = position(x, y)
+                ship.halite_amount = halite_amount
+            ships[ship_id] = ship
+        self._ships = ships
+        self.spawned_ships = spawned
+        self.destroyed_ships = previous.keys() - ships.keys()
+
+    def _update_dropoffs(self, rows, position=Position):
+        """
+        Brings the dropoffs up to date with a frame, keeping the object of every known dropoff.
+        :param rows: Iterable of (id, x, y) per dropoff
+        :param position: Function mapping x and y to the position object to give a new dropoff
+        :return: nothing.
+        """
+        previous = self._dropoffs
+        self._dropoffs = {dropoff_id: previous.get(dropoff_id) or Dropoff(self.id, dropoff_id, position(x, y))
+                          for dropoff_id, x, y in rows}
 
 
 class MapCell:
-    """A cell on the game map."""
+    """
+    A cell on the game map.
+
+    Once the cell belongs to a GameMap its halite, ship owner and structure owner
+    are views into the map's arrays, so writes through either side stay in sync.
+    """
     def __init__(self, position, halite_amount):
         self.position = position
+        self._index = 0
+        self._halite = [halite_amount]
+        self._ship_owner = [NO_OWNER]
+        self._structure_owner = [NO_OWNER]
+        self._occupied = set()
+        self._ship = None
+        self._structure = None
+
+    def _attach(self, game_map, index):
+        """
+        Moves this cell's state into the arrays of a game map.
+        :param game_map: The map owning this cell
+        :param index: The flat index of this cell in the map's arrays
+        :return: nothing.
+        """
+        halite_amount = self.halite_amount
+        self._index = index
+        self._halite = game_map._halite_flat
+        self._ship_owner = game_map._ship_owner_flat
+        self._structure_owner = game_map._structure_owner_flat
+        self._occupied = game_map._occupied
         self.halite_amount = halite_amount
-        self.ship = None
-        self.structure = None
+        self.ship = self._ship
+        self.structure = self._structure
+
+    @property
+    def halite_amount(self):
+        """
+        :return: How much halite is on this cell
+        """
+        return int(self._halite[self._index])
+
+    @halite_amount.setter
+    def halite_amount(self, halite_amount):
+        self._halite[self._index] = halite_amount
+
+    @property
+    def ship(self):
+        """
+        :return: The ship on this cell, or None
+        """
+        return self._ship
+
+    @ship.setter
+    def ship(self, ship):
+        self._ship = ship
+        if ship is None:
+            self._ship_owner[self._index] = NO_OWNER
+            self._occupied.discard(self._index)
+        else:
+            self._ship_owner[self._index] = ship.owner
+            self._occupied.add(self._index)
+
+    @property
+    def structure(self):
+        """
+        :return: The shipyard or dropoff on this cell, or None
+        """
+        return self._structure
+
+    @structure.setter
+    def structure(self, structure):
+        self._structure = structure
+        self._structure_owner[self._index] = NO_OWNER if structure is None else structure.owner
 
     @property
     def is_empty(self):
         """
         :return: Whether this cell has no ships or structures
         """
-        return self.ship is None and self.structure is None
+        return self._ship is None and self._structure is None
 
     @property
     def is_occupied(self):
         """
         :return: Whether this cell has any ships
         """
-        return self.ship is not None
+        return self._ship is not None
 
     @property
     def has_structure(self):
         """
         :return: Whether this cell has any structures
         """
-        return self.structure is not None
+        return self._structure is not None
 
     @property
     def structure_type(self):
@@ -141,11 +296,43 @@ class GameMap:
 
     Can be indexed by a position, or by a contained entity.
     Coordinates start at 0. Coordinates are normalized for you
+
+    The cell state is also kept in numpy arrays indexed [y, x] for vectorized strategy code:
+    halite holds the halite of every cell, ship_owner and structure_owner the player id owning
+    the ship or structure on a cell, or NO_OWNER. A cell is occupied where ship_owner >= 0.
+
+    Cells are identified by integer ids (y * width + x), see topology.Topology for the neighbour
+    and distance tables. dirty_cells holds the ids of the cells whose halite changed in the last update.
     """
     def __init__(self, cells, width, height):
         self.width = width
         self.height = height
+        self.topology = Topology(width, height)
         self._cells = cells
+        self.halite = np.zeros((height, width), dtype=np.int32)
+        self.ship_owner = np.full((height, width), NO_OWNER, dtype=np.int16)
+        self.structure_owner = np.full((height, width), NO_OWNER, dtype=np.int16)
+        self._halite_flat = self.halite.reshape(-1)
+        self._ship_owner_flat = self.ship_owner.reshape(-1)
+        self._structure_owner_flat = self.structure_owner.reshape(-1)
+        self._flat_cells = [cell for row in cells for cell in row]
+        self._positions = [cell.position for cell in self._flat_cells]
+        self._occupied = set()
+        self.dirty_cells = set()
+        self._home_fields = {}
+        self._inspiration = {}
+        # (cell id, owner) rows of the ships at the start of the turn, as _mark_entities found them
+        self._ship_cells = np.empty((0, 2), dtype=np.int64)
+        self.path_cache = pathfinding.PathCache()
+        # The routes ships planned with space_time_navigate, kept from turn to turn
+        self.reservations = pathfinding.ReservationTable(self.topology)
+        # Set by Game to the turn's deadline.TurnDeadline; without one every search runs
+        self.deadline = None
+        # Set by Game to its telemetry.Telemetry when telemetry is enabled
+        self.telemetry = None
+        for y, row in enumerate(cells):
+            for x, cell in enumerate(row):
+                cell._attach(self, y * width + x)
 
     def __getitem__(self, location):
         """
@@ -154,12 +341,18 @@ class GameMap:
         :return: the contents housing that cell or entity
         """
         if isinstance(location, Position):
-            location = self.normalize(location)
-            return self._cells[location.y][location.x]
+            return self._flat_cells[self.topology.cell_id(location)]
         elif isinstance(location, Entity):
             return self._cells[location.position.y][location.position.x]
         return None
 
+    @property
+    def dirty_positions(self):
+        """
+        :return: The positions of the cells whose halite changed in the last update
+        """
+        return [self._positions[index] for index in self.dirty_cells]
+
     def calculate_distance(self, source, target):
         """
         Compute the Manhattan distance between two locations.
@@ -168,9 +361,8 @@ class GameMap:
         :param target: The target to where calculate
         :return: The distance between these items
         """
-        resulting_position = abs(source - target)
-        return min(resulting_position.x, self.width - resulting_position.x) + \
-            min(resulting_position.y, self.height - resulting_position.y)
+        return self.topology.distance_x[(source.x - target.x) % self.width] + \
+            self.topology.distance_y[(source.y - target.y) % self.height]
 
     def normalize(self, position):
         """
@@ -179,22 +371,69 @@ class GameMap:
         height bounds, and places it within those bounds considering
         wraparound.
         :param position: A position object.
-        :return: A normalized position object fitting within the bounds of the map
+        :return: A normalized position object fitting within the bounds of the map. The same object is
+                 returned for every position of a cell.
         """
-        return Position(position.x % self.width, position.y % self.height)
+        return self._positions[self.topology.cell_id(position)]
 
     def normalize_direction(self,direction):
-        if direction.x > 1:
-            direction.x = direction.x - self.width
-        elif direction.x < -1:
-            direction.x = direction.x + self.width
+        """
+        Maps an offset between two normalized positions that crosses a map edge to the equivalent
+        single step across the wrap, e.g. (width - 1, 0) to (-1, 0).
+        :param direction: The offset as a position object
+        :return: A new position object holding the wrapped offset
+        """
+        x, y = direction.x, direction.y
+        if x > 1:
+            x = x - self.width
+        elif x < -1:
+            x = x + self.width
+
+        if y > 1:
+            y = y - self.height
+        elif y < -1:
+            y = y + self.height
+
+        return Position(x, y)
+
+    def cell_position(self, cell_id):
+        """
+        :param cell_id: The integer id of a cell
+        :return: The normalized position object of that cell
+        """
+        return self._positions[cell_id]
+
+    def directional_offset(self, position, direction):
+        """
+        Like Position.directional_offset, but normalized and without allocating.
+        :param position: The position to move from
+        :param direction: The Direction cardinal tuple
+        :return: The normalized position object in that direction
+        """
+        cell_id = self.topology.cell_id(position)
+        if direction == Direction.Still:
+            return self._positions[cell_id]
+        return self._positions[self.topology.neighbours[cell_id][_CARDINAL_INDEX[direction]]]
 
-        if direction.y > 1:
-            direction.y = direction.y - self.height
-        elif direction.y < -1:
-            direction.y = direction.y + self.height      
+    def halite_within(self, position, radius):
+        """
+        The halite around a position, read in one slice through a precomputed diamond of offsets.
+        :param position: The position at the centre
+        :param radius: The wrap-around Manhattan distance, rounded down
+        :return: Int arrays (cell ids, halite) of the cells within the radius, nearest first
+        """
+        cells = self.topology.diamond_cells(self.topology.cell_id(position), radius)
+        return cells, self._halite_flat[cells]
 
-        return direction  
+    def halite_within_many(self, positions, radius):
+        """
+        Like halite_within for many positions at once, such as all of a player's ships.
+        :param positions: Iterable of the positions at the centres
+        :param radius: The wrap-around Manhattan distance, rounded down
+        :return: Int arrays (cell ids, halite) of shape (len(positions), K), a row per position
+        """
+        cells = self.topology.diamond_cells([self.topology.cell_id(position) for position in positions], radius)
+        return cells, self._halite_flat[cells]
 
     @staticmethod
     def _get_target_direction(source, target):
@@ -218,14 +457,15 @@ class GameMap:
         :return: A list of valid (closest) Directions towards your target.
         """
         possible_moves = []
-        distance = abs(destination - source)
+        distance_x = abs(destination.x - source.x)
+        distance_y = abs(destination.y - source.y)
         y_cardinality, x_cardinality = self._get_target_direction(source, destination)
 
-        if distance.x != 0:
-            possible_moves.append(x_cardinality if distance.x < (self.width / 2)
+        if distance_x != 0:
+            possible_moves.append(x_cardinality if distance_x < (self.width / 2)
                                   else Direction.invert(x_cardinality))
-        if distance.y != 0:
-            possible_moves.append(y_cardinality if distance.y < (self.height / 2)
+        if distance_y != 0:
+            possible_moves.append(y_cardinality if distance_y < (self.height / 2)
                                   else Direction.invert(y_cardinality))
         return possible_moves
 
@@ -250,74 +490,135 @@ class GameMap:
                                       else Direction.invert(y_cardinality))
             return possible_moves
 
-    def aStar_plan(self,source,destination, end_game = False):
-        openset = set()
-        closedset = set()
-        current = (source.x,source.y)
-        goal = (destination.x, destination.y)
-        openset.add(current)
-        movement_cost = {current: 0}
-        hueristic_cost = {current: self.calculate_distance(source,destination)}
-        total_cost = {current: self.calculate_distance(source,destination)}
-        parent = {current: None}
-
-        while openset:
-            min_cost = min(total_cost.values())
-            current = [k for k, v in total_cost.items() if v==min_cost]
-            current = current[0]
-            if current == goal:
-                path = []
-                cost = 0
-                while parent[current]:
-                    cost = movement_cost[current] + cost
-                    path.append(current)
-                    current = parent[current]
-                if not path:
-                    cost = 0
-                    move = (0,0)
-                    return {'move': move, 'cost': cost}
-                path = path[::-1]
-                target_position = Position(path[0][0],path[0][1])
-                direction =  target_position - source
-                direction = self.normalize_direction(direction)
-                move = (direction.x, direction.y)
-                if move == None:
-                    cost = 0
-                    move = (0,0)
-                return {'move': move, 'cost': cost}
-
-            openset.remove(current)
-            del total_cost[current]
-            closedset.add(current)
-            current_position= Position(current[0],current[1])
-            directions = current_position.get_surrounding_cardinals()
-            for d in directions:
-                d= self.normalize(d)
-                if self[d].is_occupied:
-                    if end_game and self[d].has_structure:
-                        pass
-                    else:
-                        if self.calculate_distance(source,d) < 2:
-                            continue
-                node = (d.x,d.y)
-                if node in closedset:
-                    continue
-                if node in openset:
-                    new_g = movement_cost[current] + (1/constants.MOVE_COST_RATIO)*self[current_position].halite_amount
-                    if movement_cost[node] > new_g:
-                        movement_cost[node] = new_g
-                        total_cost[node] = movement_cost[node] + hueristic_cost[node]
-                        parent[node] = current
-                else:
-                    movement_cost[node] = movement_cost[current] + (1/constants.MOVE_COST_RATIO)*self[current_position].halite_amount
-                    hueristic_cost[node] = self.calculate_distance(d,destination)
-                    total_cost[node] = movement_cost[node] + hueristic_cost[node]
-                    parent[node] = current
-                    openset.add(node)
-        cost = 0
-        move = (0,0)
-        return {'move': move, 'cost': cost}
+    def _tiered_search(self, source, destination, end_game=False, owner=None):
+        """
+        Runs _search as far as the turn's deadline allows: a full search, only a cached path, or
+        nothing at all. Counts the tier that was used in the deadline's metrics.
+        :return: A pathfinding.SearchResult, or None if no search was allowed and no cached path applies
+        """
+        tier = self.deadline.tier() if self.deadline is not None else deadline.ASTAR
+        result = None
+        if tier != deadline.NAIVE:
+            result = self._search(source, destination, end_game, cached_only=tier == deadline.CACHED, owner=owner)
+        if self.deadline is not None:
+            self.deadline.record(tier if result is not None else deadline.NAIVE)
+        return result
+
+    @telemetry.timed_search('search')
+    def _search(self, source, destination, end_game=False, cached_only=False, owner=None):
+        """
+        Runs the shared A* search between two positions, reusing a cached path when possible.
 
+        Occupied cells next to the source may not be entered, unless end_game is set and they hold a structure,
+        or they hold a ship of owner. Searches that let owner's ships through are cached apart from the others.
+        :param source: The starting position
+        :param destination: The position to reach
+        :param end_game: Whether ships on structures may be crashed into
+        :param cached_only: Return None instead of searching when no cached path can be reused
+        :param owner: The id of the player whose ships don't block, or None for all ships to block
+        :return: A pathfinding.SearchResult over cell ids
+        """
+        start = self.topology.cell_id(source)
+        goal = self.topology.cell_id(destination)
+        blocked = self._blocked_neighbours(start, end_game, owner)
+        key = end_game if owner is None else (end_game, owner)
+        result = self.path_cache.get(start, goal, key, blocked)
+        if result is None and not cached_only:
+            result = pathfinding.astar(start, goal, self.topology, self._move_cost, blocked)
+            self.path_cache.put(start, goal, key, result)
+        return result
+
+    def _blocked_neighbours(self, start, end_game=False, owner=None):
+        """
+        :param start: The id of a cell
+        :param end_game: Whether ships on structures may be crashed into
+        :param owner: The id of the player whose ships don't block, or None for all ships to block
+        :return: The set of ids of the occupied cells next to start, leaving out structures if end_game is set
+            and the cells of owner's ships
+        """
+        blocked = set()
+        for neighbour in self.topology.neighbours[start]:
+            cell = self._flat_cells[neighbour]
+            if cell.is_occupied and not (end_game and cell.has_structure) and \
+                    (owner is None or cell.ship.owner != owner):
+                blocked.add(neighbour)
+        return blocked
+
+    def _move_cost(self, cell_id):
+        """
+        :param cell_id: The integer id of a cell
+        :return: The halite it costs to move off that cell
+        """
+        return (1/constants.MOVE_COST_RATIO)*self._halite_flat.item(cell_id)
+
+
+    @telemetry.timed('home_field')
+    def home_field(self, player):
+        """
+        Returns the cheapest routes from every cell to the player's shipyard or nearest dropoff,
+        computed in a single search the first time it is asked for each turn.
+
+        :param player: The player whose structures to route to
+        :return: A pathfinding.HomeField with cost, direction and structure lookups by position
+        """
+        if player.id not in self._home_fields:
+            structures = [player.shipyard] + list(player.get_dropoffs())
+            move_costs = (self._halite_flat * (1/constants.MOVE_COST_RATIO)).tolist()
+            self._home_fields[player.id] = pathfinding.HomeField(self.topology, structures, move_costs.__getitem__)
+        return self._home_fields[player.id]
+
+    @telemetry.timed('inspiration')
+    def inspiration(self, player_id):
+        """
+        Returns where ships of a player would be inspired and what mining and moving would yield
+        and cost there, computed for the whole map the first time it is asked for each turn.
+        Opponent ships are counted where they were at the start of the turn, by convolving the
+        map of ships with the inspiration diamond.
+
+        :param player_id: The id of the player whose ships to consider
+        :return: An InspirationField of (height, width) arrays
+        """
+        if player_id not in self._inspiration:
+            cells, owners = self._ship_cells[:, 0], self._ship_cells[:, 1]
+            ships = np.stack([np.bincount(cells, minlength=self.topology.size),
+                              np.bincount(cells[owners == player_id], minlength=self.topology.size)])
+            ships = ships.reshape(2, self.height, self.width)
+            nearby = self.topology.diamond_sum(ships, constants.INSPIRATION_RADIUS)
+            enemies = nearby[0] - nearby[1]
+            inspired = enemies >= constants.INSPIRATION_SHIP_COUNT
+            if not constants.INSPIRATION_ENABLED:
+                inspired[:] = False
+            extract_ratio = np.where(inspired, constants.INSPIRED_EXTRACT_RATIO, constants.EXTRACT_RATIO)
+            extracted = -(-self.halite // extract_ratio)
+            halite_yield = extracted + np.where(
+                inspired, (extracted * constants.INSPIRED_BONUS_MULTIPLIER).astype(np.int64), 0)
+            move_cost = self.halite // np.where(inspired, constants.INSPIRED_MOVE_COST_RATIO,
+                                                constants.MOVE_COST_RATIO)
+            self._inspiration[player_id] = InspirationField(enemies, inspired, halite_yield, move_cost)
+        return self._inspiration[player_id]
+
+    @telemetry.timed('aStar_plan')
+    def aStar_plan(self,source,destination, end_game = False):
+        """
+        Plans a route between two positions without claiming any cells.
+        Once the turn's deadline stops A* searches, routes that aren't cached are estimated as the
+        distance times the mean move cost of both ends, with a first move from get_safe_moves.
+        :param source: The starting position
+        :param destination: The position to reach
+        :param end_game: Whether ships on structures may be crashed into
+        :return: A dict with the first 'move' as a direction tuple and the 'cost' of the route
+        """
+        result = self._tiered_search(source, destination, end_game)
+        if result is None:
+            moves = self.get_safe_moves(source, destination)
+            step_cost = (self._move_cost(self.topology.cell_id(source)) +
+                         self._move_cost(self.topology.cell_id(destination))) / 2
+            return {'move': moves[0] if moves else (0, 0),
+                    'cost': self.calculate_distance(source, destination) * step_cost}
+        if not result.path:
+            return {'move': (0, 0), 'cost': 0}
+        move = self.topology.direction(self.topology.cell_id(source), result.path[0])
+        return {'move': move, 'cost': sum(result.costs)}
 
     def naive_navigate(self, ship, destination):
         """
@@ -327,111 +628,217 @@ class GameMap:
         :param destination: Ending position
         :return: A direction.
         """
-        if ship.halite_amount >= (1/constants.MOVE_COST_RATIO)*self[ship.position].halite_amount and not self[ship.position].has_structure:
+        start = self.topology.cell_id(ship.position)
+        cell = self._flat_cells[start]
+        if ship.halite_amount >= (1/constants.MOVE_COST_RATIO)*cell.halite_amount and not cell.has_structure:
             for direction in self.get_safe_moves(ship.position, destination):
-                target_pos = ship.position.directional_offset(direction)
-                if not self[target_pos].is_occupied:
-                    self[target_pos].mark_unsafe(ship)
-                    self[ship.position].mark_safe()
+                target_cell = self._flat_cells[self.topology.neighbours[start][_CARDINAL_INDEX[direction]]]
+                if not target_cell.is_occupied:
+                    target_cell.mark_unsafe(ship)
+                    cell.mark_safe()
                     return direction
 
         return Direction.Still
 
+    @telemetry.timed('aStar_navigate', ship_argument=True)
     def aStar_navigate(self,ship,destination, end_game = False):
-        if ship.halite_amount < (1/constants.MOVE_COST_RATIO)*self[ship.position].halite_amount and not self[ship.position].has_structure:
+        """
+        Returns the first move of the cheapest route towards the destination and claims its target cell.
+        Falls back to naive_navigate if the destination can't be reached, or if the turn's deadline
+        allows no A* search and no cached path leads there.
+
+        :param ship: The ship to move.
+        :param destination: Ending position
+        :param end_game: Whether ships on structures may be crashed into
+        :return: A direction tuple.
+        """
+        start = self.topology.cell_id(ship.position)
+        cell = self._flat_cells[start]
+        if ship.halite_amount < (1/constants.MOVE_COST_RATIO)*cell.halite_amount and not cell.has_structure:
+            return (0,0)
+        result = self._tiered_search(ship.position, destination, end_game)
+        if result is None or result.path is None:
+            return self.naive_navigate(ship,destination)
+        if not result.path:
             return (0,0)
-        openset = set()
-        closedset = set()
-        current = (ship.position.x,ship.position.y)
-        goal = (destination.x, destination.y)
-        openset.add(current)
-        movement_cost = {current: 0}
-        hueristic_cost = {current: self.calculate_distance(ship.position,destination)}
-        total_cost = {current: self.calculate_distance(ship.position,destination)}
-        parent = {current: None}
-
-        while openset:
-            min_cost = min(total_cost.values())
-            current = [k for k, v in total_cost.items() if v==min_cost]
-            current = current[0]
-            if current == goal:
-                path = []
-                cost = 0
-                while parent[current]:
-                    cost = movement_cost[current] + cost
-                    path.append(current)
-                    current = parent[current]
-                if not path:
-                    return (0,0)
-                path = path[::-1]
-                target_position = Position(path[0][0],path[0][1])
-                direction =  target_position - ship.position
-                direction = self.normalize_direction(direction)
-                self[ship.position].mark_safe()
-                self[target_position].mark_unsafe(ship)
-                move = (direction.x, direction.y)
-                if move == None:
-                    move = self.naive_navigate(ship,destination)
+        cell.mark_safe()
+        self._flat_cells[result.path[0]].mark_unsafe(ship)
+        return self.topology.direction(start, result.path[0])
+
+
+    def _leaving(self, ship, cell_id, owner):
+        """
+        :param ship: The ship on a cell
+        :param cell_id: The id of the cell
+        :param owner: The id of the player asking
+        :return: Whether the ship is the player's and follows a reserved route off the cell this turn,
+            which it can afford
+        """
+        cell = self._flat_cells[cell_id]
+        return ship.owner == owner and self.reservations.leaves(ship.id, cell_id) and (
+            cell.has_structure or ship.halite_amount >= (1/constants.MOVE_COST_RATIO)*cell.halite_amount)
+
+    @telemetry.timed('space_time_navigate', ship_argument=True)
+    def space_time_navigate(self, ship, destination, end_game = False, horizon = 8, max_expansions = 2000,
+                            avoid = ()):
+        """
+        Returns the first move of a route towards the destination that keeps out of the routes other
+        ships reserved in reservations, and reserves it for the next horizon turns. Ships planned one
+        after another thus avoid each other over several turns, waiting for a cell to clear where
+        that is cheaper than going around. A ship keeps following the route it reserved on an
+        earlier turn as long as it leads to the same destination and its next cell is free.
+        Falls back to aStar_navigate once the turn's deadline allows no new A* searches, and to
+        naive_navigate if no route gets closer to the destination.
+
+        :param ship: The ship to move.
+        :param destination: Ending position
+        :param end_game: Whether ships on structures may be crashed into
+        :param horizon: How many turns to plan ahead
+        :param max_expansions: The most (cell, turn) states the search may expand
+        :param avoid: Positions the ship may not move onto this turn, e.g. the cell it just left
+        :return: A direction tuple.
+        """
+        start = self.topology.cell_id(ship.position)
+        goal = (self.topology.cell_id(destination), end_game)
+        # Crashing into a structure takes any number of ships a turn, so it is never reserved
+        shared = (goal[0],) if end_game and self._flat_cells[goal[0]].has_structure else ()
+        cell = self._flat_cells[start]
+        if ship.halite_amount < (1/constants.MOVE_COST_RATIO)*cell.halite_amount and not cell.has_structure:
+            self.reservations.reserve(ship.id, start, [start], goal, shared)
+            return (0,0)
+        # Occupied cells next to the ship are blocked, unless the ship of ours on them is leaving
+        blocked = {self.topology.cell_id(position) for position in avoid}
+        blocked.discard(start)
+        for neighbour in self.topology.neighbours[start]:
+            target_cell = self._flat_cells[neighbour]
+            if target_cell.is_occupied and not (end_game and target_cell.has_structure) and \
+                    not self._leaving(target_cell.ship, neighbour, ship.owner):
+                blocked.add(neighbour)
+
+        path = self.reservations.route(ship.id, start, goal)
+        # A wait is planned again, as whatever it waited for may have cleared
+        if path is None or path[0] in blocked or path[0] == start:
+            if self.deadline is not None and self.deadline.tier() != deadline.ASTAR:
+                move = self.aStar_navigate(ship, destination, end_game)
+                self.reservations.reserve(
+                    ship.id, start, [self.topology.cell_id(self.directional_offset(ship.position, move))], goal, shared)
                 return move
+            # A turn costs as much as moving off an average cell, so waiting only pays when the cells
+            # on the way are dearer than that or taken
+            turn_cost = 1 + self._halite_flat.mean() / constants.MOVE_COST_RATIO
+            result = pathfinding.space_time_astar(start, goal[0], self.topology, self._move_cost, self.reservations,
+                                                  horizon, max_expansions, blocked, turn_cost, shared)
+            if self.deadline is not None:
+                self.deadline.record(deadline.ASTAR)
+            if result.path is None:
+                move = self.naive_navigate(ship, destination)
+                self.reservations.reserve(
+                    ship.id, start, [self.topology.cell_id(self.directional_offset(ship.position, move))], goal, shared)
+                return move
+            # A ship that is there stays, so the cell is reserved for it for the whole horizon
+            path = result.path or [start] * horizon
+            self.reservations.reserve(ship.id, start, path, goal, shared)
+        if path[0] == start:
+            return (0,0)
+        cell.mark_safe()
+        self._flat_cells[path[0]].mark_unsafe(ship)
+        return self.topology.direction(start, path[0])
 
-            openset.remove(current)
-            del total_cost[current]
-            closedset.add(current)
-            current_position= Position(current[0],current[1])
-            directions = current_position.get_surrounding_cardinals()
-            for d in directions:
-                d= self.normalize(d)
-                if self[d].is_occupied:
-                    if end_game and self[d].has_structure:
-                        pass
-                    else:
-                        if self.calculate_distance(ship.position,d) < 2:
-                            continue
-                node = (d.x,d.y)
-                if node in closedset:
-                    continue
-                if node in openset:
-                    new_g = movement_cost[current] + (1/constants.MOVE_COST_RATIO)*self[current_position].halite_amount
-                    if movement_cost[node] > new_g:
-                        movement_cost[node] = new_g
-                        total_cost[node] = movement_cost[node] + hueristic_cost[node]
-                        parent[node] = current
-                else:
-                    movement_cost[node] = movement_cost[current] + (1/constants.MOVE_COST_RATIO)*self[current_position].halite_amount
-                    hueristic_cost[node] = self.calculate_distance(d,destination)
-                    total_cost[node] = movement_cost[node] + hueristic_cost[node]
-                    parent[node] = current
-                    openset.add(node)
-        move = self.naive_navigate(ship,destination)
-        return move
+    @telemetry.timed('rank_moves', ship_argument=True)
+    def rank_moves(self, ship, destination, end_game = False):
+        """
+        Orders a ship's moves for fleet.resolve_moves without claiming any cells: the first step
+        of the A* route, then the other moves that get closer to the destination, staying still,
+        and the remaining moves. Cells holding an enemy ship are left out, unless end_game is set
+        and they hold a structure. The fleet's own ships don't block the A* route, since
+        resolve_moves sorts out which of them move where, swaps included. The A* step is skipped
+        as in aStar_navigate when the turn's deadline runs short.
 
+        :param ship: The ship to move.
+        :param destination: Ending position
+        :param end_game: Whether ships on structures may be crashed into
+        :return: A list of direction tuples, most preferred first.
+        """
+        start = self.topology.cell_id(ship.position)
+        cell = self._flat_cells[start]
+        if ship.halite_amount < (1/constants.MOVE_COST_RATIO)*cell.halite_amount and not cell.has_structure:
+            return [Direction.Still]
+        goal = self.topology.cell_id(destination)
+        result = self._tiered_search(ship.position, destination, end_game, ship.owner)
+        preferred = [self.topology.direction(start, result.path[0])] if result is not None and result.path else []
+        closer = []
+        other = []
+        distance = self.topology.distance(start, goal)
+        for direction, neighbour in zip(Direction.get_all_cardinals(), self.topology.neighbours[start]):
+            target_cell = self._flat_cells[neighbour]
+            if direction in preferred:
+                continue
+            if target_cell.is_occupied and target_cell.ship.owner != ship.owner and \
+                    not (end_game and target_cell.has_structure):
+                continue
+            if self.topology.distance(neighbour, goal) < distance:
+                closer.append(direction)
+            else:
+                other.append(direction)
+        return preferred + closer + [Direction.Still] + other
 
     @staticmethod
-    def _generate():
+    def _generate(read_line=input):
         """
         Creates a map object from the input given by the game engine
+        :param read_line: Function returning the next line of input
         :return: The map object
         """
-        map_width, map_height = map(int, input().split())
+        map_width, map_height = map(int, read_line().split())
         game_map = [[None for _ in range(map_width)] for _ in range(map_height)]
         for y_position in range(map_height):
-            cells = input().split()
+            cells = read_line().split()
             for x_position in range(map_width):
                 game_map[y_position][x_position] = MapCell(Position(x_position, y_position),
                                                            int(cells[x_position]))
         return GameMap(game_map, map_width, map_height)
 
-    def _update(self):
+    def _update(self, cells=None):
         """
         Updates this map object from the input given by the game engine
+        :param cells: Array of (x, y, halite) rows for the changed cells if already parsed, otherwise they are read from stdin
         :return: nothing
         """
-        # Mark cells as safe for navigation (will re-mark unsafe cells
-        # later)
-        for y in range(self.height):
-            for x in range(self.width):
-                self[Position(x, y)].ship = None
-
-        for _ in range(int(input())):
-            cell_x, cell_y, cell_energy = map(int, input().split())
-            self[Position(cell_x, cell_y)].halite_amount = cell_energy
+        # Mark the cells occupied last turn as safe for navigation (will
+        # re-mark unsafe cells later)
+        for index in list(self._occupied):
+            self._flat_cells[index].mark_safe()
+        self._home_fields = {}
+        self._inspiration = {}
+        self.reservations.advance()
+
+        if cells is not None:
+            self.halite[cells[:, 1], cells[:, 0]] = cells[:, 2]
+            self.dirty_cells = set((cells[:, 1] * self.width + cells[:, 0]).tolist())
+        else:
+            self.dirty_cells = set()
+            for _ in range(int(input())):
+                cell_x, cell_y, cell_energy = map(int, input().split())
+                self.halite[cell_y, cell_x] = cell_energy
+                self.dirty_cells.add(cell_y * self.width + cell_x)
+        self.path_cache.invalidate(self.dirty_cells)
+
+    def _mark_entities(self, players):
+        """
+        Marks cells with ships as unsafe for navigation and places the players' structures.
+        Structures are never removed, so only new ones need marking.
+        :param players: The Player objects, already updated for the turn
+        :return: nothing.
+        """
+        ship_cells = []
+        for player in players:
+            for ship in player.get_ships():
+                self[ship.position].mark_unsafe(ship)
+                ship_cells.append((self.topology.cell_id(ship.position), player.id))
+
+            if not self[player.shipyard].has_structure:
+                self[player.shipyard].structure = player.shipyard
+            for dropoff in player.get_dropoffs():
+                if not self[dropoff].has_structure:
+                    self[dropoff].structure = dropoff
+        self._ship_cells = np.array(ship_cells, dtype=np.int64).reshape(-1, 2)
@@ -0,0 +1,160 @@
+"""
+Asynchronous, rate-limited logging for bots.
+
+With logging.basicConfig every logging call formats its message and writes it to the log
+file before it returns, inside the turn's time budget. start() instead gives the root
+logger a handler that only puts records on a queue. A background thread formats them and
+writes them as JSON lines, one object per record with the turn it was logged on, its level,
+its category (the name of the logger) and any fields passed as extra={'fields': {...}}.
+
+It is off by default. Turn it on with Game(async_logging=True), or for a bot that leaves the
+argument unset by setting the environment variable HLT_ASYNC_LOGGING to 1, and the bot's log
+becomes bot-<player id>.jsonl instead of bot-<player id>.log.
+
+Pass the arguments of a message to the logging call rather than formatting them into it,
+logging.info("Ship %s moves %s", ship.id, move), so that records which are filtered out are
+never formatted at all. Since formatting happens later on the background thread, the
+arguments should not be objects that change after the call.
+"""
+
+import atexit
+import collections
+import json
+import logging
+import logging.handlers
+import os
+import queue
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops records of chatty categories before they are queued: either all but every nth record
+    of a category, or all records of a category beyond a number per turn. Records at WARNING or
+    above are always let through.
+    """
+    def __init__(self):
+        super().__init__()
+        self.turn = 0
+        self._per_turn = {}
+        self._every = {}
+        self._seen = collections.Counter()
+        self._kept = collections.Counter()
+        self._suppressed = collections.Counter()
+
+    def limit(self, category, per_turn):
+        """
+        Keeps at most per_turn records of a category each turn.
+        :param category: The name of the logger, 'root' for the logging module functions
+        :return: nothing.
+        """
+        self._per_turn[category] = per_turn
+
+    def sample(self, category, every):
+        """
+        Keeps one in every records of a category.
+        :param category: The name of the logger, 'root' for the logging module functions
+        :return: nothing.
+        """
+        self._every[category] = every
+
+    def start_turn(self, turn_number):
+        """
+        Resets the per turn limits and stamps the following records with a new turn.
+        :return: nothing.
+        """
+        self.turn = turn_number
+        self._kept.clear()
+        self._suppressed.clear()
+
+    def suppressed(self):
+        """
+        :return: Dict of the number of records dropped this turn by category
+        """
+        return dict(self._suppressed)
+
+    def filter(self, record):
+        record.turn = self.turn
+        category = record.name
+        if record.levelno >= logging.WARNING:
+            return True
+        every = self._every.get(category)
+        if every is not None:
+            self._seen[category] += 1
+            if self._seen[category] % every != 1 % every:
+                self._suppressed[category] += 1
+                return False
+        per_turn = self._per_turn.get(category)
+        if per_turn is not None:
+            if self._kept[category] >= per_turn:
+                self._suppressed[category] += 1
+                return False
+            self._kept[category] += 1
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object.
+    """
+    def format(self, record):
+        entry = {
+            'turn': getattr(record, 'turn', None),
+            'level': record.levelname,
+            'category': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records as they are. QueueHandler formats the message before queuing it so the record
+    can be pickled, which is not needed for a queue within the process.
+    """
+    def prepare(self, record):
+        return record
+
+
+def requested():
+    """
+    :return: Whether the environment variable HLT_ASYNC_LOGGING asks for asynchronous logging
+    """
+    return os.environ.get('HLT_ASYNC_LOGGING', '') not in ('', '0')
+
+
+def start(player_id, filename=None, level=logging.DEBUG):
+    """
+    Sends the records of the root logger through a queue to a thread writing JSON lines, unless
+    the root logger already has a handler, as logging.basicConfig does. The thread is stopped,
+    and the remaining records written, when the interpreter exits.
+    :param player_id: The bot's player id
+    :param filename: The file to write, by default bot-<player_id>.jsonl
+    :param level: The level of the root logger
+    :return: The RateLimitFilter applied to the records, or None if logging was already set up
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+    # The JSON lines hold neither the caller nor the thread or process, so skip looking them
+    # up for every record, as the Optimization section of the logging documentation suggests
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    file_handler = logging.FileHandler(filename or "bot-{}.jsonl".format(player_id), mode="w")
+    file_handler.setFormatter(JsonLinesFormatter())
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, file_handler)
+    rate_limit = RateLimitFilter()
+    queue_handler = _LazyQueueHandler(records)
+    queue_handler.addFilter(rate_limit)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    return rate_limit
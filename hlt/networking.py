@@ -2,37 +2,63 @@ import json
 import logging
 import sys
 
-from . import constants
+from . import constants, logs, recording, telemetry
+from .deadline import TurnDeadline
+from .frames import FrameReader
 from .game_map import GameMap, Player
 
+"""Logger of the per turn summary, so rate limits on other loggers leave it alone."""
+_turn_log = logging.getLogger('hlt.turn')
+
 class Game:
     """
     The game object holds all metadata pertinent to the game and all its contents
     """
-    def __init__(self):
+    def __init__(self, fast_input=False, turn_budget=1.5, async_logging=None):
         """
         Initiates a game object collecting all start-state instances for the contained items for pre-game.
         Also sets up basic logging.
+        :param fast_input: Parse each turn's frame in bulk from sys.stdin.buffer instead of line by line
+        :param turn_budget: Seconds per turn after which navigation degrades, see deadline.TurnDeadline
+        :param async_logging: Log JSON lines to bot-<id>.jsonl from a background thread, see logs.start.
+            None leaves it to the HLT_ASYNC_LOGGING environment variable, see logs.requested
         """
         self.turn_number = 0
+        self.deadline = TurnDeadline(turn_budget)
+        # Has to replace sys.stdin before anything is read, see recording
+        recorder = recording.recorder()
+        self._frame_reader = FrameReader(sys.stdin.buffer) if fast_input else None
+        read_line = self._frame_reader.readline if fast_input else input
 
         # Grab constants JSON
-        raw_constants = input()
+        raw_constants = read_line()
         constants.load_constants(json.loads(raw_constants))
 
-        num_players, self.my_id = map(int, input().split())
+        num_players, self.my_id = map(int, read_line().split())
+        self.telemetry = telemetry.Telemetry(self.my_id, self.deadline.clock) if telemetry.enabled else None
+        if recorder is not None:
+            recorder.start(self.my_id)
 
-        logging.basicConfig(
-            filename="bot-{}.log".format(self.my_id),
-            filemode="w",
-            level=logging.DEBUG,
-        )
+        # With async_logging, self.log_filter can rate limit or sample chatty loggers
+        self.log_filter = None
+        if async_logging is None:
+            async_logging = logs.requested()
+        if async_logging:
+            self.log_filter = logs.start(self.my_id)
+        else:
+            logging.basicConfig(
+                filename="bot-{}.log".format(self.my_id),
+                filemode="w",
+                level=logging.DEBUG,
+            )
 
         self.players = {}
         for player in range(num_players):
-            self.players[player] = Player._generate()
+            self.players[player] = Player._generate(read_line)
         self.me = self.players[self.my_id]
-        self.game_map = GameMap._generate()
+        self.game_map = GameMap._generate(read_line)
+        self.game_map.deadline = self.deadline
+        self.game_map.telemetry = self.telemetry
 
     def ready(self, name):
         """
@@ -46,32 +72,55 @@ class Game:
         Updates the game object's state.
         :returns: nothing.
         """
-        self.turn_number = int(input())
-        logging.info("=============== TURN {:03} ================".format(self.turn_number))
-
-        for _ in range(len(self.players)):
-            player, num_ships, num_dropoffs, halite = map(int, input().split())
-            self.players[player]._update(num_ships, num_dropoffs, halite)
-
-        self.game_map._update()
-
-        # Mark cells with ships as unsafe for navigation
-        for player in self.players.values():
-            for ship in player.get_ships():
-                self.game_map[ship.position].mark_unsafe(ship)
+        if self._frame_reader is not None:
+            # The turn starts when the engine's input arrives, so parsing it counts towards the turn
+            self._frame_reader.wait()
+            self.deadline.start()
+            frame = self._frame_reader.read_frame(len(self.players))
+            self.turn_number = frame.turn_number
+            for player, halite, ships, dropoffs in frame.players:
+                self.players[player]._load(halite, ships, dropoffs, self.game_map)
+            self.game_map._update(frame.cells)
+        else:
+            self.turn_number = int(input())
+            self.deadline.start()
+            for _ in range(len(self.players)):
+                player, num_ships, num_dropoffs, halite = map(int, input().split())
+                self.players[player]._update(num_ships, num_dropoffs, halite, self.game_map)
+            self.game_map._update()
+        if self.log_filter is not None:
+            self.log_filter.start_turn(self.turn_number)
+        logging.info("=============== TURN %03d ================", self.turn_number)
+        if self.telemetry is not None:
+            self.telemetry.start_turn(self.turn_number)
 
-            self.game_map[player.shipyard.position].structure = player.shipyard
-            for dropoff in player.get_dropoffs():
-                self.game_map[dropoff.position].structure = dropoff
+        self.game_map._mark_entities(self.players.values())
+        if self.telemetry is not None:
+            self.telemetry.record('update_frame', self.deadline.elapsed())
 
-    @staticmethod
-    def end_turn(commands):
+    def end_turn(self, commands):
         """
         Method to send all commands to the game engine, effectively ending your turn.
+        Also stops the turn's deadline and logs how long the turn took and how it navigated.
         :param commands: Array of commands to send to engine
         :return: nothing.
         """
+        sent = self.deadline.elapsed()
         send_commands(commands)
+        if self.telemetry is not None:
+            self.telemetry.record('end_turn', self.deadline.elapsed() - sent)
+            self.telemetry.record('turn', self.deadline.elapsed())
+            self.telemetry.end_turn()
+        elapsed = self.deadline.finish()
+        if elapsed > self.deadline.budget:
+            logging.warning("Turn %d took %.0fms, over the budget of %.0fms.",
+                            self.turn_number, elapsed * 1000, self.deadline.budget * 1000)
+        tiers = dict(self.deadline.turn_tiers)
+        fields = {'elapsed_ms': round(elapsed * 1000, 3), 'tiers': tiers, 'commands': len(commands)}
+        if self.log_filter is not None:
+            fields['suppressed'] = self.log_filter.suppressed()
+        _turn_log.info("Turn %d took %.1fms, navigation tiers %s", self.turn_number, elapsed * 1000, tiers,
+                       extra={'fields': fields})
 
 
 def send_commands(commands):
@@ -0,0 +1,492 @@
+"""
+Shortest path search over the toroidal game grid.
+
+Cells are addressed by integer ids (see topology.Topology) rather than
+Position objects so the inner loop never allocates.
+"""
+
+import heapq
+from collections import namedtuple
+
+SearchResult = namedtuple('SearchResult', ['path', 'costs', 'expanded'])
+
+
+def astar(start, goal, topology, step_cost, blocked=()):
+    """
+    A* search from start to goal with a binary heap frontier.
+
+    Stale heap entries are skipped when popped (lazy deletion) instead of
+    being removed when a cheaper route to a node is found. Closed nodes are
+    never reopened.
+    :param start: The id of the start cell
+    :param goal: The id of the goal cell
+    :param topology: The topology.Topology of the map
+    :param step_cost: Callable taking a cell id and returning the cost of leaving that cell
+    :param blocked: Container of cell ids that may not be entered
+    :return: A SearchResult. path holds the cell ids after start up to and including goal,
+             costs the accumulated movement cost at each of them. path is None if goal can't be reached.
+    """
+    width = topology.width
+    height = topology.height
+    xs = topology.xs
+    ys = topology.ys
+    distance_x = topology.distance_x
+    distance_y = topology.distance_y
+    neighbours = topology.neighbours
+    goal_x = xs[goal]
+    goal_y = ys[goal]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    movement_cost = {start: 0}
+    parent = {start: None}
+    closed = set()
+    frontier = [(0, 0, start)]
+    counter = 1
+    expanded = 0
+
+    while frontier:
+        _, _, current = heappop(frontier)
+        if current in closed:
+            continue
+        if current == goal:
+            path = []
+            while parent[current] is not None:
+                path.append(current)
+                current = parent[current]
+            path.reverse()
+            return SearchResult(path, [movement_cost[node] for node in path], expanded)
+
+        closed.add(current)
+        expanded += 1
+        new_g = movement_cost[current] + step_cost(current)
+        for node in neighbours[current]:
+            if node in closed or node in blocked:
+                continue
+            if node in movement_cost and movement_cost[node] <= new_g:
+                continue
+            movement_cost[node] = new_g
+            parent[node] = current
+            heuristic = distance_x[(xs[node] - goal_x) % width] + distance_y[(ys[node] - goal_y) % height]
+            heappush(frontier, (new_g + heuristic, counter, node))
+            counter += 1
+
+    return SearchResult(None, None, expanded)
+
+
+class _CostToGo:
+    """
+    The cost of the cheapest route from a cell to a goal when no other ship is in the way, found by
+    an A* search from the goal towards an origin that is resumed whenever a cell it hasn't settled
+    yet is asked for. With a consistent heuristic every settled cell has its final cost, so cells
+    near the origin cost little more than the one search.
+    """
+    def __init__(self, goal, origin, topology, step_cost, turn_cost):
+        """
+        :param goal: The id of the goal cell
+        :param origin: The id of the cell the search heads for
+        :param topology: The topology.Topology of the map
+        :param step_cost: Callable taking a cell id and returning the cost of leaving that cell
+        :param turn_cost: The cost of every move on top of step_cost
+        """
+        self._topology = topology
+        self._step_cost = step_cost
+        self._turn_cost = turn_cost
+        self._origin_x = topology.xs[origin]
+        self._origin_y = topology.ys[origin]
+        self._costs = {goal: 0}
+        self._settled = {}
+        self._frontier = [(0, 0, goal)]
+        self._counter = 1
+        self.expanded = 0
+
+    def __call__(self, cell):
+        """
+        :param cell: The id of a cell
+        :return: The cost of the cheapest route from that cell to the goal
+        """
+        settled = self._settled
+        if cell in settled:
+            return settled[cell]
+        topology = self._topology
+        width = topology.width
+        height = topology.height
+        xs = topology.xs
+        ys = topology.ys
+        distance_x = topology.distance_x
+        distance_y = topology.distance_y
+        neighbours = topology.neighbours
+        costs = self._costs
+        frontier = self._frontier
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        while frontier:
+            _, _, current = heappop(frontier)
+            if current in settled:
+                continue
+            settled[current] = costs[current]
+            self.expanded += 1
+            # Moving from node onto current costs leaving node
+            for node in neighbours[current]:
+                if node in settled:
+                    continue
+                new_cost = costs[current] + self._turn_cost + self._step_cost(node)
+                if node in costs and costs[node] <= new_cost:
+                    continue
+                costs[node] = new_cost
+                heuristic = self._turn_cost * (distance_x[(xs[node] - self._origin_x) % width] +
+                                               distance_y[(ys[node] - self._origin_y) % height])
+                heappush(frontier, (new_cost + heuristic, self._counter, node))
+                self._counter += 1
+            if current == cell:
+                return settled[cell]
+        return settled[cell]
+
+
+def space_time_astar(start, goal, topology, step_cost, reservations, horizon, max_expansions,
+                     blocked=(), turn_cost=1, shared=()):
+    """
+    A* search over (cell, turn) states that keeps out of the cells other ships reserved.
+
+    Every turn a ship may move to a neighbour or stay where it is, and every turn costs
+    turn_cost on top of the halite burned by moving, so waiting for a cell to clear is never
+    free. The heuristic is the exact cost of the rest of the route if no ship were in the way,
+    found by a resumable search back from the goal, so a ship only waits or goes around where
+    reservations make it. The search looks horizon turns ahead; a route still under way by then
+    is finished by the heuristic, as nothing is known of the turns after. Once max_expansions
+    states have been expanded the route to the expanded state nearest the goal is returned.
+    :param start: The id of the start cell
+    :param goal: The id of the goal cell
+    :param topology: The topology.Topology of the map
+    :param step_cost: Callable taking a cell id and returning the cost of leaving that cell
+    :param reservations: The ReservationTable of the ships that planned before
+    :param horizon: How many turns to plan
+    :param max_expansions: How many (cell, turn) states to expand at most
+    :param blocked: Container of cell ids that may not be entered on the first turn
+    :param turn_cost: The cost of a turn
+    :param shared: Container of cell ids any number of ships may enter on the same turn, such as a
+        structure crashed into at the end of the game, whose reservations are ignored
+    :return: A SearchResult. path holds the cell id for each turn after start, with repeated ids
+             for waits, and ends at goal unless the horizon or max_expansions cut it short.
+             costs holds the accumulated cost at each of them. expanded counts the states
+             expanded by both searches. path is None if the search found no route that gets
+             any closer.
+    """
+    size = topology.size
+    neighbours = topology.neighbours
+    reserved = reservations.cells
+    cost_to_go = _CostToGo(goal, start, topology, step_cost, turn_cost)
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    # States are the integers turn * size + cell
+    movement_cost = {start: 0}
+    parent = {start: None}
+    closed = set()
+    frontier = [(0, 0, start)]
+    counter = 1
+    expanded = 0
+    nearest = start
+    nearest_cost = cost_to_go(start)
+
+    while frontier:
+        _, _, state = heappop(frontier)
+        if state in closed:
+            continue
+        turn, current = divmod(state, size)
+        if current == goal or turn == horizon or expanded >= max_expansions:
+            if current != goal and turn != horizon:
+                if nearest == start:
+                    break
+                state = nearest
+            path = []
+            while parent[state] is not None:
+                path.append(state)
+                state = parent[state]
+            path.reverse()
+            return SearchResult([node % size for node in path], [movement_cost[node] for node in path],
+                                expanded + cost_to_go.expanded)
+
+        closed.add(state)
+        expanded += 1
+        remaining = cost_to_go(current)
+        if remaining < nearest_cost:
+            nearest, nearest_cost = state, remaining
+        next_turn = turn + 1
+        base = next_turn * size
+        move_g = movement_cost[state] + turn_cost + step_cost(current)
+        for node in neighbours[current] + (current,):
+            if (base + node in reserved and node not in shared) or (next_turn == 1 and node in blocked):
+                continue
+            new_state = base + node
+            new_g = move_g if node != current else movement_cost[state] + turn_cost
+            if new_state in closed or (new_state in movement_cost and movement_cost[new_state] <= new_g):
+                continue
+            movement_cost[new_state] = new_g
+            parent[new_state] = state
+            heappush(frontier, (new_g + cost_to_go(node), counter, new_state))
+            counter += 1
+
+    return SearchResult(None, None, expanded + cost_to_go.expanded)
+
+
+class ReservationTable:
+    """
+    The routes ships of the fleet plan to take over the next turns, shared by their
+    space_time_astar searches so that later ships route around earlier ones.
+
+    Routes are kept from turn to turn: advance moves them on by a turn, so that a ship can keep
+    following its route instead of searching again, and the other ships keep avoiding it.
+    A route nobody reserved again during a turn is dropped by the next advance, as is a finished one.
+
+    cells holds the reserved (turn, cell) pairs as the integers turn * size + cell, turn 1 being
+    the turn being played, and maps them to the id of the ship that reserved them.
+    """
+    def __init__(self, topology):
+        """
+        :param topology: The topology.Topology of the map
+        """
+        self._size = topology.size
+        self.clear()
+
+    def reserve(self, ship_id, start, path, goal=None, shared=()):
+        """
+        Reserves the cells of a ship's route, replacing the route it had.
+        :param ship_id: The id of the ship
+        :param start: The id of the cell the ship is on
+        :param path: The cell ids it is on in turns 1, 2, ...
+        :param goal: What the route leads to, compared by route()
+        :param shared: Container of cell ids on the route that are left unreserved, as any number
+            of ships may enter them
+        :return: nothing.
+        """
+        self._drop(ship_id)
+        self._routes[ship_id] = (start, list(path), goal, shared)
+        self._renewed.add(ship_id)
+        for turn, cell in enumerate(path, 1):
+            if cell not in shared:
+                self.cells[turn * self._size + cell] = ship_id
+
+    def route(self, ship_id, start, goal=None):
+        """
+        Renews the route of a ship, if it has one from the cell it is on to the same goal.
+        :param ship_id: The id of the ship
+        :param start: The id of the cell the ship is on
+        :param goal: The goal the route has to lead to
+        :return: The cell ids of the route for turns 1, 2, ..., or None
+        """
+        route = self._routes.get(ship_id)
+        if route is None or route[0] != start or route[2] != goal or not route[1]:
+            return None
+        self._renewed.add(ship_id)
+        return route[1]
+
+    def leaves(self, ship_id, cell):
+        """
+        :param ship_id: The id of a ship
+        :param cell: The id of the cell it is on
+        :return: Whether the ship's route takes it off that cell this turn
+        """
+        route = self._routes.get(ship_id)
+        return route is not None and route[0] == cell and bool(route[1]) and route[1][0] != cell
+
+    def owner(self, cell, turn):
+        """
+        :param cell: The id of a cell
+        :param turn: The turn, 1 being the turn being played
+        :return: The id of the ship that reserved the cell for that turn, or None
+        """
+        return self.cells.get(turn * self._size + cell)
+
+    def advance(self):
+        """
+        Moves the routes on by a turn, dropping those that weren't reserved or renewed during
+        the turn that ended and those that are finished.
+        :return: nothing.
+        """
+        routes = {ship_id: (path[0], path[1:], goal, shared)
+                  for ship_id, (start, path, goal, shared) in self._routes.items()
+                  if ship_id in self._renewed and len(path) > 1}
+        self.clear()
+        for ship_id, (start, path, goal, shared) in routes.items():
+            self.reserve(ship_id, start, path, goal, shared)
+        self._renewed = set()
+
+    def clear(self):
+        """
+        Drops all routes.
+        :return: nothing.
+        """
+        self.cells = {}
+        self._routes = {}
+        self._renewed = set()
+
+    def _drop(self, ship_id):
+        """
+        Removes the reservations of a ship's route.
+        :return: nothing.
+        """
+        route = self._routes.pop(ship_id, None)
+        if route is not None:
+            for turn, cell in enumerate(route[1], 1):
+                key = turn * self._size + cell
+                if self.cells.get(key) == ship_id:
+                    del self.cells[key]
+
+
+def dijkstra(sources, topology, step_cost):
+    """
+    Multi-source Dijkstra computing the cheapest route from every cell to the nearest source.
+    :param sources: The ids of the cells routes lead to
+    :param topology: The topology.Topology of the map
+    :param step_cost: Callable taking a cell id and returning the cost of leaving that cell
+    :return: Three lists indexed by cell id: the cost of the cheapest route, the id of the next
+             cell along it (the cell itself for sources) and the id of the source it ends at.
+             Unreachable cells have a cost of None.
+    """
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    neighbours = topology.neighbours
+    costs = [None] * topology.size
+    next_cells = list(range(topology.size))
+    origins = list(range(topology.size))
+    frontier = []
+    for source in sources:
+        costs[source] = 0
+        heappush(frontier, (0, source))
+
+    while frontier:
+        cost, current = heappop(frontier)
+        if cost > costs[current]:
+            continue
+        origin = origins[current]
+        for node in neighbours[current]:
+            new_cost = cost + step_cost(node)
+            if costs[node] is None or new_cost < costs[node]:
+                costs[node] = new_cost
+                next_cells[node] = current
+                origins[node] = origin
+                heappush(frontier, (new_cost, node))
+    return costs, next_cells, origins
+
+
+class HomeField:
+    """
+    Cheapest routes from every cell of the map to the nearest of a set of structures,
+    where moving off a cell costs step_cost of that cell.
+    """
+    def __init__(self, topology, structures, step_cost):
+        """
+        :param topology: The topology.Topology of the map
+        :param structures: The shipyard and dropoffs to route to
+        :param step_cost: Callable taking a cell id and returning the cost of leaving that cell
+        """
+        self._topology = topology
+        self._structures = {topology.cell_id(structure.position): structure for structure in structures}
+        self._costs, self._next_cells, self._origins = dijkstra(list(self._structures), topology, step_cost)
+
+    def cost(self, position):
+        """
+        :param position: The position to route from
+        :return: The movement cost of the cheapest route to a structure
+        """
+        return self._costs[self._topology.cell_id(position)]
+
+    def direction(self, position):
+        """
+        :param position: The position to route from
+        :return: The Direction tuple of the first step of the cheapest route, Still on a structure
+        """
+        cell = self._topology.cell_id(position)
+        return self._topology.direction(cell, self._next_cells[cell])
+
+    def structure(self, position):
+        """
+        :param position: The position to route from
+        :return: The structure the cheapest route from position ends at
+        """
+        return self._structures[self._origins[self._topology.cell_id(position)]]
+
+
+class PathCache:
+    """
+    Keeps the paths found by astar so they can be reused on later turns.
+
+    A path is stored under every cell along it, so a ship following a cached path keeps
+    hitting the cache as it moves. A path is dropped as soon as the halite of a cell on it
+    changes. Occupancy is checked when a path is looked up: only the first step can be
+    blocked, and a blocked first step counts as a miss, so the caller searches again.
+    """
+    def __init__(self, max_cells=16384):
+        """
+        :param max_cells: The cache is emptied once the stored paths span more cells than this
+        """
+        self.max_cells = max_cells
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.clear()
+
+    def get(self, start, goal, end_game, blocked=()):
+        """
+        :param start: The id of the start cell
+        :param goal: The id of the goal cell
+        :param end_game: The end_game flag of the search, or a key of what else it depended on
+        :param blocked: Container of cell ids that may not be entered
+        :return: A SearchResult for the cached path, or None
+        """
+        entry = self._entries.get((start, goal, end_game))
+        if entry is not None:
+            path, costs, index = entry
+            if path[index + 1] not in blocked:
+                self.hits += 1
+                start_cost = costs[index]
+                return SearchResult(path[index + 1:], [cost - start_cost for cost in costs[index + 1:]], 0)
+        self.misses += 1
+        return None
+
+    def put(self, start, goal, end_game, result):
+        """
+        Stores the result of a search.
+        :param start: The id of the start cell
+        :param goal: The id of the goal cell
+        :param end_game: The end_game flag of the search, or a key of what else it depended on
+        :param result: The SearchResult astar returned
+        :return: nothing.
+        """
+        if not result.path:
+            return
+        path = [start] + result.path
+        if self._cells + len(path) > self.max_cells:
+            self.clear()
+        self._cells += len(path)
+        costs = [0] + result.costs
+        for index, cell in enumerate(path):
+            if index < len(path) - 1:
+                self._entries[(cell, goal, end_game)] = (path, costs, index)
+            self._by_cell.setdefault(cell, []).append((path, goal, end_game))
+
+    def invalidate(self, cells):
+        """
+        Drops every cached path that leads through one of the given cells.
+        :param cells: Iterable of the ids of cells that changed
+        :return: nothing.
+        """
+        for cell in cells:
+            for path, goal, end_game in self._by_cell.pop(cell, ()):
+                # Suffixes starting past the changed cell don't depend on it
+                for start in path[:min(path.index(cell) + 1, len(path) - 1)]:
+                    key = (start, goal, end_game)
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[0] is path:
+                        del self._entries[key]
+                        self.invalidations += 1
+
+    def clear(self):
+        """
+        Drops all cached paths.
+        :return: nothing.
+        """
+        self._entries = {}
+        self._by_cell = {}
+        self._cells = 0
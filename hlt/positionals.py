@@ -62,9 +62,19 @@ class Direction:
 
 
 class Position:
+    """
+    An immutable x, y coordinate pair.
+
+    Positions are hashable, so they can be used as dict keys and set members directly.
+    """
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
-        self.x = x
-        self.y = y
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
 
     def directional_offset(self, direction):
         """
@@ -86,25 +96,22 @@ class Position:
     def __sub__(self, other):
         return Position(self.x - other.x, self.y - other.y)
 
-    def __iadd__(self, other):
-        self.x += other.x
-        self.y += other.y
-        return self
-
-    def __isub__(self, other):
-        self.x -= other.x
-        self.y -= other.y
-        return self
-
     def __abs__(self):
         return Position(abs(self.x), abs(self.y))
 
     def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
 
     def __ne__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
         return not self.__eq__(other)
 
+    def __hash__(self):
+        return hash((self.x, self.y))
+
     def __repr__(self):
         return "{}({}, {})".format(self.__class__.__name__,
                                    self.x,
@@ -0,0 +1,83 @@
+"""
+Recording of the raw input the engine sends to a bot.
+
+Set the environment variable HLT_RECORD_INPUT to a file name, in which {player} is replaced by
+the player id, and Game copies every byte it reads from stdin to that file: the constants,
+the players, the map and every turn's frame, exactly as the engine sent them. The recording can
+then be fed back to the bot at full speed with
+
+    python -m benchmarks.replay_input RECORDING [--bot MyBot.py]
+
+or to benchmarks.bench_frames with --input.
+
+The recorder replaces sys.stdin, so it only works in a bot process of its own, such as under
+the engine or with sim's --subprocess mode.
+"""
+
+import io
+import os
+import sys
+
+
+class _TeeStream(io.RawIOBase):
+    """
+    Reads a file descriptor and keeps a copy of everything read, in memory until the file to
+    write it to is known.
+    """
+    def __init__(self, fd):
+        self._fd = fd
+        self._pending = bytearray()
+        self._file = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = os.read(self._fd, len(buffer))
+        buffer[:len(data)] = data
+        if self._file is None:
+            self._pending += data
+        else:
+            self._file.write(data)
+            self._file.flush()
+        return len(data)
+
+    def start(self, path):
+        """
+        Writes what was read so far to a file, and everything read from now on.
+        :param path: The file to record to
+        :return: nothing.
+        """
+        self._file = open(path, 'wb')
+        self._file.write(self._pending)
+        self._file.flush()
+        self._pending = None
+
+
+class InputRecorder:
+    """
+    Swaps sys.stdin for a copy that records what it reads.
+    """
+    def __init__(self, path):
+        """
+        :param path: The file to record to, in which {player} is replaced by the player id
+        """
+        self.path = path
+        self._tee = _TeeStream(sys.stdin.fileno())
+        sys.stdin = io.TextIOWrapper(io.BufferedReader(self._tee), encoding=sys.stdin.encoding)
+
+    def start(self, player_id):
+        """
+        Opens the recording once the player id is known.
+        :param player_id: The bot's player id
+        :return: nothing.
+        """
+        self._tee.start(self.path.format(player=player_id))
+
+
+def recorder():
+    """
+    :return: An InputRecorder if HLT_RECORD_INPUT is set, otherwise None
+    """
+    path = os.environ.get('HLT_RECORD_INPUT')
+    return InputRecorder(path) if path else None
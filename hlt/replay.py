@@ -0,0 +1,272 @@
+"""
+Reading of the replay (.hlt) files written by the game engine.
+
+A replay is zstd compressed JSON, which for a 500 turn 64x64 game with four players
+decompresses to hundreds of megabytes. Replay streams the decompressed text instead of
+decoding it whole, and decodes one frame at a time:
+
+    replay = Replay('replays/replay-20181104-091627-0500-1541340970-32-32.hlt')
+    for turn in replay.turns():
+        ships = turn.players[0].get_ships()
+        halite = turn.game_map.halite
+
+The members of the JSON object are sorted by name, so full_frames comes before the
+production map and the players needed to make sense of it. Replay therefore reads the
+file twice: once when it is created, for everything but the frames, and again for
+every iteration over the frames.
+"""
+
+import codecs
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from . import constants
+from .entity import Shipyard
+from .game_map import GameMap, MapCell, Player
+from .positionals import Position
+
+"""The first bytes of a zstd frame."""
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+"""
+One turn of a replay, as the bots saw it.
+players maps player ids to Player objects and game_map is the GameMap, both as Game.update_frame
+leaves them. moves maps player ids to the list of commands the player sent on the turn, and
+events lists the spawn, construct and shipwreck events the turn caused, as dicts of the replay.
+"""
+Turn = namedtuple('Turn', ['turn_number', 'players', 'game_map', 'moves', 'events'])
+
+
+class _JsonStream:
+    """
+    Incremental decoding of one JSON object from a binary stream, holding only the part of
+    the text that hasn't been decoded yet.
+    """
+    def __init__(self, stream, chunk_size=1 << 20):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._eof = False
+
+    def _read_more(self):
+        """
+        Appends the next chunk of the stream to the buffer, dropping the decoded part.
+        :return: False at the end of the stream
+        """
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._chunk_size)
+        self._eof = not chunk
+        self._buffer = self._buffer[self._position:] + self._text.decode(chunk, final=self._eof)
+        self._position = 0
+        return not self._eof
+
+    def _next_char(self):
+        """
+        Skips whitespace.
+        :return: The next character, which is not consumed, or '' at the end of the stream
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position].isspace():
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                return ''
+
+    def _expect(self, char):
+        """
+        Consumes the next character, which has to be char.
+        :return: nothing.
+        """
+        found = self._next_char()
+        if found != char:
+            raise ValueError("Expected {!r} in the replay, found {!r}".format(char, found))
+        self._position += 1
+
+    def value(self):
+        """
+        Decodes the next JSON value. A value that ends where the buffer ends may be a number
+        cut short, so more text is read before it is trusted.
+        :return: The value
+        """
+        self._next_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+                if end < len(self._buffer) or self._eof:
+                    self._position = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._read_more()
+
+    def array(self):
+        """
+        Decodes the next JSON array one element at a time.
+        :return: Generator of the elements
+        """
+        self._expect('[')
+        if self._next_char() == ']':
+            self._position += 1
+            return
+        while True:
+            yield self.value()
+            if self._next_char() == ']':
+                self._position += 1
+                return
+            self._expect(',')
+
+    def members(self, streamed=()):
+        """
+        Decodes the next JSON object one member at a time.
+        :param streamed: Names of members holding arrays to yield as generators of their elements,
+            which have to be exhausted before the next member is decoded
+        :return: Generator of (name, value) pairs
+        """
+        self._expect('{')
+        if self._next_char() == '}':
+            self._position += 1
+            return
+        while True:
+            name = self.value()
+            self._expect(':')
+            yield name, self.array() if name in streamed else self.value()
+            if self._next_char() == '}':
+                self._position += 1
+                return
+            self._expect(',')
+
+
+def _command(move):
+    """
+    :param move: A move of the replay, such as {'type': 'm', 'id': 3, 'direction': 'n'}
+    :return: The command the bot sent for it, such as 'm 3 n'
+    """
+    if move['type'] == 'm':
+        return 'm {} {}'.format(move['id'], move['direction'])
+    if move['type'] == 'c':
+        return 'c {}'.format(move['id'])
+    return move['type']
+
+
+class Replay:
+    """
+    A replay file. Everything but the frames is decoded when the Replay is created.
+
+    constants holds the game constants, width and height the size of the map, production the
+    initial halite as a (height, width) array, players a list of the replay's player dicts with
+    player_id, name and factory_location, statistics the game_statistics of the engine, seed the
+    map generator seed and num_frames the number of frames.
+    """
+    def __init__(self, path):
+        """
+        :param path: The replay file, zstd compressed as written by the engine or plain JSON
+        """
+        self.path = path
+        self.num_frames = 0
+        header = {}
+        with self._open() as stream:
+            for name, value in stream.members(streamed=('full_frames',)):
+                if name == 'full_frames':
+                    for _ in value:
+                        self.num_frames += 1
+                else:
+                    header[name] = value
+        self.engine_version = header.get('ENGINE_VERSION')
+        self.constants = header['GAME_CONSTANTS']
+        self.players = header['players']
+        self.statistics = header.get('game_statistics')
+        self.seed = header.get('map_generator_seed')
+        production = header['production_map']
+        self.width = production['width']
+        self.height = production['height']
+        self.production = np.array([[cell['energy'] for cell in row] for row in production['grid']],
+                                   dtype=np.int32)
+
+    def _open(self):
+        """
+        :return: A context manager giving a _JsonStream over the replay's text
+        """
+        return _ReplayFile(self.path)
+
+    def frames(self):
+        """
+        Decodes the frames one at a time.
+        :return: Generator of the frame dicts of the replay, with cells, deposited, energy,
+            entities, events and moves members
+        """
+        with self._open() as stream:
+            for name, value in stream.members(streamed=('full_frames',)):
+                if name == 'full_frames':
+                    yield from value
+                    return
+
+    def turns(self):
+        """
+        Replays the game from the point of view of the bots. Every turn updates the same
+        Player and GameMap objects, so keep what you need of a turn before moving on to the next.
+        Also loads the replay's constants into hlt.constants.
+        :return: Generator of a Turn per turn of the game, followed by one for the state after the last
+            turn, which has no moves
+        """
+        constants.load_constants(self.constants)
+        cells = [[MapCell(Position(x, y), int(self.production[y, x])) for x in range(self.width)]
+                 for y in range(self.height)]
+        game_map = GameMap(cells, self.width, self.height)
+        players = {}
+        for player in self.players:
+            location = player['factory_location']
+            players[player['player_id']] = Player(
+                player['player_id'], Shipyard(player['player_id'], -1, Position(location['x'], location['y'])))
+        dropoffs = {player_id: [] for player_id in players}
+        no_ships = np.empty((0, 4), dtype=np.int64)
+
+        previous = None
+        for frame_number, frame in enumerate(self.frames()):
+            if previous is not None:
+                changed = np.array([(cell['x'], cell['y'], cell['production']) for cell in previous['cells']],
+                                   dtype=np.int64).reshape(-1, 3)
+                for event in previous['events']:
+                    if event['type'] == 'construct':
+                        location = event['location']
+                        dropoffs[event['owner_id']].append((event['id'], location['x'], location['y']))
+                for player_id, player in players.items():
+                    ships = frame['entities'].get(str(player_id), {})
+                    player._load(previous['energy'][str(player_id)],
+                                 np.array([(int(ship_id), ship['x'], ship['y'], ship['energy'])
+                                           for ship_id, ship in ships.items()], dtype=np.int64)
+                                 if ships else no_ships,
+                                 np.array(dropoffs[player_id], dtype=np.int64).reshape(-1, 3), game_map)
+                game_map._update(changed)
+                game_map._mark_entities(players.values())
+                moves = {int(player_id): [_command(move) for move in player_moves]
+                         for player_id, player_moves in frame['moves'].items()}
+                yield Turn(frame_number, players, game_map, moves, frame['events'])
+            previous = frame
+
+
+class _ReplayFile:
+    """
+    Context manager opening a replay file as a _JsonStream, decompressing it if it is zstd compressed.
+    """
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self._path, 'rb')
+        stream = self._file
+        if self._file.peek(4)[:4] == _ZSTD_MAGIC:
+            import zstandard
+            stream = zstandard.ZstdDecompressor().stream_reader(self._file)
+        return _JsonStream(stream)
+
+    def __exit__(self, *exc_info):
+        self._file.close()
@@ -0,0 +1,98 @@
+"""
+Target selection: a priority index over the value of map cells.
+"""
+
+import heapq
+
+
+class TargetIndex:
+    """
+    Priority index of the value of a set of tracked cells, by default the halite they hold.
+
+    The index is a max-heap with lazy deletion: changing a value pushes a new entry and
+    outdated entries are skipped when they reach the top. Tracked cells are kept current
+    from GameMap.dirty_cells, so refreshing costs O(changed cells) per turn and asking
+    for the best k cells O(k log n).
+    """
+    def __init__(self, game_map):
+        """
+        :param game_map: The map whose cells are indexed
+        """
+        self._game_map = game_map
+        self._values = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, position):
+        return self._game_map.topology.cell_id(position) in self._values
+
+    def cell_value(self, position):
+        """
+        The value the index gives a cell: its halite, or 0 for cells with a structure.
+        :param position: The position of the cell
+        :return: The value of the cell
+        """
+        cell = self._game_map[position]
+        return 0 if cell.has_structure else cell.halite_amount
+
+    def track(self, position, value=None):
+        """
+        Adds a cell to the index or sets its value.
+        :param position: The position of the cell
+        :param value: The value of the cell, by default cell_value(position)
+        :return: nothing.
+        """
+        if value is None:
+            value = self.cell_value(position)
+        cell = self._game_map.topology.cell_id(position)
+        if self._values.get(cell) == value:
+            return
+        self._values[cell] = value
+        heapq.heappush(self._heap, (-value, cell))
+        if len(self._heap) > 2 * len(self._values) + 64:
+            self._heap = [(-value, cell) for cell, value in self._values.items()]
+            heapq.heapify(self._heap)
+
+    def value(self, position):
+        """
+        :param position: The position of a tracked cell
+        :return: The value the index holds for it
+        """
+        return self._values[self._game_map.topology.cell_id(position)]
+
+    def refresh(self):
+        """
+        Re-reads the value of the tracked cells that changed in the last GameMap._update.
+        :return: nothing.
+        """
+        for cell in self._game_map.dirty_cells:
+            if cell in self._values:
+                self.track(self._game_map.cell_position(cell))
+
+    def best(self, k, reserved=()):
+        """
+        Returns the k most valuable tracked cells that aren't reserved.
+        :param k: How many cells to return
+        :param reserved: Container of positions to skip, e.g. cells other ships are heading for
+        :return: A list of up to k positions, most valuable first
+        """
+        heap = self._heap
+        values = self._values
+        popped = []
+        seen = set()
+        best = []
+        while heap and len(best) < k:
+            entry = heapq.heappop(heap)
+            value, cell = entry
+            if values.get(cell) != -value or cell in seen:
+                continue
+            seen.add(cell)
+            popped.append(entry)
+            position = self._game_map.cell_position(cell)
+            if position not in reserved:
+                best.append(position)
+        for entry in popped:
+            heapq.heappush(heap, entry)
+        return best
@@ -0,0 +1,158 @@
+"""
+Opt-in timing telemetry for the hot paths of hlt.
+
+Set the environment variable HLT_TELEMETRY to turn it on, either to 1 to write
+telemetry-<player id>.csv or to a file name in which {player} is replaced by the
+player id. Each turn then appends one CSV row per instrumented function with the
+number of calls, total and slowest time, A* nodes expanded and path cells found,
+and the id of the ship of the slowest call where there is one.
+
+Each Game keeps its records in a Telemetry of its own, which the decorated methods find
+in the telemetry attribute of their object, e.g. the GameMap.
+
+When HLT_TELEMETRY is unset the decorators hand back the functions they are given
+unchanged, so disabled telemetry adds no work to the instrumented calls.
+"""
+
+import csv
+import functools
+import os
+import time
+
+_setting = os.environ.get('HLT_TELEMETRY', '')
+
+"""Whether telemetry is being collected."""
+enabled = _setting not in ('', '0')
+
+"""The columns of the CSV sidecar."""
+COLUMNS = ('turn', 'name', 'calls', 'total_ms', 'max_ms', 'expanded', 'path_length', 'slowest_ship')
+
+
+class _Aggregate:
+    """
+    Running totals of one instrumented function over a turn.
+    """
+    __slots__ = ('calls', 'total', 'slowest', 'expanded', 'path_length', 'slowest_ship')
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.expanded = 0
+        self.path_length = 0
+        self.slowest_ship = None
+
+
+class Telemetry:
+    """
+    The totals of one bot's instrumented calls over the current turn, and the CSV sidecar
+    they are written to. Each Game has its own, so bots sharing a process, as in the threads
+    of sim, keep their counts apart.
+    """
+    def __init__(self, player_id, clock=time.perf_counter):
+        """
+        Creates the CSV file for this bot's game.
+        :param player_id: The id of the bot's player
+        :param clock: Function returning the time in seconds, e.g. the clock of the Game's deadline
+        """
+        self.clock = clock
+        self._turn = 0
+        self._aggregates = {}
+        path = 'telemetry-{player}.csv' if _setting == '1' else _setting
+        self._file = open(path.format(player=player_id), 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def start_turn(self, turn_number):
+        """
+        Attributes the following records to a turn.
+        :return: nothing.
+        """
+        self._turn = turn_number
+
+    def record(self, name, seconds, expanded=0, path_length=0, ship=None):
+        """
+        Adds one call to the current turn's totals.
+        :param name: The name of the instrumented function
+        :param seconds: How long the call took
+        :param expanded: A* nodes expanded by the call
+        :param path_length: Cells in the path the call found
+        :param ship: The id of the ship the call was for, if any
+        :return: nothing.
+        """
+        aggregate = self._aggregates.get(name)
+        if aggregate is None:
+            aggregate = self._aggregates[name] = _Aggregate()
+        aggregate.calls += 1
+        aggregate.total += seconds
+        aggregate.expanded += expanded
+        aggregate.path_length += path_length
+        if seconds > aggregate.slowest:
+            aggregate.slowest = seconds
+            aggregate.slowest_ship = ship
+
+    def end_turn(self):
+        """
+        Writes the current turn's totals to the sidecar and starts new ones.
+        :return: nothing.
+        """
+        for name in sorted(self._aggregates):
+            aggregate = self._aggregates[name]
+            self._writer.writerow((self._turn, name, aggregate.calls, round(aggregate.total * 1000, 3),
+                                   round(aggregate.slowest * 1000, 3), aggregate.expanded, aggregate.path_length,
+                                   '' if aggregate.slowest_ship is None else aggregate.slowest_ship))
+        self._file.flush()
+        self._aggregates.clear()
+
+
+def timed(name, ship_argument=False):
+    """
+    Decorator timing every call of a method, into the Telemetry in the telemetry attribute of
+    its object. Calls are not timed while that is None.
+    :param name: The name to record the calls under
+    :param ship_argument: Whether the first argument after self is a ship whose id to record
+    :return: The decorator
+    """
+    def decorator(function):
+        if not enabled:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            telemetry = self.telemetry
+            if telemetry is None:
+                return function(self, *args, **kwargs)
+            start = telemetry.clock()
+            result = function(self, *args, **kwargs)
+            telemetry.record(name, telemetry.clock() - start, ship=args[0].id if ship_argument else None)
+            return result
+        return wrapper
+    return decorator
+
+
+def timed_search(name):
+    """
+    Decorator timing a method that returns a pathfinding.SearchResult, or None, and
+    recording the nodes it expanded and the length of the path it found, like timed.
+    :param name: The name to record the calls under
+    :return: The decorator
+    """
+    def decorator(function):
+        if not enabled:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            telemetry = self.telemetry
+            if telemetry is None:
+                return function(self, *args, **kwargs)
+            start = telemetry.clock()
+            result = function(self, *args, **kwargs)
+            elapsed = telemetry.clock() - start
+            if result is None:
+                telemetry.record(name, elapsed)
+            else:
+                telemetry.record(name, elapsed, result.expanded, len(result.path or ()))
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,123 @@
+"""
+Lookup tables for the toroidal grid of a game map.
+
+Cells are addressed by integer ids (y * width + x) so that neighbours and
+wrap-around distances are plain list lookups instead of Position arithmetic.
+"""
+
+import numpy as np
+
+from .positionals import Direction
+
+
+class Topology:
+    """
+    Neighbour and distance tables for a width x height torus.
+
+    neighbours[cell] holds the ids of the cells north, south, east and west of cell,
+    in the order of Direction.get_all_cardinals(). distance_x[dx % width] and
+    distance_y[dy % height] are the wrap-aware distances along each axis.
+    diamond_offsets(radius) gives the (dx, dy) offsets of the cells within a distance.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.xs = [cell % width for cell in range(self.size)]
+        self.ys = [cell // width for cell in range(self.size)]
+        self.distance_x = [min(dx, width - dx) for dx in range(width)]
+        self.distance_y = [min(dy, height - dy) for dy in range(height)]
+        self.neighbours = [tuple(((y + dy) % height) * width + (x + dx) % width
+                                 for dx, dy in Direction.get_all_cardinals())
+                           for x, y in zip(self.xs, self.ys)]
+        self._diamonds = {}
+
+    def cell_id(self, position):
+        """
+        :param position: A position object, normalized or not
+        :return: The id of the cell at that position
+        """
+        return (position.y % self.height) * self.width + position.x % self.width
+
+    def distance(self, source, target):
+        """
+        :param source: The id of a cell
+        :param target: The id of another cell
+        :return: The Manhattan distance between the cells, accounting for wrap-around
+        """
+        return self.distance_x[(self.xs[source] - self.xs[target]) % self.width] + \
+            self.distance_y[(self.ys[source] - self.ys[target]) % self.height]
+
+    def direction(self, source, target):
+        """
+        :param source: The id of a cell
+        :param target: The id of the same or a neighbouring cell
+        :return: The Direction tuple leading from source to target
+        """
+        if source == target:
+            return Direction.Still
+        return Direction.get_all_cardinals()[self.neighbours[source].index(target)]
+
+    def diamond_offsets(self, radius):
+        """
+        The offsets of the cells within a wrap-around Manhattan distance of a cell, computed once
+        per radius. Each cell appears once, also when the radius reaches around the map.
+        :param radius: The distance, rounded down
+        :return: Int arrays (dx, dy) of the offsets, nearest first, (0, 0) included
+        """
+        radius = int(radius)
+        if radius not in self._diamonds:
+            distances = np.add.outer(np.array(self.distance_y), np.array(self.distance_x))
+            dy, dx = np.nonzero(distances <= radius)
+            order = np.argsort(distances[dy, dx], kind='stable')
+            self._diamonds[radius] = dx[order], dy[order]
+        return self._diamonds[radius]
+
+    def diamond_cells(self, cells, radius):
+        """
+        :param cells: The id of a cell, or an array of ids
+        :param radius: The distance, rounded down
+        :return: Int array of shape cells.shape + (K,): the ids of the K cells within that
+            wrap-around Manhattan distance of each cell, nearest first
+        """
+        cells = np.asarray(cells, dtype=np.int64)[..., None]
+        dx, dy = self.diamond_offsets(radius)
+        return ((cells // self.width + dy) % self.height) * self.width + (cells % self.width + dx) % self.width
+
+    def diamond_sum(self, grids, radius):
+        """
+        Sums every grid over the cells within a wrap-around Manhattan distance of each cell, a
+        convolution with the diamond. Rows of the diamond are windows of running sums along x, so
+        the cost is O(width * height * radius) per grid instead of O(width * height * radius ** 2).
+        :param grids: Array of shape (..., height, width)
+        :param radius: The distance, rounded down
+        :return: Array of the shape of grids holding the sums
+        """
+        radius = int(radius)
+        grids = np.asarray(grids)
+        dtype = np.result_type(grids.dtype, np.int64) if grids.dtype.kind in 'bui' else grids.dtype
+        # Rows and columns of wrap-around around the grids, so that every window of the diamond is
+        # a plain slice. Windows as wide as the map are whole rows, so pad only needs to reach half way.
+        pad = min(radius, self.width // 2)
+        rows = np.arange(-radius, self.height + radius) % self.height
+        columns = np.arange(-pad, self.width + pad) % self.width
+        padded = grids[..., rows, :]
+        running = np.zeros(padded.shape[:-1] + (self.width + 2 * pad + 1,), dtype=dtype)
+        np.cumsum(padded[..., columns], axis=-1, out=running[..., 1:])
+        windows = {}
+        total = np.zeros(grids.shape, dtype=dtype)
+        for dy in range(self.height):
+            half = radius - self.distance_y[dy]
+            if half < 0:
+                continue
+            if half not in windows:
+                if 2 * half + 1 >= self.width:
+                    windows[half] = padded.sum(axis=-1, dtype=dtype, keepdims=True)
+                else:
+                    start = pad - half
+                    windows[half] = running[..., start + 2 * half + 1:start + 2 * half + 1 + self.width] - \
+                        running[..., start:start + self.width]
+            # The row dy below a cell, or height - dy above it, whichever is within the radius
+            offset = radius + (dy if dy <= radius else dy - self.height)
+            total += windows[half][..., offset:offset + self.height, :]
+        return total
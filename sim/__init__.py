@@ -0,0 +1,13 @@
+"""
+An offline simulator of the game engine for self-play without the halite binary.
+
+    python -m sim MyBot.py MyBot2.py [--size 32] [--seed 0]
+
+sim.batch plays many games at once with vectorized policies from sim.policies.
+"""
+
+from .batch import BatchGames, play
+from .game import GameResult, run_game
+from .mapgen import generate_map
+from .policies import GreedyPolicy
+from .rules import GameState
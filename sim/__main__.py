@@ -0,0 +1,34 @@
+import argparse
+import time
+
+from .game import run_game
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays one game between bots with the simulated engine.')
+    parser.add_argument('bots', nargs='+', help='bot scripts, or commands with --subprocess; 1, 2 or 4 of them')
+    parser.add_argument('--size', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--subprocess', action='store_true', help='run every bot in a child process')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds per turn before a bot is eliminated')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run_game(args.bots, args.size, args.seed, in_process=not args.subprocess, turn_timeout=args.timeout)
+    elapsed = time.perf_counter() - start
+
+    print('{} turns on a {}x{} map, seed {}, in {:.1f}s'.format(result.turns, result.size, result.size,
+                                                              result.seed, elapsed))
+    print('{:>4} {:<14} {:>8} {:>6} {:>6} {:>10} {:>8} {:>7}'.format(
+        'rank', 'bot', 'halite', 'built', 'lost', 'deposited', 'dropoffs', 'errors'))
+    for player in sorted(range(len(result.names)), key=lambda player: result.ranks[player]):
+        print('{:>4} {:<14} {:>8} {:>6} {:>6} {:>10} {:>8} {:>7}'.format(
+            result.ranks[player], result.names[player], result.halite[player], result.ships_built[player],
+            result.ships_lost[player], result.deposited[player], result.dropoffs[player],
+            result.command_errors[player]))
+        if result.errors[player]:
+            print(result.errors[player])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""
+A batched version of the rules in sim.rules that steps many games at once.
+
+B games on maps of the same size are held as stacked NumPy arrays: halite and structure
+grids of shape (B, H, W), player banks of shape (B, P) and ship slots of shape (B, S).
+Each turn is a fixed number of whole-batch array operations, so the cost per game
+shrinks as B grows. Bots are vectorized policies rather than scripts; GreedyPolicy
+is a greedy miner that shares MyBot2.py's spawn and dropoff cost curves, with its knobs
+settable per game, but doesn't otherwise play like MyBot2.py (see its docstring).
+"""
+
+import numpy as np
+
+from hlt.entity import Dropoff, Ship, Shipyard
+from hlt.game_map import NO_OWNER, GameMap, MapCell, Player
+from hlt.positionals import Position
+
+from . import mapgen, rules
+
+"""Moves are indices into these (dx, dy) offsets: still, north, south, east and west."""
+STILL, NORTH, SOUTH, EAST, WEST = range(5)
+OFFSETS = np.array([(0, 0), (0, -1), (0, 1), (1, 0), (-1, 0)])
+
+
+def play(batch, policies):
+    """
+    Plays every game of the batch to its end.
+    :param batch: The BatchGames
+    :param policies: One policy per player, see sim.policies
+    :return: The ranks of the players, as from BatchGames.ranks
+    """
+    spawn = np.zeros((batch.num_games, batch.num_players), dtype=bool)
+    while not batch.is_over():
+        moves = np.zeros(batch.ship_alive.shape, dtype=np.int64)
+        construct = np.zeros(batch.ship_alive.shape, dtype=bool)
+        for player, policy in enumerate(policies):
+            player_moves, spawn[:, player], player_construct = policy(batch, player)
+            mine = batch.ship_owner == player
+            moves = np.where(mine, player_moves, moves)
+            construct |= mine & player_construct
+        batch.step(moves, spawn, construct)
+    return batch.ranks()
+
+
+class BatchGames:
+    """
+    B games of P players on H x W maps, played in lockstep.
+    """
+    def __init__(self, halite, shipyards, game_constants, max_ships=128):
+        """
+        :param halite: Array of shape (B, H, W) of the starting halite of each game
+        :param shipyards: Array of shape (B, P, 2) of the (x, y) shipyard of each player
+        :param game_constants: Dict of constants, as from rules.game_constants
+        :param max_ships: Ship slots per game; spawns beyond it are refused
+        """
+        self.halite = np.array(halite, dtype=np.int64)
+        self.num_games, self.height, self.width = self.halite.shape
+        self._games = np.arange(self.num_games)
+        self._diamonds = {}
+        self.shipyards = np.array(shipyards, dtype=np.int64)
+        self.num_players = self.shipyards.shape[1]
+        self.constants = game_constants
+        self.turn_number = 1
+
+        shape = (self.num_games, self.num_players)
+        self.bank = np.full(shape, game_constants['INITIAL_ENERGY'], dtype=np.int64)
+        self.player_alive = np.ones(shape, dtype=bool)
+        self.last_turn = np.zeros(shape, dtype=np.int64)
+        self.ships_built = np.zeros(shape, dtype=np.int64)
+        self.ships_lost = np.zeros(shape, dtype=np.int64)
+        self.deposited = np.zeros(shape, dtype=np.int64)
+
+        self.structure_owner = np.full(self.halite.shape, NO_OWNER, dtype=np.int64)
+        self.home_distance = np.empty((self.num_games, self.num_players, self.height * self.width), dtype=np.int64)
+        for player in range(self.num_players):
+            self.structure_owner[self._games, self.shipyards[:, player, 1], self.shipyards[:, player, 0]] = player
+            self.home_distance[:, player] = self.distance_from(self.shipyards[:, player, 0, None],
+                                                              self.shipyards[:, player, 1, None])
+
+        slots = (self.num_games, max_ships)
+        self.ship_alive = np.zeros(slots, dtype=bool)
+        self.ship_owner = np.zeros(slots, dtype=np.int64)
+        self.ship_x = np.zeros(slots, dtype=np.int64)
+        self.ship_y = np.zeros(slots, dtype=np.int64)
+        self.ship_halite = np.zeros(slots, dtype=np.int64)
+
+    @classmethod
+    def generate(cls, num_games, size, num_players=2, seed=0, max_ships=128):
+        """
+        Creates a batch of games on maps from mapgen.generate_map, seeded seed, seed + 1, ...
+        :return: The BatchGames
+        """
+        maps = [mapgen.generate_map(size, num_players, seed + game) for game in range(num_games)]
+        return cls([halite for halite, _ in maps], [shipyards for _, shipyards in maps],
+                   rules.game_constants(size, size), max_ships)
+
+    def active(self):
+        """
+        :return: Bool array of shape (B,), whether each game is still being played
+        """
+        return (self.turn_number <= self.constants['MAX_TURNS']) & \
+            (self.player_alive.sum(axis=1) >= min(2, self.num_players))
+
+    def is_over(self):
+        """
+        :return: Whether every game has ended
+        """
+        return not self.active().any()
+
+    def cells(self):
+        """
+        :return: The flat cell index (y * W + x) of every ship slot
+        """
+        return self.ship_y * self.width + self.ship_x
+
+    def distance_from(self, x, y):
+        """
+        :param x: The x coordinate of a cell, or an array of them
+        :param y: The y coordinate of the cell
+        :return: The wrap-around Manhattan distance from the cell to every cell, as an array whose last axis is H * W
+        """
+        ys, xs = np.divmod(np.arange(self.height * self.width), self.width)
+        dx = np.abs(xs - x)
+        dy = np.abs(ys - y)
+        return np.minimum(dx, self.width - dx) + np.minimum(dy, self.height - dy)
+
+    def diamond_cells(self, radius):
+        """
+        :param radius: The radius of the diamond
+        :return: Int array of shape (H * W, K): for every cell, the cells within that wrap-around
+                 Manhattan distance of it, itself included
+        """
+        if radius not in self._diamonds:
+            offsets = [(dx, dy) for dy in range(-radius, radius + 1)
+                       for dx in range(abs(dy) - radius, radius - abs(dy) + 1)]
+            ys, xs = np.divmod(np.arange(self.height * self.width), self.width)
+            self._diamonds[radius] = np.stack([((ys + dy) % self.height) * self.width + (xs + dx) % self.width
+                                               for dx, dy in offsets], axis=1)
+        return self._diamonds[radius]
+
+    def inspired(self):
+        """
+        :return: Bool array of shape (B, S), whether each ship has at least INSPIRATION_SHIP_COUNT
+                 opponent ships within INSPIRATION_RADIUS
+        """
+        inspired = np.zeros_like(self.ship_alive)
+        if not self.constants['INSPIRATION_ENABLED']:
+            return inspired
+        size = self.height * self.width
+        games, slots = np.nonzero(self.ship_alive)
+        cells = self.cells()[games, slots]
+        grids = (games * self.num_players + self.ship_owner[games, slots]) * size
+        ships = np.bincount(games * size + cells, minlength=self.num_games * size)
+        own_ships = np.bincount(grids + cells, minlength=self.num_games * self.num_players * size)
+        nearby = self.diamond_cells(self.constants['INSPIRATION_RADIUS'])[cells]
+        enemies = ships[(games * size)[:, None] + nearby].sum(axis=1) - own_ships[grids[:, None] + nearby].sum(axis=1)
+        enough = enemies >= self.constants['INSPIRATION_SHIP_COUNT']
+        inspired[games[enough], slots[enough]] = True
+        return inspired
+
+    def step(self, moves, spawn, construct=None):
+        """
+        Plays one turn in every active game, in the order of rules.GameState.process_turn.
+        :param moves: Int array of shape (B, S), the index into OFFSETS of each ship's move
+        :param spawn: Bool array of shape (B, P), whether each player spawns a ship
+        :param construct: Optional bool array of shape (B, S), ships to turn into dropoffs
+        :return: nothing.
+        """
+        game_constants = self.constants
+        max_halite = game_constants['MAX_ENERGY']
+        ship_cost = game_constants['NEW_ENTITY_ENERGY_COST']
+        active = self.active()
+        acting = self.ship_alive & active[:, None]
+        inspired = self.inspired()
+
+        if construct is not None:
+            for game, slot in zip(*np.nonzero(construct & acting)):
+                self._construct(game, slot)
+            acting &= self.ship_alive
+
+        moved = np.zeros_like(self.ship_alive)
+        for player in range(self.num_players):
+            free = ~self.ship_alive
+            slots = free.argmax(axis=1)
+            games = np.nonzero(spawn[:, player] & active & (self.bank[:, player] >= ship_cost) &
+                               free[self._games, slots])[0]
+            slots = slots[games]
+            self.bank[games, player] -= ship_cost
+            self.ships_built[games, player] += 1
+            self.ship_alive[games, slots] = True
+            self.ship_owner[games, slots] = player
+            self.ship_x[games, slots] = self.shipyards[games, player, 0]
+            self.ship_y[games, slots] = self.shipyards[games, player, 1]
+            self.ship_halite[games, slots] = 0
+            moved[games, slots] = True
+
+        cell_halite = self.halite.reshape(self.num_games, -1)[self._games[:, None], self.cells()]
+        ratio = np.where(inspired, game_constants['INSPIRED_MOVE_COST_RATIO'], game_constants['MOVE_COST_RATIO'])
+        moving = acting & (moves != STILL) & (self.ship_halite >= cell_halite // ratio)
+        self.ship_halite -= np.where(moving, cell_halite // ratio, 0)
+        self.ship_x = np.where(moving, (self.ship_x + OFFSETS[moves, 0]) % self.width, self.ship_x)
+        self.ship_y = np.where(moving, (self.ship_y + OFFSETS[moves, 1]) % self.height, self.ship_y)
+        moved |= moving
+
+        self._collide()
+
+        cells = self.cells()
+        flat_halite = self.halite.reshape(self.num_games, -1)
+        at_home = self.ship_alive & (self.structure_owner.reshape(self.num_games, -1)[
+            self._games[:, None], cells] == self.ship_owner)
+        deposits = self._per_player(at_home, self.ship_halite)
+        self.bank += deposits
+        self.deposited += deposits
+        self.ship_halite[at_home] = 0
+
+        mining = self.ship_alive & active[:, None] & ~moved & ~at_home
+        cell_halite = flat_halite[self._games[:, None], cells]
+        ratio = np.where(inspired, game_constants['INSPIRED_EXTRACT_RATIO'], game_constants['EXTRACT_RATIO'])
+        extracted = np.where(mining, np.minimum(-(-cell_halite // ratio), max_halite - self.ship_halite), 0)
+        games, slots = np.nonzero(extracted)
+        flat_halite[games, cells[games, slots]] -= extracted[games, slots]
+        self.ship_halite += extracted
+        bonus = (extracted * game_constants['INSPIRED_BONUS_MULTIPLIER']).astype(np.int64)
+        self.ship_halite += np.where(inspired, np.minimum(bonus, max_halite - self.ship_halite), 0)
+
+        ships = self._per_player(self.ship_alive, 1)
+        self.last_turn[self.player_alive & active[:, None]] = self.turn_number
+        self.player_alive &= ~active[:, None] | (ships > 0) | (self.bank >= ship_cost)
+        self.turn_number += 1
+
+    def _construct(self, game, slot):
+        """
+        Turns one ship into a dropoff if its cell is free of structures and its owner can pay.
+        :return: nothing.
+        """
+        x, y = self.ship_x[game, slot], self.ship_y[game, slot]
+        player = self.ship_owner[game, slot]
+        funds = self.bank[game, player] + self.ship_halite[game, slot] + self.halite[game, y, x]
+        if self.structure_owner[game, y, x] != NO_OWNER or funds < self.constants['DROPOFF_COST']:
+            return
+        self.bank[game, player] = funds - self.constants['DROPOFF_COST']
+        self.halite[game, y, x] = 0
+        self.structure_owner[game, y, x] = player
+        np.minimum(self.home_distance[game, player], self.distance_from(x, y), out=self.home_distance[game, player])
+        self.ship_alive[game, slot] = False
+
+    def _collide(self):
+        """
+        Destroys every ship sharing its cell, dropping the cargo on the cell or giving it
+        to the owner of the structure there.
+        :return: nothing.
+        """
+        size = self.height * self.width
+        keys = (self._games[:, None] * size + self.cells())[self.ship_alive]
+        counts = np.bincount(keys, minlength=self.num_games * size)
+        crashed = np.zeros_like(self.ship_alive)
+        crashed[self.ship_alive] = counts[keys] > 1
+        if not crashed.any():
+            return
+        self.ships_lost += self._per_player(crashed, 1)
+        games, slots = np.nonzero(crashed)
+        cells = self.cells()[games, slots]
+        cargo = self.ship_halite[games, slots]
+        owners = self.structure_owner.reshape(self.num_games, -1)[games, cells]
+        on_structure = owners != NO_OWNER
+        np.add.at(self.bank, (games[on_structure], owners[on_structure]), cargo[on_structure])
+        np.add.at(self.halite.reshape(self.num_games, -1), (games[~on_structure], cells[~on_structure]),
+                  cargo[~on_structure])
+        self.ship_alive &= ~crashed
+
+    def _per_player(self, mask, values):
+        """
+        :param mask: Bool array of shape (B, S) selecting ships
+        :param values: Array of shape (B, S) or a scalar
+        :return: Array of shape (B, P) with the sum of values over the selected ships of each player
+        """
+        keys = (self._games[:, None] * self.num_players + self.ship_owner)[mask]
+        weights = np.broadcast_to(values, mask.shape)[mask]
+        return np.bincount(keys, weights=weights, minlength=self.bank.size).reshape(self.bank.shape).astype(np.int64)
+
+    def ranks(self):
+        """
+        Ranks players by how long they stayed in the game, then by halite, like rules.GameState.ranks.
+        :return: Int array of shape (B, P), 1 for the winner of each game
+        """
+        order = np.lexsort((-self.bank, -self.last_turn), axis=1)
+        ranks = np.empty_like(order)
+        ranks[self._games[:, None], order] = np.arange(1, self.num_players + 1)
+        return ranks
+
+    def to_hlt(self, game, player_id=0):
+        """
+        Builds the hlt objects a bot would see for one game of the batch, as after Game.update_frame.
+        :param game: The index of the game in the batch
+        :param player_id: The player to view the game as
+        :return: (dict of hlt Players by id, the Player for player_id, the GameMap)
+        """
+        cells = [[MapCell(Position(x, y), int(self.halite[game, y, x])) for x in range(self.width)]
+                 for y in range(self.height)]
+        game_map = GameMap(cells, self.width, self.height)
+        players = {}
+        for player in range(self.num_players):
+            shipyard = Shipyard(player, -1, Position(*self.shipyards[game, player].tolist()))
+            players[player] = Player(player, shipyard, int(self.bank[game, player]))
+            slots = np.nonzero(self.ship_alive[game] & (self.ship_owner[game] == player))[0]
+            players[player]._ships = {
+                int(slot): Ship(player, int(slot), Position(int(self.ship_x[game, slot]), int(self.ship_y[game, slot])),
+                                int(self.ship_halite[game, slot])) for slot in slots}
+            ys, xs = np.nonzero(self.structure_owner[game] == player)
+            players[player]._dropoffs = {
+                index: Dropoff(player, index, Position(int(x), int(y)))
+                for index, (x, y) in enumerate(zip(xs, ys)) if (x, y) != tuple(self.shipyards[game, player])}
+        for player in players.values():
+            for ship in player.get_ships():
+                game_map[ship.position].mark_unsafe(ship)
+            game_map[player.shipyard].structure = player.shipyard
+            for dropoff in player.get_dropoffs():
+                game_map[dropoff].structure = dropoff
+        return players, players[player_id], game_map
+
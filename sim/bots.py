@@ -0,0 +1,195 @@
+"""
+Connections to the bots playing a simulated game.
+
+A bot is talked to over a pair of OS pipes, exactly as the engine talks to it: the
+engine writes its input to one and reads its commands from the other. ThreadBot runs
+a bot script inside this process, ProcessBot runs any command in a child process.
+"""
+
+import logging
+import os
+import select
+import shlex
+import subprocess
+import sys
+import tempfile
+import threading
+import traceback
+
+
+class _ThreadStream:
+    """
+    Stands in for sys.stdin or sys.stdout and forwards to the stream bound to the current thread,
+    or to the original stream in threads without one.
+    """
+    def __init__(self, default):
+        self._default = default
+        self._local = threading.local()
+
+    def bind(self, stream):
+        self._local.stream = stream
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._local, 'stream', self._default), name)
+
+
+_install_lock = threading.Lock()
+
+
+def _install_thread_streams():
+    """
+    Replaces sys.stdin and sys.stdout by per-thread streams, once. Also gives the root logger a
+    handler, so the logging.basicConfig call in hlt.Game doesn't make every bot write a log file.
+    :return: (stdin, stdout) stand-ins
+    """
+    with _install_lock:
+        if not isinstance(sys.stdin, _ThreadStream):
+            sys.stdin = _ThreadStream(sys.stdin)
+            sys.stdout = _ThreadStream(sys.stdout)
+            if not logging.getLogger().handlers:
+                logging.getLogger().addHandler(logging.NullHandler())
+        return sys.stdin, sys.stdout
+
+
+class Bot:
+    """
+    One end of the pipes to a bot.
+    """
+    def __init__(self, name, input_fd, output_fd):
+        """
+        :param name: Name to report the bot under
+        :param input_fd: File descriptor the bot's input is written to
+        :param output_fd: File descriptor the bot's commands are read from
+        """
+        self.name = name
+        self.error = None
+        self._input_fd = input_fd
+        self._output_fd = output_fd
+        self._pending = b''
+
+    def send(self, text):
+        """
+        Writes input to the bot.
+        :param text: The input as a string
+        :return: Whether the bot was still there to receive it
+        """
+        data = text.encode()
+        try:
+            while data:
+                data = data[os.write(self._input_fd, data):]
+        except OSError:
+            return False
+        return True
+
+    def read_line(self, timeout=None):
+        """
+        Reads the bot's next line of output.
+        :param timeout: Seconds to wait for it, or None to wait as long as it takes
+        :return: The line without its newline, or None if the bot closed its output or timed out
+        """
+        while b'\n' not in self._pending:
+            if timeout is not None and not select.select([self._output_fd], [], [], timeout)[0]:
+                self.error = self.error or 'timed out'
+                return None
+            chunk = os.read(self._output_fd, 1 << 16)
+            if not chunk:
+                return None
+            self._pending += chunk
+        line, self._pending = self._pending.split(b'\n', 1)
+        return line.decode().rstrip('\r')
+
+    def close(self):
+        """
+        Closes the bot's input, which ends its game loop, and waits for it to finish.
+        :return: nothing.
+        """
+        os.close(self._input_fd)
+        self._wait()
+        os.close(self._output_fd)
+
+    def _wait(self):
+        pass
+
+
+class ThreadBot(Bot):
+    """
+    Runs a bot script in a thread of this process, with sys.stdin and sys.stdout of that thread
+    bound to the pipes. The script runs as __main__ in a namespace of its own, without touching
+    sys.modules, but all bots share the imported hlt modules, including hlt.constants, so only
+    one game should run per process.
+    """
+    def __init__(self, path):
+        """
+        :param path: Path of the bot script, e.g. MyBot.py
+        """
+        path = os.path.abspath(path)
+        bot_input, input_fd = os.pipe()
+        output_fd, bot_output = os.pipe()
+        super().__init__(os.path.basename(path), input_fd, output_fd)
+        directory = os.path.dirname(path)
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        self._thread = threading.Thread(target=self._run, args=(path, bot_input, bot_output),
+                                        name=self.name, daemon=True)
+        self._thread.start()
+
+    def _run(self, path, bot_input, bot_output):
+        stdin, stdout = _install_thread_streams()
+        with open(bot_input, 'r') as stdin_pipe, open(bot_output, 'w') as stdout_pipe:
+            stdin.bind(stdin_pipe)
+            stdout.bind(stdout_pipe)
+            try:
+                with open(path) as script:
+                    code = compile(script.read(), path, 'exec')
+                exec(code, {'__name__': '__main__', '__file__': path})
+            except (EOFError, SystemExit, BrokenPipeError):
+                pass
+            except BaseException:
+                self.error = traceback.format_exc()
+
+    def _wait(self):
+        self._thread.join()
+
+
+class ProcessBot(Bot):
+    """
+    Runs a bot command in a child process, as the engine does. Its stderr is kept and
+    becomes the bot's error if it ends with anything but the EOFError of a finished game.
+    """
+    def __init__(self, command):
+        """
+        :param command: The command line, e.g. "python3 MyBot.py"
+        """
+        arguments = shlex.split(command)
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(arguments, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=self._stderr)
+        super().__init__(os.path.basename(arguments[-1]), self._process.stdin.fileno(),
+                         self._process.stdout.fileno())
+
+    def close(self):
+        self._process.stdin.close()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process.stdout.close()
+        self._stderr.seek(0)
+        stderr = self._stderr.read().decode(errors='replace').strip()
+        self._stderr.close()
+        if stderr and not stderr.splitlines()[-1].startswith('EOFError'):
+            self.error = self.error or stderr
+
+
+def connect(spec, in_process=True):
+    """
+    :param spec: Path of a bot script, or with in_process False any command line
+    :param in_process: Whether to run scripts in a thread rather than a child process
+    :return: The connected Bot
+    """
+    if in_process:
+        return ThreadBot(spec)
+    if spec.endswith('.py'):
+        spec = '{} {}'.format(shlex.quote(sys.executable), shlex.quote(spec))
+    return ProcessBot(spec)
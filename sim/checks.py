@@ -0,0 +1,45 @@
+"""
+Behaviour checks of the bots, played out with the simulated engine, to catch strategy changes
+that quietly switch part of a bot off.
+
+    python -m sim.checks [--seeds 1 2]
+
+Every check plays a solo game of its bot per seed and fails the run if the bot didn't do what
+it should in any of them.
+"""
+
+import argparse
+import os
+import sys
+
+from .game import run_game
+
+"""The directory of the bot scripts."""
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+"""
+The checks, as (description, bot script, map size, test), where test takes the GameResult of a
+solo game and returns whether the bot passed.
+"""
+CHECKS = (
+    ('MyBot2.py builds a dropoff on a 48x48 map', 'MyBot2.py', 48, lambda result: result.dropoffs[0] >= 1),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2])
+    args = parser.parse_args()
+
+    failures = 0
+    for description, bot, size, test in CHECKS:
+        failed = [seed for seed in args.seeds if not test(run_game([os.path.join(_ROOT, bot)], size, seed))]
+        print('{:<50} {}'.format(description, 'failed on seeds {}'.format(failed) if failed else 'ok'))
+        failures += bool(failed)
+    if failures:
+        print('{} of {} checks failed'.format(failures, len(CHECKS)))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
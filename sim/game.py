@@ -0,0 +1,67 @@
+"""
+Plays a whole game between bots with the simulated rules.
+"""
+
+import json
+from collections import namedtuple
+
+from . import bots, mapgen, rules
+
+"""
+The outcome of a game. Every list holds one entry per player: the bot's name, its final halite,
+its rank (1 for the winner), the ships it built and lost, the halite it deposited, the dropoffs
+it built, its number of rejected commands and the error that ended its game early, if any.
+"""
+GameResult = namedtuple('GameResult', ['seed', 'size', 'turns', 'names', 'halite', 'ranks', 'ships_built',
+                                       'ships_lost', 'deposited', 'dropoffs', 'command_errors', 'errors'])
+
+
+def run_game(bot_specs, size=32, seed=0, in_process=True, turn_timeout=None):
+    """
+    Plays one game on a random map, talking to the bots over the engine's protocol.
+    :param bot_specs: One bot script per player, or with in_process False any command lines;
+                      1, 2 or 4 of them
+    :param size: The width and height of the map
+    :param seed: Seed of the map
+    :param in_process: Run bot scripts in threads of this process rather than child processes
+    :param turn_timeout: Seconds a bot may take per turn before it is eliminated, None for no limit
+    :return: The GameResult
+    """
+    halite, shipyards = mapgen.generate_map(size, len(bot_specs), seed)
+    state = rules.GameState(halite, shipyards, rules.game_constants(size, size))
+    players = [bots.connect(spec, in_process) for spec in bot_specs]
+    try:
+        raw_constants = json.dumps(state.constants) + '\n'
+        for player_id, bot in enumerate(players):
+            if not bot.send(raw_constants + state.pregame_input(player_id)) or bot.read_line() is None:
+                state.eliminate(player_id)
+
+        while not state.is_over():
+            frame = state.frame_input()
+            living = [player_id for player_id in state.living_players() if players[player_id].send(frame)]
+            command_lines = {}
+            for player_id in state.living_players():
+                line = players[player_id].read_line(turn_timeout) if player_id in living else None
+                if line is None:
+                    state.eliminate(player_id)
+                else:
+                    command_lines[player_id] = line
+            state.process_turn(command_lines)
+    finally:
+        for bot in players:
+            bot.close()
+
+    return GameResult(
+        seed=seed,
+        size=size,
+        turns=state.turn_number - 1,
+        names=[bot.name for bot in players],
+        halite=[player.halite for player in state.players],
+        ranks=state.ranks(),
+        ships_built=[player.ships_built for player in state.players],
+        ships_lost=[player.ships_lost for player in state.players],
+        deposited=[player.deposited for player in state.players],
+        dropoffs=[len(player.dropoffs) for player in state.players],
+        command_errors=[len(player.errors) for player in state.players],
+        errors=[bot.error for bot in players],
+    )
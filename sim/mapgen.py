@@ -0,0 +1,73 @@
+"""
+Random symmetric maps in the style of the engine's map generator.
+"""
+
+import random
+
+
+def _smoothed_noise(width, height, scale, rng):
+    """
+    White noise on a coarse grid of cells scale apart, bilinearly interpolated to width x height
+    with wrap-around, so the noise tiles seamlessly.
+    :return: List of rows of values in [0, 1)
+    """
+    columns = max(1, width // scale)
+    rows = max(1, height // scale)
+    coarse = [[rng.random() for _ in range(columns)] for _ in range(rows)]
+    noise = []
+    for y in range(height):
+        fy = y * rows / height
+        y0 = int(fy)
+        ty = fy - y0
+        row = []
+        for x in range(width):
+            fx = x * columns / width
+            x0 = int(fx)
+            tx = fx - x0
+            top = coarse[y0][x0] * (1 - tx) + coarse[y0][(x0 + 1) % columns] * tx
+            bottom = coarse[(y0 + 1) % rows][x0] * (1 - tx) + coarse[(y0 + 1) % rows][(x0 + 1) % columns] * tx
+            row.append(top * (1 - ty) + bottom * ty)
+        noise.append(row)
+    return noise
+
+
+def _tile(width, height, rng, max_halite):
+    """
+    :return: List of rows of halite for one player's tile, made of a few octaves of noise
+    """
+    octaves = [(_smoothed_noise(width, height, scale, rng), weight)
+               for scale, weight in ((8, 0.5), (4, 0.3), (2, 0.2))]
+    return [[int(max_halite * sum(noise[y][x] * weight for noise, weight in octaves) ** 2)
+             for x in range(width)] for y in range(height)]
+
+
+def generate_map(size, num_players=2, seed=0, max_halite=1000):
+    """
+    Creates a square map made of one random tile per player, mirrored so every player
+    starts in the same surroundings, with each shipyard in the middle of its tile.
+    :param size: The width and height of the map, a multiple of 2
+    :param num_players: 1, 2 or 4
+    :param seed: Seed for the random generator
+    :param max_halite: The largest amount of halite a cell may start with
+    :return: (list of rows of halite indexed [y][x], list of (x, y) shipyards by player)
+    """
+    if num_players not in (1, 2, 4):
+        raise ValueError("Maps are generated for 1, 2 or 4 players, not {}".format(num_players))
+    rng = random.Random(seed)
+    tile_width = size // 2 if num_players > 1 else size
+    tile_height = size // 2 if num_players == 4 else size
+    tile = _tile(tile_width, tile_height, rng, max_halite)
+
+    halite = []
+    for y in range(size):
+        tile_y = y if y < tile_height else size - 1 - y
+        halite.append([tile[tile_y][x if x < tile_width else size - 1 - x] for x in range(size)])
+
+    shipyards = [(tile_width // 2, tile_height // 2)]
+    if num_players > 1:
+        shipyards.append((size - 1 - tile_width // 2, tile_height // 2))
+    if num_players == 4:
+        shipyards += [(x, size - 1 - y) for x, y in shipyards]
+    for x, y in shipyards:
+        halite[y][x] = 0
+    return halite, shipyards
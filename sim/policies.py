@@ -0,0 +1,153 @@
+"""
+Vectorized bots for batch.BatchGames.
+
+A policy is called once per player and turn with the batch and the player's id, and
+returns the moves of every ship slot, whether to spawn in each game and which ships
+to turn into dropoffs; entries for other players' ships are ignored.
+"""
+
+import numpy as np
+
+from .batch import OFFSETS, STILL
+
+
+def _knob(value):
+    """
+    :return: value as a 1-D array, holding either one value for all games or one per game
+    """
+    return np.atleast_1d(np.asarray(value, dtype=float))
+
+
+class GreedyPolicy:
+    """
+    A vectorized greedy miner that uses MyBot2.py's spawn and dropoff cost curves, with its knobs
+    exposed. Every knob is either a scalar or an array with one value per game of the batch, so
+    a whole parameter sweep plays in one batch.
+
+    Ships mine their cell while it holds at least min_halite and otherwise step to the neighbour
+    with the most halite within two cells of it, head for the closest structure once they carry return_ratio * MAX_ENERGY, and
+    all head home for the end of the game when they are within end_margin turns of it. Spawning
+    and the one dropoff per game use MyBot2.py's cost curve, which rises exponentially from
+    initial_move_cost after plateau * MAX_TURNS to end_move_cost at the end of the game. Ships
+    of the player don't move onto each other, except onto a structure at the end of the game.
+
+    It is not a port of MyBot2.py, so results of a sweep carry over to it only roughly:
+        - ships step one cell at a time towards their choice, without A* or space-time navigation
+        - targets are the richest neighbours within two cells, not the TargetIndex's picks
+        - the dropoff is built by the first ship that qualifies, whereas MyBot2.py picks the one
+          standing on the cell DropoffSites scores best
+    """
+    def __init__(self, return_ratio=0.70, end_margin=16, min_halite=15, plateau=0.42,
+                 initial_move_cost=1, end_move_cost=30, dropoff_distance=4 / 3):
+        """
+        :param return_ratio: Fraction of MAX_ENERGY at which a ship returns
+        :param end_margin: Turns to spare when heading home for the end of the game
+        :param min_halite: Halite below which a ship stops mining its cell
+        :param plateau: Fraction of MAX_TURNS after which spawning and dropoffs get more expensive
+        :param initial_move_cost: Cost factor until the plateau
+        :param end_move_cost: Cost factor at the end of the game
+        :param dropoff_distance: Distance from the shipyard, in quarters of the map size, to build a dropoff
+        """
+        self.return_ratio = _knob(return_ratio)
+        self.end_margin = _knob(end_margin)
+        self.min_halite = _knob(min_halite)
+        self.plateau = _knob(plateau)
+        self.initial_move_cost = _knob(initial_move_cost)
+        self.end_move_cost = _knob(end_move_cost)
+        self.dropoff_distance = _knob(dropoff_distance)
+        self._returning = {}
+        self._built_dropoff = {}
+
+    def _cost_factors(self, batch):
+        """
+        :return: (spawn factor, dropoff factor) of MyBot2.py's cost curves for the current turn, each of shape (B,)
+        """
+        max_turns = batch.constants['MAX_TURNS']
+        turn = batch.turn_number
+        plateau = self.plateau * max_turns
+        slope = (np.log(self.end_move_cost) - np.log(self.initial_move_cost)) / (max_turns - plateau)
+        spawn = self.initial_move_cost * np.exp(-slope) * np.exp(slope * turn) / 4
+        dropoff = np.maximum(spawn / 4 - max_turns / turn, self.initial_move_cost)
+        late = turn > plateau
+        shape = (batch.num_games,)
+        return np.broadcast_to(np.where(late, spawn, self.initial_move_cost), shape), \
+            np.broadcast_to(np.where(late, dropoff, self.initial_move_cost), shape)
+
+    def __call__(self, batch, player):
+        """
+        :param batch: The BatchGames
+        :param player: The id of the player to move
+        :return: (moves of shape (B, S), spawn of shape (B,), construct of shape (B, S))
+        """
+        game_constants = batch.constants
+        size = batch.width * batch.height
+        shape = (batch.num_games,)
+        games, slots = np.nonzero(batch.ship_alive & (batch.ship_owner == player))
+        cargo = batch.ship_halite[games, slots]
+        home = batch.home_distance[:, player]
+        flat_halite = batch.halite.reshape(batch.num_games, -1)
+
+        around = ((batch.ship_y[games, slots, None] + OFFSETS[:, 1]) % batch.height) * batch.width + \
+            (batch.ship_x[games, slots, None] + OFFSETS[:, 0]) % batch.width
+        home_around = home[games[:, None], around]
+        at_home = home_around[:, STILL] == 0
+
+        returning = self._returning.get(player, np.zeros(batch.ship_alive.shape, dtype=bool))[games, slots]
+        return_at = np.broadcast_to(self.return_ratio, shape)[games] * game_constants['MAX_ENERGY']
+        returning = ~at_home & (returning | (cargo >= return_at))
+        self._returning[player] = np.zeros(batch.ship_alive.shape, dtype=bool)
+        self._returning[player][games, slots] = returning
+        turns_left = game_constants['MAX_TURNS'] - batch.turn_number
+        end_game = turns_left - np.broadcast_to(self.end_margin, shape)[games] <= home_around[:, STILL]
+
+        # Explorers step towards the neighbour with the most halite around it
+        nearby = batch.diamond_cells(2)[around[:, 1:]]
+        prospects = flat_halite[games[:, None, None], nearby].sum(axis=2)
+        stay = flat_halite[games, around[:, STILL]] >= np.broadcast_to(self.min_halite, shape)[games]
+        explore = np.where(stay, STILL, prospects.argmax(axis=1) + 1)
+        moves = np.where(returning | end_game, home_around.argmin(axis=1), explore)
+
+        # Resolve the player's own collisions: of the ships heading for one cell, one that stays
+        # or else the first one keeps its move and the others stay, which can push the conflict
+        # on to their own cells.
+        ships = np.arange(len(games))
+        for _ in range(4):
+            targets = around[ships, moves]
+            candidates = np.nonzero(~(end_game & (home[games, targets] == 0)))[0]
+            keys = games[candidates] * size + targets[candidates]
+            moving = moves[candidates] != STILL
+            order = np.lexsort((moving, keys))
+            duplicate = np.zeros(len(order), dtype=bool)
+            duplicate[1:] = keys[order[1:]] == keys[order[:-1]]
+            losers = candidates[order[duplicate & moving[order]]]
+            if not len(losers):
+                break
+            moves[losers] = STILL
+
+        spawn_factor, dropoff_factor = self._cost_factors(batch)
+        shipyards = batch.shipyards[:, player]
+        yard_cells = shipyards[:, 1] * batch.width + shipyards[:, 0]
+        yard_taken = np.zeros(shape, dtype=bool)
+        yard_taken[games[around[ships, moves] == yard_cells[games]]] = True
+        has_ships = np.zeros(shape, dtype=bool)
+        has_ships[games] = True
+        bank = batch.bank[:, player]
+        ship_cost = game_constants['NEW_ENTITY_ENERGY_COST']
+        spawn = ((bank >= spawn_factor * ship_cost) & ~yard_taken) | (~has_ships & (bank >= ship_cost))
+
+        built = self._built_dropoff.get(player, np.zeros(shape, dtype=bool))
+        dx = np.abs(batch.ship_x[games, slots] - shipyards[games, 0])
+        dy = np.abs(batch.ship_y[games, slots] - shipyards[games, 1])
+        from_yard = np.minimum(dx, batch.width - dx) + np.minimum(dy, batch.height - dy)
+        candidates = np.nonzero(
+            ~built[games] & (bank[games] + cargo > dropoff_factor[games] * game_constants['DROPOFF_COST']) &
+            (from_yard >= np.broadcast_to(self.dropoff_distance, shape)[games] * max(batch.width, batch.height) / 4))[0]
+        _, first = np.unique(games[candidates], return_index=True)
+        builders = candidates[first]
+        construct = np.zeros(batch.ship_alive.shape, dtype=bool)
+        construct[games[builders], slots[builders]] = True
+        self._built_dropoff[player] = built | construct.any(axis=1)
+
+        all_moves = np.zeros(batch.ship_alive.shape, dtype=np.int64)
+        all_moves[games, slots] = moves
+        return all_moves, spawn, construct
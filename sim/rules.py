@@ -0,0 +1,350 @@
+"""
+The rules of the game: the state of a game and how one turn of commands changes it.
+
+Turns are processed the way the engine does it: dropoffs are built, ships spawn and
+move, ships sharing a cell collide, ships on their own structures deposit their cargo
+and ships that didn't move mine. Capture is not implemented.
+"""
+
+from hlt import commands
+
+"""The constants the engine sends at the start of a game, apart from MAX_TURNS which depends on the map."""
+DEFAULT_CONSTANTS = {
+    'NEW_ENTITY_ENERGY_COST': 1000,
+    'DROPOFF_COST': 4000,
+    'MAX_ENERGY': 1000,
+    'MAX_TURNS': 400,
+    'EXTRACT_RATIO': 4,
+    'MOVE_COST_RATIO': 10,
+    'INSPIRATION_ENABLED': True,
+    'INSPIRATION_RADIUS': 4,
+    'INSPIRATION_SHIP_COUNT': 2,
+    'INSPIRED_EXTRACT_RATIO': 4,
+    'INSPIRED_BONUS_MULTIPLIER': 2.0,
+    'INSPIRED_MOVE_COST_RATIO': 10,
+    'CAPTURE_ENABLED': False,
+    'CAPTURE_RADIUS': 3,
+    'SHIPS_ABOVE_FOR_CAPTURE': 3,
+    'INITIAL_ENERGY': 5000,
+}
+
+_OFFSETS = {
+    commands.NORTH: (0, -1),
+    commands.SOUTH: (0, 1),
+    commands.EAST: (1, 0),
+    commands.WEST: (-1, 0),
+    commands.STAY_STILL: (0, 0),
+}
+
+
+def game_constants(width, height):
+    """
+    :param width: The width of the map
+    :param height: The height of the map
+    :return: The constants for a game on that map, with the engine's MAX_TURNS for its size
+    """
+    game_constants = dict(DEFAULT_CONSTANTS)
+    game_constants['MAX_TURNS'] = 300 + 25 * max(width, height) // 8
+    return game_constants
+
+
+class ShipState:
+    """
+    A ship as the rules see it.
+    """
+    __slots__ = ('id', 'owner', 'x', 'y', 'halite')
+
+    def __init__(self, ship_id, owner, x, y, halite=0):
+        self.id = ship_id
+        self.owner = owner
+        self.x = x
+        self.y = y
+        self.halite = halite
+
+
+class PlayerState:
+    """
+    A player as the rules see it, with counters for the game's statistics.
+    """
+    def __init__(self, player_id, shipyard, halite):
+        self.id = player_id
+        self.shipyard = shipyard
+        self.halite = halite
+        self.ships = {}
+        self.dropoffs = {}
+        self.alive = True
+        self.last_turn = 0
+        self.ships_built = 0
+        self.ships_lost = 0
+        self.deposited = 0
+        self.errors = []
+
+
+class GameState:
+    """
+    The full state of a game: halite on the map, players, their ships and structures.
+    """
+    def __init__(self, halite, shipyards, game_constants):
+        """
+        :param halite: List of rows of the halite on each cell, indexed [y][x]
+        :param shipyards: List of (x, y) shipyard cells, one per player
+        :param game_constants: Dict of the constants sent to the bots
+        """
+        self.height = len(halite)
+        self.width = len(halite[0])
+        self.halite = [list(row) for row in halite]
+        self.constants = game_constants
+        self.turn_number = 1
+        self.players = [PlayerState(player_id, shipyard, game_constants['INITIAL_ENERGY'])
+                        for player_id, shipyard in enumerate(shipyards)]
+        self.structures = {shipyard: player_id for player_id, shipyard in enumerate(shipyards)}
+        self.changed_cells = set()
+        self._next_ship_id = 0
+        self._next_dropoff_id = 0
+
+    def pregame_input(self, player_id):
+        """
+        :param player_id: The player the input is for
+        :return: The lines the engine sends a bot before the first turn, as a string
+        """
+        lines = ['{} {}'.format(len(self.players), player_id)]
+        for player in self.players:
+            lines.append('{} {} {}'.format(player.id, *player.shipyard))
+        lines.append('{} {}'.format(self.width, self.height))
+        for row in self.halite:
+            lines.append(' '.join(map(str, row)))
+        return '\n'.join(lines) + '\n'
+
+    def frame_input(self):
+        """
+        :return: The lines the engine sends every bot at the start of the current turn, as a string
+        """
+        lines = [str(self.turn_number)]
+        for player in self.players:
+            lines.append('{} {} {} {}'.format(player.id, len(player.ships), len(player.dropoffs), player.halite))
+            for ship in player.ships.values():
+                lines.append('{} {} {} {}'.format(ship.id, ship.x, ship.y, ship.halite))
+            for dropoff_id, (x, y) in player.dropoffs.items():
+                lines.append('{} {} {}'.format(dropoff_id, x, y))
+        lines.append(str(len(self.changed_cells)))
+        for x, y in self.changed_cells:
+            lines.append('{} {} {}'.format(x, y, self.halite[y][x]))
+        return '\n'.join(lines) + '\n'
+
+    def ships(self):
+        """
+        :return: A list of every ship in the game
+        """
+        return [ship for player in self.players for ship in player.ships.values()]
+
+    def distance(self, x1, y1, x2, y2):
+        """
+        :return: The wrap-around Manhattan distance between two cells
+        """
+        dx = abs(x1 - x2)
+        dy = abs(y1 - y2)
+        return min(dx, self.width - dx) + min(dy, self.height - dy)
+
+    def inspired_ships(self):
+        """
+        :return: The set of ids of the ships with at least INSPIRATION_SHIP_COUNT
+                 opponent ships within INSPIRATION_RADIUS
+        """
+        if not self.constants['INSPIRATION_ENABLED']:
+            return set()
+        radius = self.constants['INSPIRATION_RADIUS']
+        needed = self.constants['INSPIRATION_SHIP_COUNT']
+        ships = self.ships()
+        inspired = set()
+        for ship in ships:
+            count = 0
+            for other in ships:
+                if other.owner != ship.owner and self.distance(ship.x, ship.y, other.x, other.y) <= radius:
+                    count += 1
+                    if count >= needed:
+                        inspired.add(ship.id)
+                        break
+        return inspired
+
+    def _parse(self, player, line):
+        """
+        Splits a bot's command line into its spawn flag, dropoff constructions and moves.
+        Malformed commands, commands for ships the player doesn't own and further commands
+        for a ship that already has one are recorded as errors and ignored.
+        :return: (spawn, list of ships to convert, dict mapping ships to (dx, dy))
+        """
+        tokens = line.split()
+        spawn = False
+        constructs = []
+        moves = {}
+        commanded = set()
+        index = 0
+        while index < len(tokens):
+            command = tokens[index]
+            if command == commands.GENERATE:
+                spawn = True
+                index += 1
+                continue
+            arity = 3 if command == commands.MOVE else 2
+            arguments = tokens[index + 1:index + arity]
+            index += arity
+            try:
+                ship = player.ships[int(arguments[0])] if command in (commands.MOVE, commands.CONSTRUCT) else None
+            except (IndexError, ValueError, KeyError):
+                ship = None
+            if ship is None or ship.id in commanded or \
+                    (command == commands.MOVE and (len(arguments) < 2 or arguments[1] not in _OFFSETS)):
+                player.errors.append((self.turn_number, ' '.join([command] + arguments)))
+                continue
+            commanded.add(ship.id)
+            if command == commands.CONSTRUCT:
+                constructs.append(ship)
+            else:
+                moves[ship] = _OFFSETS[arguments[1]]
+        return spawn, constructs, moves
+
+    def process_turn(self, command_lines):
+        """
+        Applies one turn of commands and advances the turn counter.
+        :param command_lines: Dict mapping the id of every living player to its command line
+        :return: nothing.
+        """
+        game_constants = self.constants
+        max_halite = game_constants['MAX_ENERGY']
+        self.changed_cells = set()
+        inspired = self.inspired_ships()
+
+        orders = {player_id: self._parse(self.players[player_id], line)
+                  for player_id, line in command_lines.items()}
+
+        for player_id, (_, constructs, _) in orders.items():
+            player = self.players[player_id]
+            for ship in constructs:
+                cell = (ship.x, ship.y)
+                funds = player.halite + ship.halite + self.halite[ship.y][ship.x]
+                if cell in self.structures or funds < game_constants['DROPOFF_COST']:
+                    player.errors.append((self.turn_number, '{} {}'.format(commands.CONSTRUCT, ship.id)))
+                    continue
+                player.halite = funds - game_constants['DROPOFF_COST']
+                self._set_halite(ship.x, ship.y, 0)
+                del player.ships[ship.id]
+                player.dropoffs[self._next_dropoff_id] = cell
+                self._next_dropoff_id += 1
+                self.structures[cell] = player_id
+
+        moved = set()
+        for player_id, (spawn, _, moves) in orders.items():
+            player = self.players[player_id]
+            if spawn:
+                if player.halite >= game_constants['NEW_ENTITY_ENERGY_COST']:
+                    player.halite -= game_constants['NEW_ENTITY_ENERGY_COST']
+                    ship = ShipState(self._next_ship_id, player_id, *player.shipyard)
+                    player.ships[ship.id] = ship
+                    player.ships_built += 1
+                    self._next_ship_id += 1
+                    moved.add(ship.id)
+                else:
+                    player.errors.append((self.turn_number, commands.GENERATE))
+            for ship, (dx, dy) in moves.items():
+                if ship.id not in player.ships or (dx, dy) == (0, 0):
+                    continue
+                ratio = game_constants['INSPIRED_MOVE_COST_RATIO' if ship.id in inspired else 'MOVE_COST_RATIO']
+                cost = self.halite[ship.y][ship.x] // ratio
+                if ship.halite < cost:
+                    continue
+                ship.halite -= cost
+                ship.x = (ship.x + dx) % self.width
+                ship.y = (ship.y + dy) % self.height
+                moved.add(ship.id)
+
+        self._collide()
+
+        for ship in self.ships():
+            player = self.players[ship.owner]
+            if self.structures.get((ship.x, ship.y)) == ship.owner:
+                player.halite += ship.halite
+                player.deposited += ship.halite
+                ship.halite = 0
+            elif ship.id not in moved:
+                if ship.id in inspired:
+                    ratio = game_constants['INSPIRED_EXTRACT_RATIO']
+                else:
+                    ratio = game_constants['EXTRACT_RATIO']
+                cell_halite = self.halite[ship.y][ship.x]
+                extracted = min(-(-cell_halite // ratio), max_halite - ship.halite)
+                if extracted <= 0:
+                    continue
+                self._set_halite(ship.x, ship.y, cell_halite - extracted)
+                ship.halite += extracted
+                if ship.id in inspired:
+                    bonus = int(extracted * game_constants['INSPIRED_BONUS_MULTIPLIER'])
+                    ship.halite += min(bonus, max_halite - ship.halite)
+
+        for player in self.players:
+            if player.alive:
+                player.last_turn = self.turn_number
+                if not player.ships and player.halite < game_constants['NEW_ENTITY_ENERGY_COST']:
+                    player.alive = False
+        self.turn_number += 1
+
+    def _collide(self):
+        """
+        Destroys every ship that shares its cell with another. Their cargo is dropped on the cell,
+        or goes to the owner of the structure on it.
+        :return: nothing.
+        """
+        cells = {}
+        for ship in self.ships():
+            cells.setdefault((ship.x, ship.y), []).append(ship)
+        for (x, y), ships in cells.items():
+            if len(ships) < 2:
+                continue
+            cargo = sum(ship.halite for ship in ships)
+            for ship in ships:
+                player = self.players[ship.owner]
+                del player.ships[ship.id]
+                player.ships_lost += 1
+            if (x, y) in self.structures:
+                self.players[self.structures[(x, y)]].halite += cargo
+            elif cargo:
+                self._set_halite(x, y, self.halite[y][x] + cargo)
+
+    def _set_halite(self, x, y, halite):
+        self.halite[y][x] = halite
+        self.changed_cells.add((x, y))
+
+    def eliminate(self, player_id):
+        """
+        Removes a player from the game, e.g. because its bot crashed, along with its ships and halite.
+        :param player_id: The id of the player
+        :return: nothing.
+        """
+        player = self.players[player_id]
+        player.alive = False
+        player.halite = 0
+        player.ships.clear()
+
+    def living_players(self):
+        """
+        :return: The ids of the players still in the game
+        """
+        return [player.id for player in self.players if player.alive]
+
+    def is_over(self):
+        """
+        :return: Whether MAX_TURNS turns have been played or at most one of several players is left
+        """
+        living = len(self.living_players())
+        return self.turn_number > self.constants['MAX_TURNS'] or living == 0 or \
+            (len(self.players) > 1 and living < 2)
+
+    def ranks(self):
+        """
+        Ranks players by how long they stayed in the game, then by halite.
+        :return: List of the rank of each player, 1 for the winner
+        """
+        order = sorted(self.players, key=lambda player: (-player.last_turn, -player.halite))
+        ranks = [0] * len(self.players)
+        for rank, player in enumerate(order, 1):
+            ranks[player.id] = rank
+        return ranks
@@ -0,0 +1,180 @@
+"""
+Plays many games between a set of bots on a pool of worker processes and
+summarizes them.
+
+    python -m sim.tournament MyBot.py MyBot2.py [--games N] [--workers N] [--output results.npz]
+
+Every game gets its own seed, a map size drawn from the engine's sizes and a shuffled
+seating, so no bot keeps the same starting corner. Results are stored column by column
+in a compressed .npz file, one row per game and one column per seat where it applies.
+"""
+
+import argparse
+import concurrent.futures
+import math
+import os
+import random
+import sys
+
+import numpy as np
+
+from .game import run_game
+
+"""The map sizes the engine plays on."""
+MAP_SIZES = (32, 40, 48, 56, 64)
+
+"""The per-seat columns of a results file, as named in game.GameResult."""
+_SEAT_COLUMNS = ('halite', 'ranks', 'ships_built', 'ships_lost', 'deposited', 'dropoffs', 'command_errors')
+
+
+def schedule(num_bots, num_games, seed=0, sizes=MAP_SIZES):
+    """
+    :param num_bots: How many bots play in every game
+    :param num_games: How many games to play
+    :param seed: Seed for drawing the games
+    :param sizes: Map sizes to draw from
+    :return: A list of (seed, size, seating) per game, where seating[seat] is the index of the bot in that seat
+    """
+    rng = random.Random(seed)
+    games = []
+    for _ in range(num_games):
+        seating = list(range(num_bots))
+        rng.shuffle(seating)
+        games.append((rng.randrange(1 << 31), rng.choice(sizes), seating))
+    return games
+
+
+def _play(job):
+    """
+    Plays one scheduled game in a worker process.
+    :param job: (bot specs, seed, size, seating, in_process, turn_timeout)
+    :return: (seating, GameResult)
+    """
+    bots, seed, size, seating, in_process, turn_timeout = job
+    return seating, run_game([bots[bot] for bot in seating], size, seed, in_process, turn_timeout)
+
+
+def run_tournament(bots, num_games, workers=None, seed=0, sizes=MAP_SIZES, in_process=True,
+                   turn_timeout=None, progress=None):
+    """
+    Plays the games on a process pool. Each worker plays one game at a time, so the bots
+    of a game have the process, and hlt.constants, to themselves.
+    :param bots: The bot specs, as for game.run_game; 1, 2 or 4 of them
+    :param num_games: How many games to play
+    :param workers: Number of worker processes, by default one per core
+    :param seed: Seed for drawing the games
+    :param sizes: Map sizes to draw from
+    :param in_process: Run bots in threads of the workers rather than child processes
+    :param turn_timeout: Seconds a bot may take per turn before it is eliminated
+    :param progress: Optional callable taking the number of games played so far
+    :return: Dict of result columns, see save_results
+    """
+    jobs = [(list(bots), game_seed, size, seating, in_process, turn_timeout)
+            for game_seed, size, seating in schedule(len(bots), num_games, seed, sizes)]
+    rows = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for row in pool.map(_play, jobs):
+            rows.append(row)
+            if progress is not None:
+                progress(len(rows))
+
+    columns = {
+        'bots': np.array(bots),
+        'seed': np.array([result.seed for _, result in rows], dtype=np.int64),
+        'size': np.array([result.size for _, result in rows], dtype=np.int16),
+        'turns': np.array([result.turns for _, result in rows], dtype=np.int16),
+        'seating': np.array([seating for seating, _ in rows], dtype=np.int8).reshape(len(rows), len(bots)),
+        'crashed': np.array([[error is not None for error in result.errors] for _, result in rows],
+                            dtype=bool).reshape(len(rows), len(bots)),
+    }
+    for column in _SEAT_COLUMNS:
+        columns[column] = np.array([getattr(result, column) for _, result in rows],
+                                   dtype=np.int32).reshape(len(rows), len(bots))
+    return columns
+
+
+def save_results(path, columns):
+    """
+    Writes result columns to a compressed .npz file. Besides 'bots', the names of the bots, the
+    columns are 'seed', 'size' and 'turns' with one entry per game, and 'seating', 'crashed',
+    'halite', 'ranks', 'ships_built', 'ships_lost', 'deposited', 'dropoffs' and 'command_errors'
+    with one row per game and one entry per seat.
+    :return: nothing.
+    """
+    np.savez_compressed(path, **columns)
+
+
+def load_results(path):
+    """
+    :return: The dict of result columns stored in a file written by save_results
+    """
+    with np.load(path) as results:
+        return {column: results[column] for column in results.files}
+
+
+def wilson_interval(successes, trials, z=1.96):
+    """
+    :param successes: The number of successes
+    :param trials: The number of trials
+    :param z: The normal quantile of the confidence level, 1.96 for 95%
+    :return: (low, high) Wilson score interval of the success rate
+    """
+    if trials == 0:
+        return 0.0, 1.0
+    rate = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (rate + z * z / (2 * trials)) / denominator
+    spread = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def summarize(columns):
+    """
+    Aggregates results by bot.
+    :param columns: Dict of result columns
+    :return: List of (bot, games, wins, win rate, (low, high) 95% interval, mean halite, mean rank, crashes)
+    """
+    seating = columns['seating']
+    summary = []
+    for bot, name in enumerate(columns['bots']):
+        seats = seating == bot
+        games = int(seats.sum())
+        wins = int((columns['ranks'][seats] == 1).sum())
+        summary.append((str(name), games, wins, wins / games if games else 0.0, wilson_interval(wins, games),
+                        float(columns['halite'][seats].mean()) if games else 0.0,
+                        float(columns['ranks'][seats].mean()) if games else 0.0,
+                        int(columns['crashed'][seats].sum())))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays a tournament between bots with the simulated engine.')
+    parser.add_argument('bots', nargs='+', help='bot scripts, or commands with --subprocess; 1, 2 or 4 of them')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, one per core by default')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(MAP_SIZES))
+    parser.add_argument('--subprocess', action='store_true', help='run every bot in a child process')
+    parser.add_argument('--timeout', type=float, default=None, help='seconds per turn before a bot is eliminated')
+    parser.add_argument('--output', default='tournament.npz', help='file to write per game results to')
+    args = parser.parse_args()
+
+    def progress(played):
+        sys.stderr.write('\r{}/{} games'.format(played, args.games))
+        sys.stderr.flush()
+
+    columns = run_tournament(args.bots, args.games, args.workers, args.seed, args.sizes,
+                             in_process=not args.subprocess, turn_timeout=args.timeout, progress=progress)
+    sys.stderr.write('\n')
+    save_results(args.output, columns)
+
+    print('{:<14} {:>6} {:>6} {:>8} {:>17} {:>9} {:>6} {:>8}'.format(
+        'bot', 'games', 'wins', 'win rate', '95% interval', 'halite', 'rank', 'crashes'))
+    for name, games, wins, rate, (low, high), halite, rank, crashes in summarize(columns):
+        print('{:<14} {:>6} {:>6} {:>8.3f} {:>17} {:>9.0f} {:>6.2f} {:>8}'.format(
+            name, games, wins, rate, '[{:.3f}, {:.3f}]'.format(low, high), halite, rank, crashes))
+    print('results written to {}'.format(args.output))
+
+
+if __name__ == '__main__':
+    main()